@@ -4,8 +4,8 @@ Educational Research Agent - Streamlit UI with Dynamic Status
 
 import logging
 import sys
+import time
 import uuid
-import asyncio
 from pathlib import Path
 
 import streamlit as st
@@ -16,8 +16,11 @@ from langchain_core.runnables import RunnableConfig
 sys.path.append(str(Path(__file__).parent))
 
 from dotenv import load_dotenv
-from src.agents.graph import build_graph
+from src.agents.answer_cache import get_answer_cache
+from src.agents.graph import build_graph, record_cached_turn
+from src.agents.runner import get_agent_runner
 from src.agents.state import AgentState
+from src.agents.streaming import DraftStream, astream_run
 from src.tools.validator import validator
 
 # Setup logging
@@ -44,13 +47,24 @@ This AI agent helps you research academic topics by combining:
 - **Safety Guardrails** (Maker-Checker Loop)
 """)
 
+@st.cache_resource
+def get_agent():
+    """Compiled graph shared by every session (conversations are keyed by thread_id)."""
+    return build_graph()
+
+
+# Server load (shared by all sessions in this process)
+with st.sidebar:
+    load = get_agent_runner().stats()
+    st.caption(
+        f"⚙️ Active research runs: {load['running']}/{load['max_concurrent']} · "
+        f"queued: {load['queued']} · avg wait: {load['avg_wait_seconds']:.1f}s"
+    )
+
 # Initialize Session State
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
-if "agent" not in st.session_state:
-    st.session_state.agent = build_graph()
-
 if "thread_id" not in st.session_state:
     st.session_state.thread_id = str(uuid.uuid4())
 
@@ -64,80 +78,115 @@ for message in st.session_state.messages:
             st.markdown(message.content)
 
 
-# Async Live Streaming with Dynamic Status
-async def stream_agent_live(initial_state, config, containers, status_placeholder):
-    """Stream agent execution with real-time status updates in spinner."""
+# Live Streaming with Dynamic Status
+def stream_agent_live(initial_state, config, containers, status_placeholder):
+    """
+    Stream agent execution with real-time status updates in spinner.
+    
+    The run itself happens on the shared background event loop; this
+    script thread only renders its events.
+    """
     final_state = None
     all_states = {}
+    draft = DraftStream()
+    last_render = 0.0
     
     plan_container = containers["plan"]
     research_container = containers["research"]
     checker_container = containers["checker"]
+    response_container = containers["response"]
+    
+    def render_draft(label: str = "provisional - awaiting validation", cursor: str = "▌"):
+        response_container.markdown(f"### ✍️ Draft Answer *({label})*\n\n{draft.text}{cursor}")
     
     try:
-        async for event in st.session_state.agent.astream(initial_state, config=config):
-            for key, value in event.items():
-                all_states[key] = value
-                final_state = value
+        agent = get_agent()
+        runner = get_agent_runner()
+        stats = runner.stats()
+        if stats["running"] >= stats["max_concurrent"]:
+            status_placeholder.text(f"⏳ Waiting for a free slot ({stats['queued'] + 1} in queue)...")
+        
+        for kind, payload in runner.stream(lambda: astream_run(agent, initial_state, config, draft)):
+            if kind == "state":
+                final_state = payload
+                continue
+            if kind == "draft":
+                status_placeholder.text("✍️ Writing answer...")
+                continue
+            if kind == "token":
+                # Re-rendering markdown per token is slow for long answers
+                now = time.monotonic()
+                if now - last_render > 0.05:
+                    render_draft()
+                    last_render = now
+                continue
+            
+            key, value = payload
+            all_states[key] = value
+            
+            if key == "planner":
+                plan = value.get("plan", "")
                 
-                if key == "planner":
-                    plan = value.get("plan", "")
-                    
-                    # Update status in the spinner message
-                    status_placeholder.text("📋 Planning research strategy...")
-                    
-                    with plan_container:
-                        st.success("✅ **Planning Complete**")
-                        with st.expander("📋 Research Strategy", expanded=False):
-                            st.info(plan)
-                        
-                elif key == "researcher":
-                    iteration = value.get("iteration", 0)
+                # Update status in the spinner message
+                status_placeholder.text("📋 Planning research strategy...")
+                
+                with plan_container:
+                    st.success("✅ **Planning Complete**")
+                    with st.expander("📋 Research Strategy", expanded=False):
+                        st.info(plan)
                     
-                    # Update status in spinner
+            elif key == "researcher":
+                iteration = value.get("iteration", 0)
+                if draft.text:
+                    render_draft(cursor="")
+                
+                # Update status in spinner
+                if iteration == 1:
+                    status_placeholder.text("🔬 Researching sources...")
+                else:
+                    status_placeholder.text(f"🔬 Re-researching (iteration {iteration})...")
+                
+                agent_steps = value.get("agent_steps", [])
+                
+                with research_container:
                     if iteration == 1:
-                        status_placeholder.text("🔬 Researching sources...")
+                        st.success("✅ **Research Complete**")
                     else:
-                        status_placeholder.text(f"🔬 Re-researching (iteration {iteration})...")
+                        st.info(f"🔄 **Research Iteration {iteration}**")
                     
-                    agent_steps = value.get("agent_steps", [])
-                    
-                    with research_container:
-                        if iteration == 1:
-                            st.success("✅ **Research Complete**")
-                        else:
-                            st.info(f"🔄 **Research Iteration {iteration}**")
-                        
-                        if agent_steps:
-                            with st.expander(f"🧠 Agent Reasoning ({len(agent_steps)} steps)", expanded=True):
-                                for i, step in enumerate(agent_steps, 1):
-                                    if step["type"] == "tool_call":
-                                        st.markdown(f"**🔧 Tool {i}:** `{step['tool']}`")
-                                        st.caption(step['result'][:400] + "..." if len(step['result']) > 400 else step['result'])
-                                        st.divider()
-                                    elif step["type"] == "reasoning":
-                                        st.markdown(f"**💭 Reasoning {i}:**")
-                                        st.caption(str(step['content'])[:300])
-                                        st.divider()
-                    
-                elif key == "checker":
-                    valid_status = value.get("validation_status")
-                    critique = value.get("critique")
-                    iteration = value.get("iteration", 0)
-                    
-                    # Update status in spinner
-                    status_placeholder.text("🛡️ Validating answer...")
-                    
-                    with checker_container:
-                        if valid_status == "VALID":
-                            st.success("✅ **Validation Passed** - Answer approved!")
-                        else:
-                            st.warning(f"⚠️ **Validation Failed (Iteration {iteration})** - Requesting improvements...")
-                            with st.expander("📝 Checker Feedback", expanded=False):
-                                st.info(critique)
-        
+                    if agent_steps:
+                        with st.expander(f"🧠 Agent Reasoning ({len(agent_steps)} steps)", expanded=True):
+                            for i, step in enumerate(agent_steps, 1):
+                                if step["type"] == "tool_call":
+                                    st.markdown(f"**🔧 Tool {i}:** `{step['tool']}`")
+                                    st.caption(step['result'][:400] + "..." if len(step['result']) > 400 else step['result'])
+                                    st.divider()
+                                elif step["type"] == "reasoning":
+                                    st.markdown(f"**💭 Reasoning {i}:**")
+                                    st.caption(str(step['content'])[:300])
+                                    st.divider()
+                
+            elif key == "checker":
+                valid_status = value.get("validation_status")
+                critique = value.get("critique")
+                iteration = value.get("iteration", 0)
+                
+                # Update status in spinner
+                status_placeholder.text("🛡️ Validating answer...")
+                
+                with checker_container:
+                    if valid_status == "VALID":
+                        st.success("✅ **Validation Passed** - Answer approved!")
+                    else:
+                        if draft.text:
+                            render_draft(label="rejected - revising", cursor="")
+                        st.warning(f"⚠️ **Validation Failed (Iteration {iteration})** - Requesting improvements...")
+                        with st.expander("📝 Checker Feedback", expanded=False):
+                            st.info(critique)
+    
         # Final status
         status_placeholder.text("✅ Research complete!")
+        logger.info(f"Agent runner: {runner.stats()}")
         
         return all_states, final_state
     
@@ -162,10 +211,26 @@ if query:
             with st.chat_message("assistant"):
                 error_msg = f"🚫 **Request Blocked:** {safety['reason']}"
                 st.error(error_msg)
-                st.session_state.messages.append(AIMessage(content=f"Request Blocked: {safety['reason']}"))
+            # Blocked turns never reach the agent's thread, so keep them out of the history too
+            st.session_state.messages.pop()
             st.stop()
 
-    # 3. Run Agent with Live Streaming
+    # 3. Answer Cache (validated answers to near-identical, standalone questions)
+    answer_cache = get_answer_cache()
+    history = st.session_state.messages[:-1]
+    cached = answer_cache.lookup(query, history) if answer_cache else None
+    if cached:
+        with st.chat_message("assistant"):
+            st.caption(f"⚡ Answered from cache (similar to: \"{cached.query}\")")
+            st.markdown("### 📝 Final Answer")
+            st.markdown(cached.answer)
+        st.session_state.messages.append(AIMessage(content=cached.answer))
+        # The agent reads history from the thread, so the cached turn goes there too
+        config: RunnableConfig = {"configurable": {"thread_id": st.session_state.thread_id}}
+        record_cached_turn(get_agent(), config, query, cached.answer)
+        st.stop()
+
+    # 4. Run Agent with Live Streaming
     with st.chat_message("assistant"):
         
         # Single status display (in spinner placeholder)
@@ -186,7 +251,8 @@ if query:
             # Prepare state with memory
             initial_state: AgentState = {
                 "query": query,
-                "messages": st.session_state.messages.copy(),
+                # Earlier turns live in the checkpointed thread; send only the new one
+                "messages": [HumanMessage(content=query)],
                 "plan": "",
                 "retrieved_docs": [],
                 "draft_answer": "",
@@ -203,13 +269,12 @@ if query:
                 containers = {
                     "plan": plan_container,
                     "research": research_container,
-                    "checker": checker_container
+                    "checker": checker_container,
+                    "response": response_container
                 }
                 
-                # Run async with dynamic status updates
-                all_states, final_state = asyncio.run(
-                    stream_agent_live(initial_state, config, containers, status_text)
-                )
+                # Run on the shared loop with dynamic status updates
+                all_states, final_state = stream_agent_live(initial_state, config, containers, status_text)
                 
                 # Update status widget
                 status_widget.update(label="✅ Complete!", state="complete")
@@ -226,13 +291,14 @@ if query:
                     final_answer = "⚠️ No answer generated. Please try again."
                     logger.warning("No draft_answer found in any state")
                 
-                with response_container:
-                    st.markdown("### 📝 Final Answer")
-                    st.markdown(final_answer)
+                response_container.markdown(f"### 📝 Final Answer\n\n{final_answer}")
                 
                 # Add to memory
                 st.session_state.messages.append(AIMessage(content=final_answer))
                 
+                if answer_cache and final_state:
+                    answer_cache.store(query, final_answer, final_state.get("validation_status", ""), history)
+                
             except Exception as e:
                 status_widget.update(label="❌ Error occurred", state="error")
                 st.error(f"❌ **Error:** {str(e)}")
@@ -3,18 +3,24 @@ Educational Research Agent - Main Entry Point
 """
 
 import sys
+import time
+import uuid
 import logging
 from pathlib import Path
+from typing import Any, Dict, Optional
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent))
 
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
 
 from src.config import settings
-from src.agents.graph import build_graph
+from src.agents.answer_cache import get_answer_cache
+from src.agents.graph import build_graph, record_cached_turn
 from src.agents.state import AgentState
+from src.agents.streaming import DraftStream, stream_run
 from src.tools.validator import validator
 
 # Setup logging
@@ -24,6 +30,66 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def _print_progress(node: str, update: Dict[str, Any], elapsed: float):
+    """One progress line per finished graph node."""
+    if node == "planner":
+        print(f"Planner drafted a research plan ({elapsed:.1f}s)")
+    elif node == "researcher":
+        tool_calls = sum(1 for step in update.get("agent_steps", []) if step["type"] == "tool_call")
+        print(f"Researcher wrote draft {update.get('iteration', 0)} "
+              f"using {tool_calls} tool calls ({elapsed:.1f}s)")
+    elif node == "checker":
+        status = update.get("validation_status", "UNKNOWN")
+        print(f"Checker validation: {status} ({elapsed:.1f}s)")
+        if status == "INVALID":
+            print(f"   Critique: {update.get('critique', '')[:100]}...")
+
+
+def run_query(agent, initial_state: AgentState, config: RunnableConfig,
+              draft: Optional[DraftStream] = None) -> Dict[str, Any]:
+    """
+    Run the graph once, printing progress as each node finishes and the
+    researcher's draft as it is written.
+    
+    Args:
+        agent: Compiled graph from build_graph()
+        initial_state: Input state for this question
+        config: Run config carrying the conversation's thread_id
+        draft: Receives the streamed draft text (optional)
+        
+    Returns:
+        The final graph state
+    """
+    final_state: Dict[str, Any] = {}
+    start = last = time.perf_counter()
+    first_token: Optional[float] = None
+    mid_line = False
+    
+    for kind, payload in stream_run(agent, initial_state, config, draft):
+        if kind == "state":
+            final_state = payload
+        elif kind == "draft":
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            print("\n--- Draft (provisional, not yet validated) ---")
+        elif kind == "token":
+            print(payload, end="", flush=True)
+            mid_line = not payload.endswith("\n")
+        elif kind == "node":
+            if mid_line:
+                print()
+                mid_line = False
+            now = time.perf_counter()
+            _print_progress(*payload, now - last)
+            last = now
+    
+    timings = f"Total: {time.perf_counter() - start:.1f}s"
+    if first_token is not None:
+        timings += f", first draft token: {first_token:.1f}s"
+    print(timings)
+    return final_state
+
+
 def run_agent():
     """Run the interactive agent loop."""
     load_dotenv()
@@ -40,6 +106,10 @@ def run_agent():
     except Exception as e:
         logger.error(f"Failed to build agent: {e}")
         return
+    
+    # One checkpointer thread per CLI session keeps the conversation history
+    config: RunnableConfig = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    history = []
 
     while True:
         try:
@@ -57,9 +127,24 @@ def run_agent():
                 print(f"BLOCKED: {safety_result['reason']}")
                 continue
                 
+            # 2. Answer Cache (validated answers to near-identical questions)
+            answer_cache = get_answer_cache()
+            cached = answer_cache.lookup(query, history) if answer_cache else None
+            if cached:
+                print(f"Answered from cache (similar to: \"{cached.query}\")")
+                print("\n" + "="*40)
+                print("FINAL ANSWER")
+                print("="*40)
+                print(cached.answer)
+                print("="*40 + "\n")
+                # Cached turns are part of the conversation too
+                record_cached_turn(agent, config, query, cached.answer)
+                history.append(query)
+                continue
+                
             print("Query Safe. Starting Research...\n")
             
-            # 2. Run Agent Workflow
+            # 3. Run Agent Workflow
             initial_state: AgentState = {
                 "query": query,
                 "messages": [HumanMessage(content=query)],
@@ -71,29 +156,23 @@ def run_agent():
                 "iteration": 0
             }
             
-            # Stream events to show progress
-            for event in agent.stream(initial_state):
-                for key, value in event.items():
-                    if key == "retrieve":
-                        print(f"Retrieved {len(value.get('retrieved_docs', []))} document contexts.")
-                    elif key == "maker":
-                        print("Maker generated a draft.")
-                    elif key == "checker":
-                        status = value.get("validation_status", "UNKNOWN")
-                        print(f"Checker validation: {status}")
-                        if status == "INVALID":
-                            print(f"   Critique: {value.get('critique')[:100]}...")
-            
-            # 3. Get Final Result (need to fetch final state)
-            # Since stream returns intermediate steps, we can just run invoke to get final state
-            final_state = agent.invoke(initial_state)
+            draft = DraftStream()
+            final_state = run_query(agent, initial_state, config, draft)
             
             print("\n" + "="*40)
             print("FINAL ANSWER")
             print("="*40)
-            print(final_state["draft_answer"])
+            if draft.text and draft.text.strip() == final_state["draft_answer"].strip():
+                # Already on screen; only its status changes
+                print(f"The last draft above is final ({final_state.get('validation_status', 'UNKNOWN')}).")
+            else:
+                print(final_state["draft_answer"])
             print("="*40 + "\n")
             
+            if answer_cache:
+                answer_cache.store(query, final_state["draft_answer"], final_state.get("validation_status", ""), history)
+            history.append(query)
+            
         except KeyboardInterrupt:
             break
         except Exception as e:
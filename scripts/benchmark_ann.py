@@ -0,0 +1,118 @@
+"""
+Benchmark ANN index types against exact (flat) search.
+
+Reports recall@k versus the flat baseline, p50/p95/p99 single-query latency,
+build time and serialized index size for Flat, HNSW, IVF and IVF-PQ.
+
+Run with: uv run python scripts/benchmark_ann.py
+          uv run python scripts/benchmark_ann.py --from-index   # use the built knowledge base
+          uv run python scripts/benchmark_ann.py --num-vectors 1000000 --dim 768
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.knowledge.index_factory import build_index, reconstruct_all, set_search_params
+
+
+def synthetic_vectors(num_vectors: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Clustered Gaussian data (closer to real embeddings than uniform noise)."""
+    rng = np.random.default_rng(seed)
+    num_clusters = max(1, num_vectors // 500)
+    centers = rng.standard_normal((num_clusters, dim)).astype(np.float32)
+    assignments = rng.integers(0, num_clusters, num_vectors)
+    vectors = centers[assignments] + 0.3 * rng.standard_normal((num_vectors, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def knowledge_base_vectors() -> np.ndarray:
+    """Vectors stored in the built knowledge base index."""
+    from src.config import settings
+    from src.knowledge.vector_store import INDEX_FILE, resolve_index_dir
+
+    index = faiss.read_index(str(resolve_index_dir(settings.vector_store_dir) / INDEX_FILE))
+    return reconstruct_all(index)
+
+
+def benchmark(name: str, index: faiss.Index, queries: np.ndarray, ground_truth: np.ndarray,
+              k: int, build_seconds: float) -> dict:
+    latencies = []
+    hits = 0
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, ids = index.search(queries[i:i + 1], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(set(ids[0]) & set(ground_truth[i]))
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "name": name,
+        "recall": hits / (len(queries) * k),
+        "p50": p50,
+        "p95": p95,
+        "p99": p99,
+        "build_s": build_seconds,
+        "size_mb": faiss.serialize_index(index).nbytes / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare FAISS index types")
+    parser.add_argument("--from-index", action="store_true", help="Use the knowledge base vectors")
+    parser.add_argument("--num-vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--num-queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 16, 64])
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--pq-m", type=int, default=16)
+    args = parser.parse_args()
+
+    vectors = knowledge_base_vectors() if args.from_index else synthetic_vectors(args.num_vectors, args.dim)
+    rng = np.random.default_rng(1)
+    # Queries: perturbed stored vectors, so each has meaningful neighbours
+    queries = vectors[rng.choice(len(vectors), args.num_queries)]
+    queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, k={args.k}\n")
+
+    start = time.perf_counter()
+    flat = build_index(vectors, "flat")
+    flat_build = time.perf_counter() - start
+    _, ground_truth = flat.search(queries, args.k)
+
+    results = [benchmark("flat", flat, queries, ground_truth, args.k, flat_build)]
+    configs = [
+        ("hnsw", {"hnsw_m": args.hnsw_m}, "ef_search", args.ef_search),
+        ("ivf", {"nlist": args.nlist}, "nprobe", args.nprobe),
+        ("ivfpq", {"nlist": args.nlist, "pq_m": args.pq_m}, "nprobe", args.nprobe),
+    ]
+    for index_type, build_kwargs, param, values in configs:
+        start = time.perf_counter()
+        index = build_index(vectors, index_type, **build_kwargs)
+        build_seconds = time.perf_counter() - start
+        for value in values:
+            set_search_params(index, **{param: value})
+            name = f"{index_type} ({param}={value})"
+            results.append(benchmark(name, index, queries, ground_truth, args.k, build_seconds))
+
+    header = f"{'index':<24}{'recall@' + str(args.k):>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'build s':>9}{'size MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['name']:<24}{r['recall']:>10.3f}{r['p50']:>9.3f}{r['p95']:>9.3f}"
+            f"{r['p99']:>9.3f}{r['build_s']:>9.1f}{r['size_mb']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
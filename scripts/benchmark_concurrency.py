@@ -0,0 +1,112 @@
+"""
+Benchmark concurrent knowledge base searches.
+
+Compares throughput of VectorStoreManager.similarity_search (shared read
+lock, query embedding outside the lock) against the previous model where one
+global mutex wrapped the embedding call and the search, for increasing
+numbers of threads. Query embedding is simulated with a fixed latency so no
+API calls are made.
+
+Run with: uv run python scripts/benchmark_concurrency.py
+          uv run python scripts/benchmark_concurrency.py --num-vectors 200000 --embed-latency-ms 0
+"""
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import settings
+from src.knowledge.vector_store import VectorStoreManager
+
+
+class SimulatedEmbeddings(Embeddings):
+    """Random unit vectors after a fixed delay standing in for the API round trip."""
+
+    def __init__(self, dim: int, latency: float):
+        self.dim = dim
+        self.latency = latency
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.latency:
+            time.sleep(self.latency)
+        vector = np.random.default_rng(abs(hash(text))).standard_normal(self.dim)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+
+def run(search, queries: List[str], threads: int) -> float:
+    """Queries per second with `threads` workers."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(search, queries))
+    return len(queries) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure search throughput under concurrency")
+    parser.add_argument("--num-vectors", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--num-queries", type=int, default=400)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--embed-latency-ms", type=float, default=20.0)
+    parser.add_argument("--omp-threads", type=int, default=1,
+                        help="FAISS OpenMP threads per search (1 avoids oversubscription)")
+    args = parser.parse_args()
+
+    faiss.omp_set_num_threads(args.omp_threads)
+    # Every query must reach the embedder and the index
+    settings.query_cache_size = 0
+    # Self-contained: no Gemini client, no on-disk embedding cache
+    settings.embedding_cache_enabled = False
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.num_vectors, args.dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    embeddings = SimulatedEmbeddings(args.dim, args.embed_latency_ms / 1000)
+
+    manager = VectorStoreManager(embeddings=embeddings)
+    manager.vector_store = FAISS.from_embeddings(
+        [(f"chunk {i}", v) for i, v in enumerate(vectors.tolist())], embeddings
+    )
+    queries = [f"query {i}" for i in range(args.num_queries)]
+
+    mutex = threading.Lock()
+
+    def exclusive_search(query: str):
+        # Previous behaviour: embedding and search serialized behind one lock
+        with mutex:
+            manager.vector_store.similarity_search(query, k=args.k)
+
+    def shared_search(query: str):
+        manager.similarity_search(query, k=args.k)
+
+    print(
+        f"{args.num_vectors} vectors x {args.dim} dims, {args.num_queries} queries, "
+        f"embed latency {args.embed_latency_ms:.0f} ms\n"
+    )
+    header = f"{'threads':>8}{'mutex q/s':>12}{'rwlock q/s':>12}{'speedup':>9}"
+    print(header)
+    print("-" * len(header))
+    for threads in args.threads:
+        exclusive = run(exclusive_search, queries, threads)
+        shared = run(shared_search, queries, threads)
+        print(f"{threads:>8}{exclusive:>12.1f}{shared:>12.1f}{shared / exclusive:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
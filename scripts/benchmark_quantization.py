@@ -0,0 +1,90 @@
+"""
+Benchmark embedding truncation and scalar quantization against full vectors.
+
+For each (dimensions, quantization) pair, reports recall@k versus exact
+search over the full-dimension float32 vectors, bytes per stored vector and
+serialized index size.
+
+Run with: uv run python scripts/benchmark_quantization.py
+          uv run python scripts/benchmark_quantization.py --from-index   # use the built knowledge base
+          uv run python scripts/benchmark_quantization.py --dims 3072 1536 768 256
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.knowledge.embeddings import truncate_vectors
+from src.knowledge.index_factory import QUANTIZATIONS, build_index, reconstruct_all
+
+
+def synthetic_vectors(num_vectors: int, dim: int, seed: int = 0) -> np.ndarray:
+    """
+    Clustered data whose variance decays along the dimensions, mimicking
+    Matryoshka embeddings where the leading components carry most signal.
+    """
+    rng = np.random.default_rng(seed)
+    num_clusters = max(1, num_vectors // 500)
+    scale = (1.0 / np.sqrt(1.0 + np.arange(dim) / 64.0)).astype(np.float32)
+    centers = rng.standard_normal((num_clusters, dim)).astype(np.float32) * scale
+    assignments = rng.integers(0, num_clusters, num_vectors)
+    noise = 0.3 * rng.standard_normal((num_vectors, dim)).astype(np.float32) * scale
+    vectors = centers[assignments] + noise
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def knowledge_base_vectors() -> np.ndarray:
+    """Vectors stored in the built knowledge base index."""
+    from src.config import settings
+    from src.knowledge.vector_store import INDEX_FILE, resolve_index_dir
+
+    index = faiss.read_index(str(resolve_index_dir(settings.vector_store_dir) / INDEX_FILE))
+    return reconstruct_all(index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare embedding dimensions and quantization")
+    parser.add_argument("--from-index", action="store_true", help="Use the knowledge base vectors")
+    parser.add_argument("--num-vectors", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=3072)
+    parser.add_argument("--dims", type=int, nargs="+", default=[3072, 1536, 768, 256])
+    parser.add_argument("--num-queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    vectors = knowledge_base_vectors() if args.from_index else synthetic_vectors(args.num_vectors, args.dim)
+    full_dim = vectors.shape[1]
+    rng = np.random.default_rng(1)
+    # Queries: perturbed stored vectors, so each has meaningful neighbours
+    queries = vectors[rng.choice(len(vectors), args.num_queries)]
+    queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    print(f"{len(vectors)} vectors x {full_dim} dims, {len(queries)} queries, k={args.k}\n")
+
+    _, ground_truth = build_index(vectors, "flat").search(queries, args.k)
+
+    header = f"{'dims':>6}{'quantization':>14}{'recall@' + str(args.k):>10}{'bytes/vec':>11}{'size MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for dims in sorted({d for d in args.dims if d <= full_dim}, reverse=True):
+        stored = truncate_vectors(vectors, dims) if dims < full_dim else vectors
+        query_vectors = truncate_vectors(queries, dims) if dims < full_dim else queries
+        for quantization in QUANTIZATIONS:
+            index = build_index(stored, "flat", quantization=quantization)
+            _, ids = index.search(query_vectors, args.k)
+            hits = sum(len(set(ids[i]) & set(ground_truth[i])) for i in range(len(queries)))
+            size = faiss.serialize_index(index).nbytes
+            print(
+                f"{dims:>6}{quantization:>14}{hits / (len(queries) * args.k):>10.3f}"
+                f"{size / len(stored):>11.0f}{size / 1e6:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
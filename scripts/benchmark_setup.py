@@ -0,0 +1,96 @@
+"""
+Benchmark per-request setup overhead in the agent nodes.
+
+Compares building the researcher agent, the checker prompt chain and a
+separate validator LLM client on every request (previous behaviour) with
+reusing the shared instances. No API calls are made; only construction
+is timed.
+
+Run with: uv run python scripts/benchmark_setup.py
+          uv run python scripts/benchmark_setup.py --requests 50
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from langchain.agents import create_agent
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import settings
+from src.agents import nodes
+from src.agents.tool_execution import get_tool_middleware
+from src.llm import get_llm
+from src.prompts import META_SYSTEM_PROMPT
+
+
+def per_request_setup():
+    """What one request constructed before: agent, checker chain, validator client."""
+    llm = ChatGoogleGenerativeAI(
+        model=settings.gemini_model,
+        google_api_key=settings.google_api_key,
+        temperature=0,
+    )
+    create_agent(
+        model=get_llm(),
+        tools=[nodes.search_knowledge_base, nodes.search_knowledge_base_batch,
+               nodes.search_web, nodes.search_academic],
+        system_prompt=META_SYSTEM_PROMPT,
+        middleware=[get_tool_middleware()],
+    )
+    checker_prompt = ChatPromptTemplate.from_messages([
+        ("system", "You are an academic editor validating research answers. Be constructive but thorough."),
+        ("user", "{user_input}")
+    ])
+    return checker_prompt | llm
+
+
+def shared_setup():
+    """What one request looks up now."""
+    get_llm(temperature=0)
+    nodes.get_researcher_agent()
+    return nodes.get_checker_chain()
+
+
+def time_ms(setup: Callable, requests: int) -> List[float]:
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        setup()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-request agent setup cost")
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    # Warm imports and the shared instances so only per-request work is timed
+    per_request_setup()
+    shared_setup()
+
+    print(f"{args.requests} requests\n")
+    header = f"{'setup':<14}{'mean ms':>10}{'p95 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    results = {}
+    for name, setup in [("per-request", per_request_setup), ("shared", shared_setup)]:
+        samples = sorted(time_ms(setup, args.requests))
+        results[name] = statistics.mean(samples)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        print(f"{name:<14}{results[name]:>10.2f}{p95:>10.2f}")
+
+    saved = results["per-request"] - results["shared"]
+    print(f"\nSaved per request: {saved:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
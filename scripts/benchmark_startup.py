@@ -0,0 +1,71 @@
+"""
+Benchmark cold import time of the agent entry points.
+
+Imports each target in a fresh interpreter with `python -X importtime`,
+reports the median wall time over several runs and lists the modules with
+the largest cumulative import time, so regressions in startup (eager
+client construction, heavy top-level imports) are easy to spot.
+
+Run with: uv run python scripts/benchmark_startup.py
+          uv run python scripts/benchmark_startup.py --targets main src.tools --top 15
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+DEFAULT_TARGETS = ["src.config", "src.tools", "src.agents.graph", "main"]
+
+
+def import_once(target: str) -> Tuple[float, List[Tuple[int, int, str]]]:
+    """Wall seconds and (self us, cumulative us, module) rows for one cold import."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        rows.append((int(self_us), int(cumulative_us), module.rstrip()))
+    return elapsed, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile cold import time of entry points")
+    parser.add_argument("--targets", nargs="+", default=DEFAULT_TARGETS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10,
+                        help="Slowest modules to list for the last target")
+    args = parser.parse_args()
+
+    header = f"{'target':<20}{'median s':>10}{'min s':>10}"
+    print(header)
+    print("-" * len(header))
+    rows = []
+    for target in args.targets:
+        times = []
+        for _ in range(args.runs):
+            elapsed, rows = import_once(target)
+            times.append(elapsed)
+        print(f"{target:<20}{statistics.median(times):>10.2f}{min(times):>10.2f}")
+
+    print(f"\nSlowest imports under {args.targets[-1]} (cumulative ms):")
+    for _, cumulative_us, module in sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>10.1f}  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,27 @@
 Build knowledge base from educational research papers.
 
 Run with: uv run python scripts/build_knowledge_base.py
+
+By default only papers that were added, changed or removed since the last
+build (according to the manifest) are re-embedded. Pass --full to rebuild
+the whole index from scratch, or --stream for a bounded-memory full rebuild
+that checkpoints as it goes and resumes after an interruption.
 """
 
+import argparse
 import logging
 import sys
+from collections import Counter
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.config import settings
+from src.knowledge.embeddings import embedding_signature
+from src.knowledge.ingest import StreamingIngestor
 from src.knowledge.loader import DocumentLoader
+from src.knowledge.manifest import KnowledgeBaseManifest, chunk_ids_for
 from src.knowledge.vector_store import VectorStoreManager
 
 # Setup logging
@@ -23,7 +33,83 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def build_knowledge_base():
+def _index_papers(loader, vector_manager, manifest, pdf_files, replace_index: bool):
+    """Load, chunk and embed the given papers, recording them in the manifest."""
+    documents = loader.load_files(
+        pdf_files,
+        num_workers=settings.ingest_workers,
+        start_chunk_id=manifest.next_chunk_id,
+    )
+    if not documents:
+        return documents
+    
+    slowest = sorted(loader.file_timings.items(), key=lambda item: item[1], reverse=True)[:3]
+    for name, elapsed in slowest:
+        logger.info(f"  slowest: {name} ({elapsed:.2f}s)")
+    
+    # load_files returns chunks grouped by paper in pdf_files order
+    counts = Counter(doc.metadata.get("source") for doc in documents)
+    ids = []
+    for pdf_path in pdf_files:
+        source_ids = chunk_ids_for(pdf_path.name, counts.get(pdf_path.name, 0))
+        ids.extend(source_ids)
+        manifest.record_file(
+            pdf_path,
+            source_ids,
+            chunk_size=settings.chunk_size,
+            chunk_overlap=settings.chunk_overlap,
+            embedding_model=_embedding_signature(),
+        )
+    
+    if replace_index:
+        vector_manager.create(documents, ids=ids)
+    else:
+        vector_manager.add_documents(documents, ids=ids)
+    
+    manifest.next_chunk_id += len(documents)
+    return documents
+
+
+def _embedding_signature() -> str:
+    """Model plus truncation, recorded per paper so a change forces re-embedding."""
+    return embedding_signature(settings.embedding_model, settings.embedding_dimensions)
+
+
+def stream_knowledge_base(resume: bool = True):
+    """Rebuild the whole index with the streaming, checkpointed pipeline."""
+    pdf_files = sorted(settings.papers_dir.glob("*.pdf"))
+    if not pdf_files:
+        logger.error(f"No PDF files found in {settings.papers_dir}")
+        return
+    
+    logger.info(f"Streaming {len(pdf_files)} PDF files")
+    logger.info(f"Window size: {settings.ingest_window_size} chunks")
+    logger.info(f"Checkpoint every: {settings.ingest_checkpoint_every} windows")
+    
+    ingestor = StreamingIngestor(
+        DocumentLoader(chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap),
+        VectorStoreManager(),
+        embedding_model=_embedding_signature(),
+        work_dir=settings.vector_store_dir.with_name(settings.vector_store_dir.name + ".partial"),
+        window_size=settings.ingest_window_size,
+        checkpoint_every=settings.ingest_checkpoint_every,
+    )
+    
+    try:
+        manifest = ingestor.run(pdf_files, resume=resume)
+    except Exception as e:
+        logger.error(f"Streaming build interrupted: {e}")
+        logger.error("Re-run with --stream to resume from the last checkpoint")
+        return
+    
+    ingestor.finalize(settings.vector_store_dir, settings.manifest_path)
+    ingestor.manager.build_keyword_index()
+    total_chunks = sum(len(entry["chunk_ids"]) for entry in manifest.files.values())
+    logger.info(f"Indexed {total_chunks} chunks from {len(manifest.files)} papers")
+    logger.info("KNOWLEDGE BASE READY!")
+
+
+def build_knowledge_base(full_rebuild: bool = False):
     """Build vector store from PDF papers."""
     
     logger.info("=" * 60)
@@ -37,7 +123,7 @@ def build_knowledge_base():
         return
     
     # Count PDFs
-    pdf_files = list(settings.papers_dir.glob("*.pdf"))
+    pdf_files = sorted(settings.papers_dir.glob("*.pdf"))
     if not pdf_files:
         logger.error(f"No PDF files found in {settings.papers_dir}")
         logger.error("Run 'python scripts/download_papers.py' first")
@@ -46,42 +132,96 @@ def build_knowledge_base():
     logger.info(f"Found {len(pdf_files)} PDF files")
     logger.info(f"Chunk size: {settings.chunk_size}")
     logger.info(f"Chunk overlap: {settings.chunk_overlap}")
+    logger.info(f"Ingest workers: {settings.ingest_workers}")
     logger.info("")
     
-    # Step 1: Load and chunk documents
-    logger.info("Step 1/3: Loading and chunking documents...")
     loader = DocumentLoader(
         chunk_size=settings.chunk_size,
         chunk_overlap=settings.chunk_overlap,
     )
+    vector_manager = VectorStoreManager()
     
-    documents = loader.load_directory(settings.papers_dir)
-    
-    if not documents:
-        logger.error("No documents loaded. Check PDF files.")
-        return
+    manifest = None if full_rebuild else KnowledgeBaseManifest.load(settings.manifest_path)
+    if manifest is not None and any(
+        entry.get("embedding_model") != _embedding_signature() for entry in manifest.files.values()
+    ):
+        # Vectors of a different model or dimension cannot share an index
+        logger.info("Embedding model or dimensions changed. Performing a full rebuild.")
+        manifest = None
+        full_rebuild = True
+    if manifest is not None and not settings.vector_store_dir.exists():
+        # Unchanged papers would be missing from an index built from the diff alone
+        logger.warning("Manifest found but the index is missing. Performing a full rebuild.")
+        manifest = None
+        full_rebuild = True
+    if manifest is not None:
+        vector_manager.load_or_create(writable=True)
+        if vector_manager.vector_store is None:
+            logger.warning("Existing index could not be loaded. Falling back to a full rebuild.")
+            manifest = None
+    elif manifest is None and not full_rebuild:
+        logger.info("No manifest found. Performing a full rebuild.")
     
-    logger.info(f"Loaded and chunked {len(documents)} document segments")
+    # Step 1: Work out what needs (re-)embedding
+    logger.info("Step 1/3: Comparing papers against the manifest...")
+    if manifest is None:
+        manifest = KnowledgeBaseManifest(settings.manifest_path)
+        to_index = pdf_files
+        replace_index = True
+    else:
+        diff = manifest.diff(
+            pdf_files,
+            chunk_size=settings.chunk_size,
+            chunk_overlap=settings.chunk_overlap,
+            embedding_model=_embedding_signature(),
+        )
+        logger.info(
+            f"Added: {len(diff.added)}, changed: {len(diff.changed)}, "
+            f"removed: {len(diff.removed)}, unchanged: {len(diff.unchanged)}"
+        )
+        if not diff.has_changes:
+            if not vector_manager.index_matches_settings():
+                logger.info("Index type or quantization changed. Re-indexing stored vectors.")
+                vector_manager.save()
+            if settings.hybrid_search and vector_manager.keyword_index is None:
+                vector_manager.build_keyword_index()
+            logger.info("Knowledge base is already up to date.")
+            return
+        
+        # Drop stale vectors for changed and removed papers
+        stale_ids = []
+        for name in diff.removed + [p.name for p in diff.changed]:
+            stale_ids.extend(manifest.chunk_ids(name))
+            manifest.remove_file(name)
+        vector_manager.delete(stale_ids)
+        
+        to_index = diff.added + diff.changed
+        replace_index = False
     logger.info("")
     
-    # Step 2: Create vector store
-    logger.info("Step 2/3: Creating vector store with Gemini embeddings...")
+    # Step 2: Load, chunk and embed
+    logger.info(f"Step 2/3: Loading, chunking and embedding {len(to_index)} papers...")
     logger.info("(This may take a few minutes...)")
     
-    vector_manager = VectorStoreManager()
-    
     try:
-        vector_manager.load_or_create(documents)
-        logger.info("Vector store created")
-        logger.info("")
+        documents = _index_papers(loader, vector_manager, manifest, to_index, replace_index)
     except Exception as e:
         logger.error(f"Error creating vector store: {e}")
         logger.error("Check your GOOGLE_API_KEY in .env file")
         return
     
-    # Step 3: Save vector store
-    logger.info("Step 3/3: Saving vector store to disk...")
+    if replace_index and not documents:
+        logger.error("No documents loaded. Check PDF files.")
+        return
+    
+    logger.info(f"Embedded {len(documents)} document segments")
+    logger.info("")
+    
+    # Step 3: Save vector store and manifest
+    logger.info("Step 3/3: Saving vector store and keyword index to disk...")
     vector_manager.save()
+    vector_manager.build_keyword_index()
+    manifest.save()
     logger.info("Vector store saved")
     logger.info("")
     
@@ -89,17 +229,16 @@ def build_knowledge_base():
     logger.info("=" * 60)
     logger.info("KNOWLEDGE BASE STATISTICS")
     logger.info("=" * 60)
-    logger.info(f"Total documents: {len(documents)}")
+    total_chunks = sum(len(entry["chunk_ids"]) for entry in manifest.files.values())
+    logger.info(f"Total documents: {total_chunks}")
     
-    # Get unique sources
-    sources = set(doc.metadata.get('source', 'Unknown') for doc in documents)
+    sources = sorted(manifest.files)
     logger.info(f"Unique papers: {len(sources)}")
     logger.info(f"Storage location: {settings.vector_store_dir}")
     logger.info("")
     logger.info("Papers included:")
-    for source in sorted(sources)[:10]:  # Show first 10
-        source_name = Path(source).name if source != 'Unknown' else source
-        logger.info(f"  - {source_name}")
+    for source in sources[:10]:  # Show first 10
+        logger.info(f"  - {source}")
     if len(sources) > 10:
         logger.info(f"  ... and {len(sources) - 10} more")
     logger.info("")
@@ -109,4 +248,24 @@ def build_knowledge_base():
 
 
 if __name__ == "__main__":
-    build_knowledge_base()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the manifest and rebuild the whole index",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Bounded-memory full rebuild with checkpoints (resumes if interrupted)",
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="With --stream, discard any existing checkpoint",
+    )
+    args = parser.parse_args()
+    if args.stream:
+        stream_knowledge_base(resume=not args.no_resume)
+    else:
+        build_knowledge_base(full_rebuild=args.full)
@@ -1,5 +1,12 @@
 """Agent workflow module."""
 
-from .graph import build_graph
+
+def __getattr__(name):
+    # Deferred so importing answer_cache or state does not build the graph modules
+    if name == "build_graph":
+        from .graph import build_graph
+        return build_graph
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ["build_graph"]
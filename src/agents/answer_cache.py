@@ -0,0 +1,182 @@
+"""Semantic cache of validated answers, checked before running the graph."""
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from src.config import settings
+from src.tools.retriever import get_vector_manager
+
+logger = logging.getLogger(__name__)
+
+# Queries that lean on the conversation ("tell me more about that") cannot be
+# answered from a cache keyed on the query text alone
+_FOLLOW_UP_PATTERN = re.compile(
+    r"\b(that|those|it|its|they|them|these|this one|above|previous(ly)?|earlier|again|"
+    r"you (said|mentioned)|more (about|on|detail)|elaborate|expand|summari[sz]e|"
+    r"our (chat|conversation|discussion)|what about|how about|why (is|was) that)\b",
+    re.IGNORECASE,
+)
+_SHORT_QUERY_WORDS = 4
+
+
+def is_follow_up(query: str, history: Sequence = ()) -> bool:
+    """Whether a query depends on earlier turns of the conversation."""
+    if not history:
+        return False
+    return len(query.split()) <= _SHORT_QUERY_WORDS or bool(_FOLLOW_UP_PATTERN.search(query))
+
+
+@dataclass
+class CachedAnswer:
+    """A validated answer and the question it answered."""
+
+    query: str
+    answer: str
+    kb_version: str
+    created_at: float
+    last_hit: float
+    similarity: float = 1.0
+
+
+class SemanticAnswerCache:
+    """
+    Small in-memory vector index of previously validated answers.
+
+    A new question hits when its embedding has cosine similarity of at least
+    `threshold` with a cached question that was answered against the same
+    knowledge base version. Entries expire after `ttl` seconds and the least
+    recently hit entries are evicted beyond `max_entries`.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], List[float]],
+        kb_version: Callable[[], str],
+        threshold: float = 0.95,
+        ttl: float = 86400.0,
+        max_entries: int = 500,
+    ):
+        self._embed = embed
+        self._kb_version = kb_version
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: List[CachedAnswer] = []
+        self._vectors: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _embed_normalized(self, query: str) -> np.ndarray:
+        vector = np.asarray(self._embed(query), dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def _drop(self, keep: List[int]):
+        """Keep only the entries at `keep` (lock held)."""
+        self._entries = [self._entries[i] for i in keep]
+        self._vectors = self._vectors[keep] if keep else None
+
+    def _expire(self, now: float, kb_version: str):
+        """Remove expired entries and answers from other KB versions (lock held)."""
+        keep = [
+            i for i, entry in enumerate(self._entries)
+            if now - entry.created_at < self.ttl and entry.kb_version == kb_version
+        ]
+        if len(keep) != len(self._entries):
+            self._drop(keep)
+
+    def lookup(self, query: str, history: Sequence = ()) -> Optional[CachedAnswer]:
+        """
+        Return a cached answer for a near-identical question, if any.
+
+        Args:
+            query: The incoming question
+            history: Earlier conversation turns; follow-ups always miss
+
+        Returns:
+            The matching entry (with `similarity` set), or None
+        """
+        if is_follow_up(query, history):
+            return None
+        try:
+            vector = self._embed_normalized(query)
+            kb_version = self._kb_version()
+        except Exception as e:
+            logger.warning(f"Answer cache lookup skipped: {e}")
+            return None
+
+        with self._lock:
+            now = time.time()
+            self._expire(now, kb_version)
+            if self._vectors is None:
+                self.misses += 1
+                return None
+            similarities = self._vectors @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+            entry = self._entries[best]
+            entry.last_hit = now
+            entry.similarity = float(similarities[best])
+            self.hits += 1
+        logger.info(f"Answer cache hit ({entry.similarity:.3f}) for: '{query[:50]}'")
+        return entry
+
+    def store(self, query: str, answer: str, validation_status: str, history: Sequence = ()):
+        """Cache a final answer if the checker validated it and it stands alone."""
+        if validation_status != "VALID" or not answer.strip() or is_follow_up(query, history):
+            return
+        try:
+            vector = self._embed_normalized(query)
+            kb_version = self._kb_version()
+        except Exception as e:
+            logger.warning(f"Answer cache store skipped: {e}")
+            return
+
+        with self._lock:
+            now = time.time()
+            self._expire(now, kb_version)
+            entry = CachedAnswer(query, answer, kb_version, created_at=now, last_hit=now)
+            self._entries.append(entry)
+            row = vector[np.newaxis, :]
+            self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+            if len(self._entries) > self.max_entries:
+                by_recency = sorted(range(len(self._entries)), key=lambda i: self._entries[i].last_hit)
+                self._drop(sorted(by_recency[len(self._entries) - self.max_entries:]))
+
+    def clear(self):
+        with self._lock:
+            self._entries = []
+            self._vectors = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_answer_cache: Optional[SemanticAnswerCache] = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> Optional[SemanticAnswerCache]:
+    """Shared cache keyed on the knowledge base embeddings (None if disabled)."""
+    global _answer_cache
+    if not settings.answer_cache_enabled:
+        return None
+    with _answer_cache_lock:
+        if _answer_cache is None:
+            manager = get_vector_manager()
+            _answer_cache = SemanticAnswerCache(
+                embed=manager.embed_query,
+                kb_version=manager.index_version,
+                threshold=settings.answer_cache_threshold,
+                ttl=settings.answer_cache_ttl_seconds,
+                max_entries=settings.answer_cache_max_entries,
+            )
+        return _answer_cache
@@ -0,0 +1,439 @@
+"""Durable, bounded SQLite checkpointer for the agent graph."""
+
+import asyncio
+import logging
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Payloads smaller than this are stored uncompressed
+_COMPRESS_MIN_BYTES = 256
+_COMPRESSED_PREFIX = "zlib:"
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver[str]):
+    """
+    Checkpoint saver backed by one SQLite file.
+
+    Keeps at most `max_per_thread` checkpoints per thread and namespace
+    (older ones and their pending writes are deleted on each put), and a
+    background sweeper deletes threads idle for longer than `thread_ttl`
+    and returns freed pages to the OS. Serialized payloads are
+    zlib-compressed.
+
+    Pruning assumes every channel stores its full value in each checkpoint,
+    which holds for AgentState (no DeltaChannel).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_per_thread: int = 20,
+        thread_ttl: float = 7 * 86400.0,
+        vacuum_interval: float = 3600.0,
+        serde: Optional[SerializerProtocol] = None,
+    ):
+        super().__init__(serde=serde)
+        if max_per_thread < 1:
+            raise ValueError("max_per_thread must be at least 1")
+        self.path = Path(path)
+        self.max_per_thread = max_per_thread
+        self.thread_ttl = thread_ttl
+        self.vacuum_interval = vacuum_interval
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        # Must be set before the first table is created to take effect
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                parent_checkpoint_id TEXT,
+                type TEXT NOT NULL,
+                checkpoint BLOB NOT NULL,
+                metadata_type TEXT NOT NULL,
+                metadata BLOB NOT NULL,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE IF NOT EXISTS writes (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                channel TEXT NOT NULL,
+                type TEXT NOT NULL,
+                value BLOB NOT NULL,
+                task_path TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            CREATE TABLE IF NOT EXISTS threads (
+                thread_id TEXT PRIMARY KEY,
+                last_active REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_threads_last_active ON threads (last_active);
+            """
+        )
+        self._conn.commit()
+
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        if vacuum_interval > 0:
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="checkpoint-sweeper", daemon=True)
+            self._sweeper.start()
+
+    # --- Serialization ---
+
+    def _dumps(self, value: Any) -> Tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(value)
+        if len(data) >= _COMPRESS_MIN_BYTES:
+            return _COMPRESSED_PREFIX + type_, zlib.compress(data, 6)
+        return type_, data
+
+    def _loads(self, type_: str, data: bytes) -> Any:
+        if type_.startswith(_COMPRESSED_PREFIX):
+            return self.serde.loads_typed((type_[len(_COMPRESSED_PREFIX):], zlib.decompress(data)))
+        return self.serde.loads_typed((type_, data))
+
+    # --- Reads ---
+
+    def _pending_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Tuple[str, str, Any]]:
+        """Writes for a checkpoint in the order the graph applies them (lock held)."""
+        rows = self._conn.execute(
+            "SELECT task_id, idx, channel, type, value, task_path FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        rows.sort(key=lambda row: writes_sort_key(row[5], row[0], row[1]))
+        return [(task_id, channel, self._loads(type_, value)) for task_id, _, channel, type_, value, _ in rows]
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        """Build a CheckpointTuple from a checkpoints row (lock held)."""
+        checkpoint_id, parent_id, type_, checkpoint, metadata_type, metadata = row
+        return CheckpointTuple(
+            config={"configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }},
+            checkpoint=self._loads(type_, checkpoint),
+            metadata=self._loads(metadata_type, metadata),
+            parent_config=(
+                {"configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": parent_id,
+                }}
+                if parent_id else None
+            ),
+            pending_writes=self._pending_writes(thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """The requested checkpoint, or the thread's latest if no checkpoint_id is given."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is None:
+                return None
+            return self._to_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """Checkpoints newest first, optionally filtered by thread, namespace and metadata."""
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, "
+                f"checkpoint, metadata_type, metadata FROM checkpoints {where} "
+                "ORDER BY checkpoint_id DESC",
+                params,
+            ).fetchall()
+            results = []
+            for thread_id, checkpoint_ns, *row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                if filter:
+                    metadata = self._loads(row[4], row[5])
+                    if not all(metadata.get(key) == value for key, value in filter.items()):
+                        continue
+                results.append(self._to_tuple(thread_id, checkpoint_ns, tuple(row)))
+        yield from results
+
+    # --- Writes ---
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Store a checkpoint and drop the thread's checkpoints beyond the retention limit."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, data = self._dumps(checkpoint)
+        metadata_type, metadata_data = self._dumps(get_checkpoint_metadata(config, metadata))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, "
+                "parent_checkpoint_id, type, checkpoint, metadata_type, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                 type_, data, metadata_type, metadata_data),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO threads (thread_id, last_active) VALUES (?, ?)",
+                (thread_id, time.time()),
+            )
+            self._prune(thread_id, checkpoint_ns)
+            self._conn.commit()
+        return {"configurable": {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint["id"],
+        }}
+
+    def _prune(self, thread_id: str, checkpoint_ns: str):
+        """Delete all but the newest max_per_thread checkpoints and their writes (lock held)."""
+        stale = self._conn.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+            (thread_id, checkpoint_ns, self.max_per_thread),
+        ).fetchall()
+        if not stale:
+            return
+        keys = [(thread_id, checkpoint_ns, checkpoint_id) for (checkpoint_id,) in stale]
+        self._conn.executemany(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", keys
+        )
+        self._conn.executemany(
+            "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", keys
+        )
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Store a task's pending writes against a checkpoint."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # Special channels (errors, interrupts) overwrite; regular writes are kept once
+        verb = "INSERT OR REPLACE" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "INSERT OR IGNORE"
+        rows = [
+            (thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx),
+             channel, *self._dumps(value), task_path)
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                f"{verb} INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, "
+                "channel, type, value, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete every checkpoint and write of a thread."""
+        with self._lock:
+            for table in ("checkpoints", "writes", "threads"):
+                self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            self._conn.commit()
+
+    def get_next_version(self, current: Optional[str], channel: None = None) -> str:
+        # Same scheme as the built-in savers: sortable counter plus random suffix
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # --- Retention ---
+
+    def sweep(self) -> int:
+        """
+        Delete threads idle for longer than thread_ttl and release free pages.
+
+        Returns:
+            Number of threads deleted
+        """
+        cutoff = time.time() - self.thread_ttl
+        with self._lock:
+            idle = [row[0] for row in self._conn.execute(
+                "SELECT thread_id FROM threads WHERE last_active < ?", (cutoff,)
+            )]
+            for table in ("checkpoints", "writes", "threads"):
+                self._conn.executemany(f"DELETE FROM {table} WHERE thread_id = ?", [(t,) for t in idle])
+            self._conn.commit()
+            self._conn.execute("PRAGMA incremental_vacuum")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        if idle:
+            logger.info(f"Checkpointer removed {len(idle)} idle threads")
+        return len(idle)
+
+    def _sweep_loop(self):
+        while not self._stop.wait(self.vacuum_interval):
+            try:
+                self.sweep()
+            except sqlite3.Error as e:
+                logger.warning(f"Checkpoint sweep failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Row counts and database size."""
+        with self._lock:
+            threads, = self._conn.execute("SELECT COUNT(*) FROM threads").fetchone()
+            checkpoints, = self._conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()
+            writes, = self._conn.execute("SELECT COUNT(*) FROM writes").fetchone()
+            page_count, = self._conn.execute("PRAGMA page_count").fetchone()
+            page_size, = self._conn.execute("PRAGMA page_size").fetchone()
+        return {
+            "threads": threads,
+            "checkpoints": checkpoints,
+            "writes": writes,
+            "size_bytes": page_count * page_size,
+        }
+
+    def close(self):
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=5)
+        with self._lock:
+            self._conn.close()
+
+    # --- Async (SQLite calls are short; run them off the event loop) ---
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        results = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in results:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+_checkpointer: Optional[BaseCheckpointSaver] = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer() -> BaseCheckpointSaver:
+    """
+    Shared checkpointer for the configured backend.
+
+    "sqlite" persists conversations to settings.checkpoint_path with
+    retention limits; "memory" keeps them in process (tests, one-off runs).
+    Falls back to memory if the database cannot be opened.
+    """
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            if settings.checkpoint_backend == "sqlite":
+                try:
+                    _checkpointer = SQLiteCheckpointer(
+                        settings.checkpoint_path,
+                        max_per_thread=settings.checkpoint_max_per_thread,
+                        thread_ttl=settings.checkpoint_thread_ttl_seconds,
+                        vacuum_interval=settings.checkpoint_vacuum_interval_seconds,
+                    )
+                except (OSError, sqlite3.Error) as e:
+                    logger.warning(f"SQLite checkpointer unavailable, keeping state in memory: {e}")
+            if _checkpointer is None:
+                from langgraph.checkpoint.memory import MemorySaver
+                _checkpointer = MemorySaver()
+        return _checkpointer
@@ -1,11 +1,14 @@
 """LangGraph workflow definition."""
 
 from asyncio.log import logger
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import StateGraph, END
 
 from src.config import settings
 from src.agents.state import AgentState
-from src.agents.nodes import checker_node, planner_node, researcher_node
+from src.agents.checkpointer import get_checkpointer
+from src.agents.nodes import aresearcher_node, checker_node, planner_node, researcher_node
 
 def should_continue(state: AgentState) -> str:
     """Decide whether to continue refinement or end."""
@@ -26,12 +29,13 @@ def should_continue(state: AgentState) -> str:
     else:
         return "loop"
 
-def build_graph():
+def build_graph(checkpointer=None):
     workflow = StateGraph(AgentState)
     
     # Add Nodes
     workflow.add_node("planner", planner_node)
-    workflow.add_node("researcher", researcher_node)
+    # Sync runs (CLI) use researcher_node; astream runs (app) use the async tools
+    workflow.add_node("researcher", RunnableLambda(researcher_node, afunc=aresearcher_node))
     workflow.add_node("checker", checker_node)
     
     # Define Edges
@@ -49,8 +53,26 @@ def build_graph():
         }
     )
     
-    from langgraph.checkpoint.memory import MemorySaver
-    checkpointer = MemorySaver()
+    # Any LangGraph checkpoint saver can be passed; defaults to the configured backend
+    if checkpointer is None:
+        checkpointer = get_checkpointer()
     
     return workflow.compile(checkpointer=checkpointer)
 
+
+def record_cached_turn(agent, config: RunnableConfig, query: str, answer: str):
+    """
+    Write a turn answered from the answer cache into the conversation thread,
+    as if the graph had answered it, so follow-up questions see it.
+    """
+    agent.update_state(
+        config,
+        {
+            "query": query,
+            "messages": [HumanMessage(content=query), AIMessage(content=answer)],
+            "draft_answer": answer,
+            "validation_status": "VALID",  # Only validated answers are cached
+        },
+        # A validated checker update routes to END, so no node is left pending
+        as_node="checker",
+    )
@@ -3,30 +3,81 @@
 """Nodes for the LangGraph workflow."""
 
 import logging
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.agents import create_agent
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 
+from src.agents.prompt_budget import PromptBudgetMiddleware
+from src.agents.state import AgentState, split_summary
+from src.agents.streaming import message_text
+from src.agents.tool_execution import get_tool_middleware
 from src.config import settings
-from src.agents.state import AgentState
+from src.context_budget import ContextBudget, count_tokens
+from src.llm import get_llm
 from src.prompts import (
+    CHECKER_PROMPT,
     META_SYSTEM_PROMPT,
     PLANNER_PROMPT_WITH_HISTORY
 )
-from src.tools.retriever import search_knowledge_base
+from src.tools.retriever import search_knowledge_base, search_knowledge_base_batch
 from src.tools.web_search import search_web
 from src.tools.academic import search_academic
 
 logger = logging.getLogger(__name__)
 
-# Initialize LLM
-llm = ChatGoogleGenerativeAI(
-    model=settings.gemini_model,
-    google_api_key=settings.google_api_key,
-    temperature=settings.temperature,
-)
+# Chains and the compiled researcher agent are built on first use, then
+# reused by every session and iteration
+
+
+@lru_cache(maxsize=None)
+def get_planner_chain():
+    return PLANNER_PROMPT_WITH_HISTORY | get_llm()
+
+
+@lru_cache(maxsize=None)
+def get_checker_chain():
+    return CHECKER_PROMPT | get_llm()
+
+
+@lru_cache(maxsize=None)
+def get_researcher_agent():
+    """Compiled ReAct agent for the researcher (stateless, so safe to share)."""
+    tools = [search_knowledge_base, search_knowledge_base_batch, search_web, search_academic]
+    return create_agent(
+        model=get_llm(),
+        tools=tools,
+        system_prompt=META_SYSTEM_PROMPT,
+        middleware=[
+            get_tool_middleware(),
+            # Tool results pile up across ReAct turns; keep each model call in budget
+            PromptBudgetMiddleware(settings.researcher_prompt_tokens),
+        ],
+        # Each run is single-pass and never resumed; inheriting the graph's
+        # checkpointer would store it under a new namespace every turn
+        checkpointer=False,
+    )
+
+def format_history(messages: List[BaseMessage], limit: int, max_chars: Optional[int] = None) -> str:
+    """
+    Render the rolling summary (if any) followed by the last `limit` messages.
+
+    Args:
+        messages: Conversation messages, excluding the current query
+        limit: Number of recent messages to include verbatim
+        max_chars: Optional per-message truncation
+
+    Returns:
+        History text, or "" when there is no history
+    """
+    summary, recent = split_summary(messages)
+    lines = [summary] if summary else []
+    for m in recent[-limit:] if limit else []:
+        content = m.content if max_chars is None else m.content[:max_chars]
+        lines.append(f"{m.type.upper()}: {content}")
+    return "\n".join(lines)
+
 
 def planner_node(state: AgentState) -> Dict[str, Any]:
     """Break down complex queries or handle chat history."""
@@ -37,17 +88,10 @@ def planner_node(state: AgentState) -> Dict[str, Any]:
     
     # 1. Format History (Safe handling)
     # We take previous messages (excluding the current query which is the last one)
-    previous_messages = messages[:-1] if len(messages) > 0 else []
-    
-    if previous_messages:
-        # Take last 5 messages for context
-        history_str = "\n".join([f"{m.type.upper()}: {m.content}" for m in previous_messages[-5:]])
-    else:
-        history_str = "No previous conversation history."
+    history_str = format_history(messages[:-1], limit=5) or "No previous conversation history."
     
     # 3. Invoke LLM
-    chain = PLANNER_PROMPT_WITH_HISTORY | llm
-    response = chain.invoke({
+    response = get_planner_chain().invoke({
         "query": query,
         "history": history_str
     })
@@ -58,33 +102,21 @@ def planner_node(state: AgentState) -> Dict[str, Any]:
         "messages": [AIMessage(content=f"[PLAN] {plan}", name="planner")]
     }
 
-def researcher_node(state: AgentState) -> Dict[str, Any]:
-    """
-    Autonomous ReAct agent with conversation memory.
-    """
-    logger.info("Researcher Agent: Working with memory context...")
-    
-    tools = [search_knowledge_base, search_web, search_academic]
-    
-    agent = create_agent(
-        model=llm,
-        tools=tools,
-        system_prompt=META_SYSTEM_PROMPT,
-    )
-    
+def _researcher_prompt(state: AgentState) -> str:
+    """Build the researcher's task message from the plan, history and any critique."""
     query = state["query"]
     plan = state.get("plan", "")
     critique = state.get("critique", "")
     messages = state.get("messages", [])
-    iteration = state.get("iteration", 0)
+    
+    history_budget = ContextBudget("researcher_history", settings.researcher_history_tokens)
     
     # Return context-aware prompt with conversation history
     if critique:
         # Include conversation context when refining
-        recent_context = "\n".join([
-            f"{m.type}: {m.content[:200]}" 
-            for m in messages[-6:-1]  # Last 5 messages before current query
-        ]) if len(messages) > 1 else ""
+        # Last 5 messages before current query
+        recent_context = history_budget.fit(format_history(messages[:-1], limit=5, max_chars=200))
+        critique = ContextBudget("critique", settings.critique_tokens).fit(critique)
         
         user_message = (
             "Original Query: " + query + "\n\n"
@@ -94,10 +126,7 @@ def researcher_node(state: AgentState) -> Dict[str, Any]:
         )
     else:
         # Initial research with any relevant history
-        recent_context = "\n".join([
-            f"{m.type}: {m.content[:200]}" 
-            for m in messages[-6:-1]
-        ]) if len(messages) > 1 else ""
+        recent_context = history_budget.fit(format_history(messages[:-1], limit=5, max_chars=200))
         
         user_message = (
             "User Query: " + query + "\n\n"
@@ -108,66 +137,95 @@ def researcher_node(state: AgentState) -> Dict[str, Any]:
         
         user_message += (
             "Research Plan:\n" + plan + "\n\n"
-            "Execute this plan using your tools (search_knowledge_base, search_web). "
+            "Execute this plan using your tools (search_knowledge_base_batch for the plan's "
+            "search steps, then search_knowledge_base or search_web for follow-ups). "
             "Follow the response structure defined in your system prompt."
         )
     
-    logger.info(f"Researcher context includes {len(messages)} messages")
+    logger.info(f"Researcher context includes {len(messages)} messages "
+                f"({count_tokens(user_message)} prompt tokens)")
+    return user_message
+
+
+class _ResearchRun:
+    """Collects the agent's steps and final message from its `updates` stream."""
     
-    # Stream agent execution to capture steps
-    agent_steps = []
+    def __init__(self):
+        self.agent_steps: List[Dict[str, Any]] = []
+        self.final_message: Optional[BaseMessage] = None
     
-    for event in agent.stream({"messages": [{"role": "user", "content": user_message}]}):
+    def record(self, event: Dict[str, Any]):
         for key, value in event.items():
-            if key == "agent":
+            if not value:
+                continue
+            if key == "model":
                 message = value["messages"][-1]
-                agent_steps.append({
+                self.final_message = message
+                tool_names = [call["name"] for call in getattr(message, "tool_calls", [])]
+                self.agent_steps.append({
                     "type": "reasoning", 
-                    "content": message
+                    "content": (message_text(message) or f"Calling tools: {', '.join(tool_names)}")[:500]
                 })
                 
             elif key == "tools":
                 tool_calls = value.get("messages", [])
                 for tool_msg in tool_calls:
-                    agent_steps.append({
+                    self.agent_steps.append({
                         "type": "tool_call",
                         "tool": getattr(tool_msg, 'name', 'unknown'),
                         "result": str(tool_msg.content)[:200]
                     })
     
-    # Get final result
-    result = agent.invoke({
-        "messages": [HumanMessage(content=user_message)]
-    })
+    def result(self, iteration: int) -> Dict[str, Any]:
+        draft_text = message_text(self.final_message) if self.final_message is not None else ""
+        
+        # Return draft AND append to messages
+        return {
+            "draft_answer": draft_text,
+            "iteration": iteration + 1,
+            "agent_steps": self.agent_steps,
+            "messages": [AIMessage(content=f"[RESEARCH DRAFT {iteration + 1}] {draft_text[:200]}...", name="researcher")]
+        }
+
+
+def researcher_node(state: AgentState) -> Dict[str, Any]:
+    """
+    Autonomous ReAct agent with conversation memory.
+    """
+    logger.info("Researcher Agent: Working with memory context...")
     
-    final_message = result["messages"][-1]
+    agent = get_researcher_agent()
+    user_message = _researcher_prompt(state)
     
-    # Handle different content formats
-    if isinstance(final_message.content, list):
-        draft_text = ""
-        for block in final_message.content:
-            if isinstance(block, dict) and block.get("type") == "text":
-                draft_text += block.get("text", "")
-    elif isinstance(final_message.content, str):
-        draft_text = final_message.content
-    else:
-        draft_text = str(final_message.content)
+    # Single run: the steps and the final answer both come from the stream
+    run = _ResearchRun()
+    for event in agent.stream({"messages": [HumanMessage(content=user_message)]}):
+        run.record(event)
+    return run.result(state.get("iteration", 0))
+
+
+async def aresearcher_node(state: AgentState) -> Dict[str, Any]:
+    """
+    Async `researcher_node`, used when the graph is run with astream/ainvoke.
     
-    # Return draft AND append to messages
-    return {
-        "draft_answer": draft_text,
-        "iteration": iteration + 1,
-        "agent_steps": agent_steps,
-        "messages": [AIMessage(content=f"[RESEARCH DRAFT {iteration + 1}] {draft_text[:200]}...", name="researcher")]
-    }
+    Tools run through their coroutines, so searches share the event loop's
+    pooled HTTP client and in-flight cache entries instead of a thread each.
+    """
+    logger.info("Researcher Agent: Working with memory context (async)...")
+    
+    agent = get_researcher_agent()
+    user_message = _researcher_prompt(state)
+    
+    run = _ResearchRun()
+    async for event in agent.astream({"messages": [HumanMessage(content=user_message)]}):
+        run.record(event)
+    return run.result(state.get("iteration", 0))
 
 
 def checker_node(state: AgentState) -> Dict[str, Any]:
     """Validate the draft answer with context awareness."""
     logger.info("Checker: Validating answer...")
     
-    from langchain_core.prompts import ChatPromptTemplate
-    
     draft = state["draft_answer"]
     query = state["query"]
     iteration = state.get("iteration", 0)
@@ -189,6 +247,7 @@ def checker_node(state: AgentState) -> Dict[str, Any]:
             }
     
     # Build validation prompt
+    draft = ContextBudget("checker_draft", settings.checker_draft_tokens).fit(draft)
     user_message = (
         "Original Query: " + query + "\n\n"
         "Draft Answer:\n" + draft + "\n\n"
@@ -200,13 +259,7 @@ def checker_node(state: AgentState) -> Dict[str, Any]:
         "Output 'VALID' if acceptable, or provide a specific Critique with actionable feedback."
     )
     
-    CHECKER_PROMPT = ChatPromptTemplate.from_messages([
-        ("system", "You are an academic editor validating research answers. Be constructive but thorough."),
-        ("user", "{user_input}")
-    ])
-    
-    chain = CHECKER_PROMPT | llm
-    response = chain.invoke({"user_input": user_message})
+    response = get_checker_chain().invoke({"user_input": user_message})
     
     content = response.content if isinstance(response.content, str) else str(response.content)
     critique = content.strip()
@@ -0,0 +1,74 @@
+"""Token budget for every model call the researcher agent makes."""
+
+import json
+import logging
+from typing import Any, Awaitable, Callable, List
+
+from langchain.agents.middleware import AgentMiddleware, ModelRequest
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+from src.agents.streaming import message_text
+from src.context_budget import ContextBudget, count_tokens
+
+logger = logging.getLogger(__name__)
+
+OMITTED = "[Earlier tool result omitted to fit the context budget]"
+
+
+def _message_tokens(message: BaseMessage) -> int:
+    tokens = count_tokens(message_text(message))
+    if isinstance(message, AIMessage) and message.tool_calls:
+        tokens += count_tokens(json.dumps([call["args"] for call in message.tool_calls]))
+    return tokens
+
+
+class PromptBudgetMiddleware(AgentMiddleware):
+    """
+    Keeps each model input (system prompt, task and the ReAct transcript)
+    within `max_tokens`.
+
+    Tool results accumulate with every tool turn, so bounding each result
+    alone does not bound the prompt. Before each model call the results are
+    packed into whatever the rest of the prompt leaves free, newest first:
+    older results are truncated or replaced by a short placeholder. Nothing
+    is removed, so every tool call keeps its matching tool message, and the
+    agent's own state is not modified.
+    """
+
+    def __init__(self, max_tokens: int):
+        super().__init__()
+        self.max_tokens = max_tokens
+
+    def _fit(self, request: ModelRequest) -> ModelRequest:
+        messages = request.messages
+        tool_rows = [i for i, m in enumerate(messages) if isinstance(m, ToolMessage)]
+        if not tool_rows:
+            return request
+        fixed = count_tokens(request.system_prompt or "") + sum(
+            _message_tokens(m) for m in messages if not isinstance(m, ToolMessage)
+        )
+        # Every result keeps at least the placeholder
+        available = self.max_tokens - fixed - count_tokens(OMITTED) * len(tool_rows)
+        if available <= 0:
+            logger.warning(f"Researcher prompt needs {fixed} tokens before tool results "
+                           f"(budget {self.max_tokens})")
+        budget = ContextBudget("researcher_prompt", max(available, 0))
+        items = [message_text(messages[i]) for i in tool_rows]
+        # Newer results score higher: the agent is still acting on them
+        kept = budget.select(items, scores=list(range(len(items))), separator="")
+        if kept == items:
+            return request
+
+        fitted: List[BaseMessage] = list(messages)
+        for row, text, original in zip(tool_rows, kept, items):
+            if text != original:
+                fitted[row] = messages[row].model_copy(update={"content": text or OMITTED})
+        return request.override(messages=fitted)
+
+    def wrap_model_call(self, request: ModelRequest,
+                        handler: Callable[[ModelRequest], Any]) -> Any:
+        return handler(self._fit(request))
+
+    async def awrap_model_call(self, request: ModelRequest,
+                               handler: Callable[[ModelRequest], Awaitable[Any]]) -> Any:
+        return await handler(self._fit(request))
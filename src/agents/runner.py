@@ -0,0 +1,141 @@
+"""Shared background event loop that runs agent streams for many callers."""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class AgentRunner:
+    """
+    Runs async event streams on one long-lived event loop thread.
+
+    Callers on any thread (e.g. Streamlit script threads) iterate the
+    events synchronously while the work runs on the shared loop, so the
+    async HTTP clients and caches are reused instead of a new loop being
+    created per message. At most `max_concurrent` streams run at once;
+    the rest wait in a FIFO queue.
+    """
+
+    def __init__(self, max_concurrent: int = 8):
+        self.max_concurrent = max_concurrent
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="agent-runner", daemon=True
+        )
+        self._thread.start()
+        # Binds to the runner's loop on first use
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self._started = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def _produce(self, make_events: Callable[[], AsyncIterator[Any]], out: queue.Queue):
+        enqueued = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+        acquired = False
+        try:
+            async with self._semaphore:
+                acquired = True
+                waited = time.perf_counter() - enqueued
+                with self._lock:
+                    self.queued -= 1
+                    self.running += 1
+                    self._started += 1
+                    self._total_wait += waited
+                    self._max_wait = max(self._max_wait, waited)
+                try:
+                    async for event in make_events():
+                        out.put(event)
+                finally:
+                    with self._lock:
+                        self.running -= 1
+            with self._lock:
+                self.completed += 1
+        except asyncio.CancelledError:
+            # The caller stopped reading (e.g. a Streamlit rerun)
+            with self._lock:
+                if not acquired:
+                    self.queued -= 1
+                self.cancelled += 1
+            raise
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            out.put(_Failure(e))
+        finally:
+            out.put(_DONE)
+
+    def stream(self, make_events: Callable[[], AsyncIterator[Any]]) -> Iterator[Any]:
+        """
+        Run an async event stream on the shared loop and yield its events.
+
+        Args:
+            make_events: Called on the loop thread to create the stream
+
+        Raises:
+            Whatever the stream raised. Closing the iterator early cancels the run.
+        """
+        out: queue.Queue = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(self._produce(make_events, out), self._loop)
+        try:
+            while True:
+                item = out.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            future.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, active runs and wait times for a concurrency slot."""
+        with self._lock:
+            return {
+                "queued": self.queued,
+                "running": self.running,
+                "max_concurrent": self.max_concurrent,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "avg_wait_seconds": self._total_wait / self._started if self._started else 0.0,
+                "max_wait_seconds": self._max_wait,
+            }
+
+    def shutdown(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+_agent_runner: Optional[AgentRunner] = None
+_agent_runner_lock = threading.Lock()
+
+
+def get_agent_runner() -> AgentRunner:
+    """Process-wide runner shared by all sessions."""
+    global _agent_runner
+    with _agent_runner_lock:
+        if _agent_runner is None:
+            _agent_runner = AgentRunner(max_concurrent=settings.max_concurrent_runs)
+        return _agent_runner
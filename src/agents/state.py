@@ -1,26 +1,77 @@
 """State definition with memory."""
 
-import operator
-from typing import TypedDict, List, Annotated, Dict, Any
-from langchain_core.messages import BaseMessage
+from typing import TypedDict, List, Annotated, Dict, Any, Optional, Sequence, Tuple
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langgraph.graph.message import add_messages
+
+from src.config import settings
+
+SUMMARY_ID = "conversation-summary"
+
+
+def _summary_line(message: BaseMessage) -> Optional[str]:
+    """One line for the rolling summary; planner and checker bookkeeping is dropped."""
+    text = message.content if isinstance(message.content, str) else str(message.content)
+    text = " ".join(text.split())[:settings.summary_line_chars]
+    if isinstance(message, HumanMessage):
+        return f"- User asked: {text}"
+    if isinstance(message, AIMessage) and message.name in (None, "researcher"):
+        return f"- Answered: {text.removeprefix('[RESEARCH DRAFT ').split('] ', 1)[-1]}"
+    return None
+
+
+def split_summary(messages: Sequence[BaseMessage]) -> Tuple[str, List[BaseMessage]]:
+    """Separate the rolling summary (if any) from the recent message window."""
+    if messages and messages[0].id == SUMMARY_ID:
+        return messages[0].content, list(messages[1:])
+    return "", list(messages)
+
+
+def bounded_messages(left: Sequence[BaseMessage], right: Sequence[BaseMessage]) -> List[BaseMessage]:
+    """
+    Append messages (merging by id like add_messages) and keep only the last
+    `settings.message_window`. Older messages are folded into a summary
+    message at the front, itself capped at `settings.summary_max_lines`,
+    so state size stays constant however long the conversation runs.
+    """
+    merged = add_messages(list(left or []), list(right or []))
+    summary, recent = split_summary(merged)
+    overflow = len(recent) - settings.message_window
+    if overflow <= 0:
+        return merged
+
+    lines = summary.splitlines()[1:] if summary else []
+    lines += [line for line in map(_summary_line, recent[:overflow]) if line]
+    lines = lines[-settings.summary_max_lines:]
+    summary_message = SystemMessage(
+        content="Summary of earlier conversation:\n" + "\n".join(lines),
+        id=SUMMARY_ID,
+    )
+    return [summary_message] + recent[overflow:]
+
+
+def bounded_steps(left: List[Dict[str, Any]], right: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Each researcher run replaces the steps; only the last `settings.max_agent_steps` are kept."""
+    return list(right or [])[-settings.max_agent_steps:]
+
 
 class AgentState(TypedDict):
     # User input
     query: str
-    
+
     # Memory
-    # It tells LangGraph: "When a node returns 'messages', APPEND them to this list"
-    messages: Annotated[List[BaseMessage], operator.add]
-    
+    # Recent messages plus a rolling summary of older ones (see bounded_messages)
+    messages: Annotated[List[BaseMessage], bounded_messages]
+
     # Planning
     plan: str  # The decomposed steps
-    
+
     # Context data
     retrieved_docs: List[str]
-    
+
     # Generation & Validation
     draft_answer: str
     critique: str
     validation_status: str
     iteration: int
-    agent_steps: List[Dict[str, Any]]
+    agent_steps: Annotated[List[Dict[str, Any]], bounded_steps]
@@ -0,0 +1,99 @@
+"""Graph run events with token-level streaming of the researcher's draft."""
+
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from langchain_core.messages import AIMessageChunk
+from langchain_core.runnables import RunnableConfig
+
+# Top-level updates drive progress, values carry the final state, and
+# messages (from the researcher's nested agent too) carry LLM tokens
+STREAM_MODES = ["updates", "values", "messages"]
+
+RunEvent = Tuple[str, Any]
+
+
+def message_text(message) -> str:
+    """Text of a message whose content may be a string or a list of blocks."""
+    if isinstance(message.content, list):
+        return "".join(
+            block.get("text", "") for block in message.content
+            if isinstance(block, dict) and block.get("type") == "text"
+        )
+    if isinstance(message.content, str):
+        return message.content
+    return str(message.content)
+
+
+class DraftStream:
+    """
+    Turns raw graph stream chunks into run events.
+
+    Events are ("node", (name, update)) when a top-level node finishes,
+    ("state", values) after each step, ("draft", None) when the researcher
+    starts writing a new answer and ("token", text) for each piece of it.
+    Only text from the researcher's own model calls counts as draft; the
+    planner and checker are not streamed. The draft stays provisional until
+    the checker's update arrives.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._message_id: Optional[str] = None
+
+    def translate(self, namespace: Tuple[str, ...], mode: str, chunk: Any) -> Iterator[RunEvent]:
+        if mode == "messages":
+            message, metadata = chunk
+            if not (
+                namespace
+                and namespace[0].split(":")[0] == "researcher"
+                and metadata.get("langgraph_node") == "model"
+                and isinstance(message, AIMessageChunk)
+            ):
+                return
+            text = message_text(message)
+            if not text:
+                return
+            if message.id != self._message_id:
+                # A new model turn; text before tool calls is replaced by the next answer
+                self._message_id = message.id
+                self.text = ""
+                yield "draft", None
+            self.text += text
+            yield "token", text
+        elif namespace:
+            # Nested agent steps are reported through the researcher's agent_steps
+            return
+        elif mode == "updates":
+            for node, update in chunk.items():
+                yield "node", (node, update or {})
+        elif mode == "values":
+            yield "state", chunk
+
+
+def stream_run(agent, state: Dict[str, Any], config: RunnableConfig,
+               draft: Optional[DraftStream] = None) -> Iterator[RunEvent]:
+    """
+    Run the graph once, yielding progress, draft tokens and state.
+    
+    Args:
+        agent: Compiled graph from build_graph()
+        state: Input state for this question
+        config: Run config carrying the conversation's thread_id
+        draft: Accumulator for the streamed draft (a new one if omitted)
+    """
+    draft = draft or DraftStream()
+    for namespace, mode, chunk in agent.stream(
+        state, config=config, stream_mode=STREAM_MODES, subgraphs=True
+    ):
+        yield from draft.translate(namespace, mode, chunk)
+
+
+async def astream_run(agent, state: Dict[str, Any], config: RunnableConfig,
+                      draft: Optional[DraftStream] = None) -> AsyncIterator[RunEvent]:
+    """Async `stream_run`."""
+    draft = draft or DraftStream()
+    async for namespace, mode, chunk in agent.astream(
+        state, config=config, stream_mode=STREAM_MODES, subgraphs=True
+    ):
+        for event in draft.translate(namespace, mode, chunk):
+            yield event
@@ -0,0 +1,142 @@
+"""Bounded, time-limited execution of the researcher's tool calls."""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import weakref
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Optional
+
+from langchain.agents.middleware import AgentMiddleware, ToolCallRequest
+from langchain_core.messages import ToolMessage
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ToolConcurrencyMiddleware(AgentMiddleware):
+    """
+    Caps how many tool calls run at once and how long each may take.
+
+    The agent's tool node already dispatches all calls from one model turn
+    together (threads for sync runs, gather for async runs) and returns
+    their results in call order. This middleware bounds that fan-out and
+    turns a call that exceeds `timeout` into an error ToolMessage, so one
+    slow API costs at most `timeout` instead of stalling the turn.
+
+    The timeout starts once a call holds one of the `max_concurrency` slots,
+    so time spent queued behind other calls never counts against it. A
+    timed-out async call is cancelled. A sync call cannot be interrupted: it
+    runs on its own daemon thread, which is abandoned on timeout and gives
+    its slot back, so hung calls never starve later ones. At most `max_hung`
+    abandoned threads may still be running; beyond that, sync calls fail
+    fast instead of starting more threads.
+    """
+
+    def __init__(self, max_concurrency: int = 4, timeout: float = 30.0, max_hung: int = 8):
+        super().__init__()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_hung = max_hung
+        self.abandoned = 0  # Sync calls left running after timing out
+        self.hung = 0  # Abandoned calls whose threads have not finished yet
+        self._hung_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        # asyncio.Semaphore is bound to the loop it is first awaited on
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._semaphores_lock = threading.Lock()
+
+    def _timed_out(self, request: ToolCallRequest) -> ToolMessage:
+        name = request.tool_call["name"]
+        logger.warning(f"Tool {name} timed out after {self.timeout:.0f}s")
+        return ToolMessage(
+            content=f"⚠️ {name} timed out after {self.timeout:.0f}s. Use other sources.",
+            tool_call_id=request.tool_call["id"],
+            name=name,
+            status="error",
+        )
+
+    def _unavailable(self, request: ToolCallRequest) -> ToolMessage:
+        name = request.tool_call["name"]
+        logger.warning(f"Tool {name} not started: {self.hung} hung tool call(s) still running")
+        return ToolMessage(
+            content=f"⚠️ {name} is unavailable: earlier tool calls are still hung. Use other sources.",
+            tool_call_id=request.tool_call["id"],
+            name=name,
+            status="error",
+        )
+
+    def wrap_tool_call(self, request: ToolCallRequest,
+                       handler: Callable[[ToolCallRequest], Any]) -> Any:
+        if self.hung >= self.max_hung:
+            return self._unavailable(request)
+        with self._slots:
+            outcome: Future = Future()
+            # Copy context vars into the worker so callbacks and tracing still apply
+            context = contextvars.copy_context()
+            abandoned = False
+
+            def run():
+                nonlocal abandoned
+                outcome.set_running_or_notify_cancel()
+                try:
+                    outcome.set_result(context.run(handler, request))
+                except BaseException as e:
+                    outcome.set_exception(e)
+                finally:
+                    with self._hung_lock:
+                        if abandoned:
+                            self.hung -= 1
+
+            threading.Thread(target=run, name="tool-call", daemon=True).start()
+            try:
+                return outcome.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                with self._hung_lock:
+                    if outcome.done():
+                        # Finished while the timeout was being handled
+                        return outcome.result()
+                    abandoned = True
+                    self.abandoned += 1
+                    self.hung += 1
+                logger.warning(f"Abandoned {self.abandoned} hung tool call(s) so far, {self.hung} still running")
+                return self._timed_out(request)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._semaphores_lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._semaphores[loop] = semaphore
+            return semaphore
+
+    async def awrap_tool_call(self, request: ToolCallRequest,
+                              handler: Callable[[ToolCallRequest], Awaitable[Any]]) -> Any:
+        async with self._semaphore():
+            try:
+                return await asyncio.wait_for(handler(request), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                return self._timed_out(request)
+
+
+_tool_middleware: Optional[ToolConcurrencyMiddleware] = None
+_tool_middleware_lock = threading.Lock()
+
+
+def get_tool_middleware() -> ToolConcurrencyMiddleware:
+    """Shared middleware, so the concurrency bound holds across researcher runs."""
+    global _tool_middleware
+    with _tool_middleware_lock:
+        if _tool_middleware is None:
+            _tool_middleware = ToolConcurrencyMiddleware(
+                max_concurrency=settings.tool_max_concurrency,
+                timeout=settings.tool_timeout_seconds,
+                max_hung=settings.tool_max_hung,
+            )
+        return _tool_middleware
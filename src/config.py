@@ -2,6 +2,7 @@
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
+from typing import Literal, Optional
 
 
 # Get project root directory (parent of src/)
@@ -12,7 +13,7 @@ class Settings(BaseSettings):
     """Application settings loaded from .env file."""
     
     # API Keys
-    google_api_key: str
+    google_api_key: str = ""  # Required for Gemini calls, checked when a client is first built
     google_cse_id: str = ""  # For web search fallback
     google_search_api_key: str = ""  # For web search fallback
     
@@ -25,14 +26,95 @@ class Settings(BaseSettings):
     chunk_size: int = 800
     chunk_overlap: int = 100
     top_k_retrieval: int = 5
+    hybrid_search: bool = True  # Fuse BM25 keyword results with dense results
+    hybrid_candidates: int = 20  # Results taken from each retriever before fusion
+    bm25_k1: float = 1.5
+    bm25_b: float = 0.75
+    rrf_k: int = 60  # Reciprocal rank fusion damping constant
+    query_cache_size: int = 1024  # Query embeddings / search results kept in memory
+    query_cache_ttl_seconds: float = 3600.0
+    
+    # Semantic Answer Cache (validated answers to near-identical questions)
+    answer_cache_enabled: bool = True
+    answer_cache_threshold: float = 0.95  # Minimum cosine similarity for a hit
+    answer_cache_ttl_seconds: float = 86400.0
+    answer_cache_max_entries: int = 500
+    
+    # Vector Index Configuration
+    index_type: Literal["flat", "hnsw", "ivf", "ivfpq"] = "flat"
+    ivf_nlist: int = 1024  # IVF/IVF-PQ: number of clusters (reduced for small corpora)
+    ivf_nprobe: int = 16  # IVF/IVF-PQ: clusters scanned per query
+    hnsw_m: int = 32  # HNSW: graph neighbours per node
+    hnsw_ef_construction: int = 200  # HNSW: build-time search depth
+    hnsw_ef_search: int = 64  # HNSW: query-time search depth
+    pq_m: int = 16  # IVF-PQ: sub-quantizers (must divide the embedding dimension)
+    pq_nbits: int = 8  # IVF-PQ: bits per sub-quantizer code
+    embedding_dimensions: Optional[int] = None  # Truncate embeddings to this many dims (None = full)
+    vector_quantization: Literal["none", "fp16", "int8"] = "none"  # Scalar quantization of stored vectors
+    
+    # Ingestion Configuration
+    ingest_workers: int = 1  # Worker processes for PDF parsing/chunking
+    ingest_window_size: int = 256  # Chunks per embed/index window (streaming builds)
+    ingest_checkpoint_every: int = 4  # Windows between checkpoints (streaming builds)
+    
+    # Embedding Scheduler (index builds)
+    embed_batch_size: int = 100  # Texts per embedding request
+    embed_max_concurrency: int = 4  # Requests in flight
+    embed_requests_per_minute: int = 60  # 0 disables rate limiting
+    embed_max_retries: int = 5  # Retries on 429/5xx
+    
+    # Embedding Cache
+    embedding_cache_enabled: bool = True
+    embedding_cache_max_mb: int = 512
+    
+    # Tool Result Cache (web and ArXiv searches)
+    tool_cache_enabled: bool = True
+    tool_cache_max_mb: int = 64
+    web_cache_ttl_seconds: float = 86400.0  # 1 day
+    arxiv_cache_ttl_seconds: float = 604800.0  # 7 days
+    
+    # External HTTP APIs (async tools)
+    google_cse_base_url: str = "https://www.googleapis.com/customsearch/v1"
+    arxiv_api_url: str = "https://export.arxiv.org/api/query"
+    arxiv_min_interval_seconds: float = 3.0  # ArXiv asks for one request every 3 seconds
+    http_timeout_seconds: float = 10.0  # Per request
+    http_max_connections: int = 20  # Pooled keep-alive connections per event loop
     
     # Agent Configuration
     max_iterations: int = 3
+    tool_max_concurrency: int = 4  # Tool calls from one researcher turn run in parallel
+    tool_timeout_seconds: float = 30.0  # Per tool call
+    tool_max_hung: int = 8  # Timed-out sync tool threads still running before new calls fail fast
+    max_concurrent_runs: int = 8  # Agent runs in flight per app process; others queue
+    message_window: int = 12  # Recent messages kept verbatim in conversation state
+    summary_max_lines: int = 20  # Older turns folded into the rolling summary
+    summary_line_chars: int = 150  # Per summarized message
+    max_agent_steps: int = 30  # Reasoning/tool steps kept per research run
+    
+    # Context Budgets (approximate prompt tokens)
+    token_encoding: str = "cl100k_base"  # tiktoken encoding; chars/4 if unavailable
+    kb_context_tokens: int = 3000  # Knowledge base chunks per search call
+    web_context_tokens: int = 1500  # Web results per search call
+    academic_context_tokens: int = 2000  # ArXiv papers per search call
+    researcher_history_tokens: int = 800  # Conversation context in the researcher prompt
+    critique_tokens: int = 500  # Checker critique passed back to the researcher
+    checker_draft_tokens: int = 3000  # Draft sent to the checker
+    researcher_prompt_tokens: int = 12000  # Each researcher model call, tool results included
+    
+    # Conversation Checkpoints
+    checkpoint_backend: Literal["sqlite", "memory"] = "sqlite"
+    checkpoint_max_per_thread: int = 20  # Older checkpoints of a conversation are deleted
+    checkpoint_thread_ttl_seconds: float = 604800.0  # Conversations idle for 7 days are deleted
+    checkpoint_vacuum_interval_seconds: float = 3600.0  # How often idle threads are swept
     
     # Paths (relative to project root)
     data_dir: Path = PROJECT_ROOT / "data"
     papers_dir: Path = PROJECT_ROOT / "data" / "papers"
     vector_store_dir: Path = PROJECT_ROOT / "data" / "vector_store" / "faiss_index"
+    manifest_path: Path = PROJECT_ROOT / "data" / "vector_store" / "manifest.json"
+    embedding_cache_path: Path = PROJECT_ROOT / "data" / "vector_store" / "embedding_cache.sqlite"
+    tool_cache_path: Path = PROJECT_ROOT / "data" / "tool_cache.sqlite"
+    checkpoint_path: Path = PROJECT_ROOT / "data" / "checkpoints.sqlite"
     
     model_config = SettingsConfigDict(
         env_file=".env",
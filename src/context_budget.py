@@ -0,0 +1,115 @@
+"""Token counting and budgeted packing of prompt context."""
+
+import logging
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(name: str) -> Optional[Any]:
+    """tiktoken encoding, or None if tiktoken or its BPE file is unavailable (e.g. offline)."""
+    try:
+        # Deferred: loading an encoding reads (or downloads) its BPE ranks
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding '{name}' unavailable, estimating tokens as chars/4: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximate prompt tokens for `text`.
+
+    Gemini's tokenizer is not available locally; a BPE encoding tracks it
+    closely enough for budgeting, and chars/4 is the fallback.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(settings.token_encoding)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = " …[truncated]") -> str:
+    """Cut `text` to at most `max_tokens` (including the marker)."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    keep = max(max_tokens - count_tokens(marker), 0)
+    encoding = _get_encoding(settings.token_encoding)
+    if encoding is None:
+        return text[:keep * 4] + marker
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:keep]) + marker
+
+
+class ContextBudget:
+    """
+    Token budget for one section of a prompt.
+
+    `select` keeps the highest-scoring items that fit; the first item that
+    overflows is truncated into the remaining space if at least
+    `min_partial_tokens` are left, so the best evidence is never dropped
+    outright. Each call logs what it used.
+    """
+
+    def __init__(self, name: str, max_tokens: int, min_partial_tokens: int = 100):
+        self.name = name
+        self.max_tokens = max_tokens
+        self.min_partial_tokens = min_partial_tokens
+
+    def select(self, items: Sequence[str], scores: Optional[Sequence[float]] = None,
+               separator: str = "\n\n") -> List[Optional[str]]:
+        """
+        Fit items into the budget.
+
+        Args:
+            items: Candidate texts
+            scores: Higher is better (defaults to the given order)
+            separator: Text joining items, counted against the budget
+
+        Returns:
+            One entry per item, in the original order: the text to use
+            (possibly truncated), or None if it was dropped
+        """
+        if scores is None:
+            scores = [-i for i in range(len(items))]
+        order = sorted(range(len(items)), key=lambda i: scores[i], reverse=True)
+        separator_tokens = count_tokens(separator)
+
+        kept: List[Optional[str]] = [None] * len(items)
+        used = 0
+        for i in order:
+            cost = count_tokens(items[i]) + (separator_tokens if used else 0)
+            if used + cost <= self.max_tokens:
+                kept[i] = items[i]
+                used += cost
+                continue
+            remaining = self.max_tokens - used - (separator_tokens if used else 0)
+            if remaining >= self.min_partial_tokens:
+                kept[i] = truncate_to_tokens(items[i], remaining)
+                used += count_tokens(kept[i]) + (separator_tokens if used else 0)
+            break
+
+        total = sum(count_tokens(item) for item in items)
+        n_kept = sum(item is not None for item in kept)
+        logger.info(f"Context budget [{self.name}]: {used}/{self.max_tokens} tokens, "
+                    f"kept {n_kept}/{len(items)} items ({total} tokens offered)")
+        return kept
+
+    def pack(self, items: Sequence[str], scores: Optional[Sequence[float]] = None,
+             separator: str = "\n\n") -> str:
+        """`select`, joined in the original order."""
+        kept = self.select(items, scores, separator)
+        return separator.join(item for item in kept if item is not None)
+
+    def fit(self, text: str) -> str:
+        """Truncate a single text to the budget, logging its size."""
+        tokens = count_tokens(text)
+        logger.info(f"Context budget [{self.name}]: {min(tokens, self.max_tokens)}/{self.max_tokens} tokens"
+                    + (f" (truncated from {tokens})" if tokens > self.max_tokens else ""))
+        return truncate_to_tokens(text, self.max_tokens)
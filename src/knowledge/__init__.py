@@ -1,6 +1,24 @@
 """Knowledge base management for educational research papers."""
 
-from .loader import DocumentLoader
-from .vector_store import VectorStoreManager
+import importlib
 
-__all__ = ["DocumentLoader", "VectorStoreManager"]
+# Loaded on first access so lightweight submodules (bm25, query_cache) do
+# not import FAISS and the PDF loaders
+_LAZY_EXPORTS = {
+    "DocumentLoader": ".loader",
+    "KnowledgeBaseManifest": ".manifest",
+    "StreamingIngestor": ".ingest",
+    "VectorStoreManager": ".vector_store",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = ["DocumentLoader", "KnowledgeBaseManifest", "StreamingIngestor", "VectorStoreManager"]
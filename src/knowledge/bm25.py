@@ -0,0 +1,155 @@
+"""Compact BM25 inverted index for keyword retrieval over the knowledge base."""
+
+import logging
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# Written in the index directory; rows match the FAISS/docstore row order
+BM25_FILE = "bm25.npz"
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were which with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens, without common stopwords."""
+    return [t for t in _TOKEN_PATTERN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class BM25Index:
+    """
+    Inverted index in CSR form: for term id t, `rows[indptr[t]:indptr[t + 1]]`
+    are the docstore rows containing it and `tfs` their term frequencies.
+
+    Scoring a query touches only the posting lists of its terms and is
+    vectorized with numpy. k1 and b are applied at load time, so they can be
+    tuned without rebuilding.
+    """
+
+    def __init__(self, terms: np.ndarray, indptr: np.ndarray, rows: np.ndarray,
+                 tfs: np.ndarray, doc_lengths: np.ndarray, k1: float = 1.5, b: float = 0.75):
+        self.terms = terms
+        self.indptr = indptr
+        self.rows = rows
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self.vocab = {term: i for i, term in enumerate(terms.tolist())}
+
+        num_docs = len(doc_lengths)
+        doc_freqs = np.diff(indptr).astype(np.float32)
+        self.idf = np.log1p((num_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+        avg_length = float(doc_lengths.mean()) if num_docs else 1.0
+        self._length_norm = (k1 * (1 - b + b * doc_lengths / max(avg_length, 1e-9))).astype(np.float32)
+
+    @property
+    def num_docs(self) -> int:
+        return len(self.doc_lengths)
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """Index texts in order; the i-th text becomes row i."""
+        vocab: dict = {}
+        term_ids: List[int] = []
+        rows: List[int] = []
+        tfs: List[int] = []
+        doc_lengths: List[int] = []
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                rows.append(row)
+                tfs.append(tf)
+
+        term_ids_arr = np.asarray(term_ids, dtype=np.int64)
+        # Group postings by term; stable sort keeps rows ascending within a term
+        order = np.argsort(term_ids_arr, kind="stable")
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids_arr, minlength=len(vocab)), out=indptr[1:])
+        terms = np.asarray(list(vocab), dtype=str) if vocab else np.zeros(0, dtype="<U1")
+        return cls(
+            terms,
+            indptr,
+            np.asarray(rows, dtype=np.int32)[order],
+            np.asarray(tfs, dtype=np.float32)[order],
+            np.asarray(doc_lengths, dtype=np.float32),
+            k1=k1,
+            b=b,
+        )
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """Top-k (row, score) pairs for a query, best first."""
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        for term in set(tokenize(query)):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            rows = self.rows[start:end]
+            tfs = self.tfs[start:end]
+            # Rows are unique within a posting list, so fancy-index += is safe
+            scores[rows] += self.idf[term_id] * tfs * (self.k1 + 1) / (tfs + self._length_norm[rows])
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(row), float(scores[row])) for row in matched]
+
+    def save(self, directory: Path):
+        """Write the index as a single uncompressed, pickle-free .npz file."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = directory / f"{BM25_FILE}.tmp.npz"
+        np.savez(
+            tmp_path,
+            terms=self.terms,
+            indptr=self.indptr,
+            rows=self.rows,
+            tfs=self.tfs,
+            doc_lengths=self.doc_lengths,
+        )
+        tmp_path.replace(directory / BM25_FILE)
+        logger.info(f"BM25 index saved to {directory} ({len(self.terms)} terms, {self.num_docs} documents)")
+
+    @classmethod
+    def load(cls, directory: Path, k1: float = 1.5, b: float = 0.75) -> Optional["BM25Index"]:
+        """Load the index from `directory`, or None if it has not been built."""
+        path = Path(directory) / BM25_FILE
+        if not path.exists():
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["terms"], data["indptr"], data["rows"], data["tfs"], data["doc_lengths"],
+                k1=k1, b=b,
+            )
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Document]], k: int = 60,
+                           limit: Optional[int] = None) -> List[Document]:
+    """
+    Merge ranked document lists by reciprocal rank: score = sum 1 / (k + rank).
+
+    Documents are matched by `Document.id` (falling back to their content).
+    """
+    scores: dict = {}
+    docs: dict = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key: Hashable = doc.id or doc.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            docs.setdefault(key, doc)
+    fused = sorted(scores, key=scores.get, reverse=True)
+    return [docs[key] for key in fused[:limit]]
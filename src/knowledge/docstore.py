@@ -0,0 +1,152 @@
+"""Offset-indexed columnar docstore that is memory-mapped and read lazily."""
+
+import json
+import logging
+import mmap
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Tuple, Union
+
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# Column files written next to index.faiss
+TEXT_FILE = "docstore.text.bin"
+META_FILE = "docstore.meta.bin"
+IDS_FILE = "docstore.ids.bin"
+OFFSETS_FILE = "docstore.offsets.npy"
+_COLUMNS = (TEXT_FILE, META_FILE, IDS_FILE)
+DOCSTORE_FILES = _COLUMNS + (OFFSETS_FILE,)
+
+
+def has_columnar_docstore(directory: Path) -> bool:
+    """Whether `directory` contains a columnar docstore."""
+    return (Path(directory) / OFFSETS_FILE).exists()
+
+
+def write_columnar_docstore(directory: Path, rows: Iterable[Tuple[str, Document]]) -> int:
+    """
+    Write documents in FAISS row order as three UTF-8 columns (text, JSON
+    metadata, docstore id) plus an (n + 1, 3) int64 array of byte offsets.
+
+    Args:
+        directory: Target directory
+        rows: (docstore_id, document) pairs in index row order
+
+    Returns:
+        Number of rows written
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    offsets = [(0, 0, 0)]
+    handles = [open(directory / f"{name}.tmp", "wb") for name in _COLUMNS]
+    try:
+        for doc_id, doc in rows:
+            fields = (
+                doc.page_content.encode("utf-8"),
+                json.dumps(doc.metadata, ensure_ascii=False, default=str).encode("utf-8"),
+                doc_id.encode("utf-8"),
+            )
+            last = offsets[-1]
+            for handle, data in zip(handles, fields):
+                handle.write(data)
+            offsets.append(tuple(last[c] + len(fields[c]) for c in range(3)))
+    finally:
+        for handle in handles:
+            handle.close()
+
+    np.save(directory / f"{OFFSETS_FILE}.tmp.npy", np.asarray(offsets, dtype=np.int64))
+    for name in _COLUMNS:
+        (directory / f"{name}.tmp").replace(directory / name)
+    # Offsets go last: their presence marks the docstore as complete
+    (directory / f"{OFFSETS_FILE}.tmp.npy").replace(directory / OFFSETS_FILE)
+    return len(offsets) - 1
+
+
+class ColumnarDocstore(Docstore):
+    """
+    Read-only docstore backed by memory-mapped column files.
+
+    Nothing is decoded until a row is requested, so opening is constant time
+    and the pages are shared between processes through the OS page cache.
+    Keys are FAISS row numbers (as strings, see `RowKeys`); the original
+    docstore id is available as `Document.id`.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._offsets = np.load(self.directory / OFFSETS_FILE, mmap_mode="r")
+        self._maps = []
+        for name in _COLUMNS:
+            with open(self.directory / name, "rb") as f:
+                # mmap cannot map empty files
+                size = f.seek(0, 2)
+                self._maps.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b"")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def _field(self, row: int, column: int) -> str:
+        start = int(self._offsets[row, column])
+        end = int(self._offsets[row + 1, column])
+        return self._maps[column][start:end].decode("utf-8")
+
+    def get_row(self, row: int) -> Document:
+        """Decode the document stored at a FAISS row."""
+        return Document(
+            page_content=self._field(row, 0),
+            metadata=json.loads(self._field(row, 1)),
+            id=self._field(row, 2),
+        )
+
+    def doc_id(self, row: int) -> str:
+        """Original docstore id of a row."""
+        return self._field(row, 2)
+
+    def search(self, search: str) -> Union[str, Document]:
+        try:
+            row = int(search)
+        except ValueError:
+            return f"ID {search} not found."
+        if not 0 <= row < len(self):
+            return f"ID {search} not found."
+        return self.get_row(row)
+
+    def delete(self, ids):
+        raise NotImplementedError("ColumnarDocstore is read-only")
+
+    def iter_rows(self) -> Iterator[Tuple[str, Document]]:
+        """Yield (docstore_id, document) in row order."""
+        for row in range(len(self)):
+            doc = self.get_row(row)
+            yield doc.id, doc
+
+    def to_dicts(self) -> Tuple[Dict[str, Document], Dict[int, str]]:
+        """Materialize into the (docstore dict, index_to_docstore_id) pair FAISS uses."""
+        docs: Dict[str, Document] = {}
+        index_to_id: Dict[int, str] = {}
+        for row, (doc_id, doc) in enumerate(self.iter_rows()):
+            docs[doc_id] = doc
+            index_to_id[row] = doc_id
+        return docs, index_to_id
+
+
+class RowKeys(Mapping):
+    """Lazy index_to_docstore_id for ColumnarDocstore: row i maps to key "i"."""
+
+    def __init__(self, size: int):
+        self._size = size
+
+    def __getitem__(self, row: int) -> str:
+        if not 0 <= row < self._size:
+            raise KeyError(row)
+        return str(row)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self._size))
+
+    def __len__(self) -> int:
+        return self._size
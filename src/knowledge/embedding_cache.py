@@ -0,0 +1,197 @@
+"""Persistent on-disk cache for document embeddings."""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially re-wrapped chunks share a cache entry."""
+    return " ".join(text.split())
+
+
+def text_hash(text: str) -> str:
+    """Hash of the normalized text used as the cache key."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed vector cache keyed by (embedding model, text hash).
+
+    Vectors are stored as raw float32 blobs. When the total size exceeds
+    `max_bytes`, least recently used entries are evicted down to 90% of it.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 512 * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)"
+        )
+        self._conn.commit()
+        # Kept up to date by put_many/_evict; only scanned once, on open
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    def _stored_sizes(self, model: str, hashes: Sequence[str]) -> int:
+        """Total size of the vectors already stored for `hashes` (lock held)."""
+        total = 0
+        for start in range(0, len(hashes), 500):
+            batch = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            total += self._conn.execute(
+                f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings "
+                f"WHERE model = ? AND text_hash IN ({placeholders})",
+                [model, *batch],
+            ).fetchone()[0]
+        return total
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Look up vectors for texts; missing entries are returned as None."""
+        hashes = [text_hash(t) for t in texts]
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, h) for h in found],
+                )
+                self._conn.commit()
+
+            results = [found.get(h) for h in hashes]
+            hit_count = sum(1 for r in results if r is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """Store vectors for texts, evicting old entries if over the size limit."""
+        if not texts:
+            return
+        now = time.time()
+        # Last vector wins for repeated texts, as with INSERT OR REPLACE
+        by_hash = {
+            text_hash(t): np.asarray(v, dtype=np.float32).tobytes()
+            for t, v in zip(texts, vectors)
+        }
+        rows = [(model, h, blob, now) for h, blob in by_hash.items()]
+        with self._lock:
+            replaced = self._stored_sizes(model, list(by_hash))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._total_bytes += sum(len(blob) for blob in by_hash.values()) - replaced
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until under 90% of max_bytes (lock held)."""
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT rowid, LENGTH(vector) FROM embeddings ORDER BY last_access ASC"
+        )
+        to_delete = []
+        total = self._total_bytes
+        for rowid, size in rows:
+            if total <= target:
+                break
+            to_delete.append((rowid,))
+            total -= size
+        self._conn.executemany("DELETE FROM embeddings WHERE rowid = ?", to_delete)
+        self._conn.commit()
+        self._total_bytes = total
+        logger.info(f"Embedding cache evicted {len(to_delete)} entries ({total / 1e6:.1f} MB kept)")
+
+    @property
+    def size_bytes(self) -> int:
+        return self._total_bytes
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that serves document vectors from an EmbeddingCache.
+
+    Only documents are cached: query embeddings may use a different task
+    type and are passed straight through to the underlying model.
+    """
+
+    def __init__(self, underlying: Embeddings, cache: EmbeddingCache, model_name: str):
+        self.underlying = underlying
+        self.cache = cache
+        self.model_name = model_name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.cache.get_many(self.model_name, texts)
+        missing = [i for i, v in enumerate(vectors) if v is None]
+
+        if missing:
+            # Embed each distinct (normalized) missing text once
+            by_hash: Dict[str, str] = {}
+            for i in missing:
+                by_hash.setdefault(text_hash(texts[i]), texts[i])
+            unique_texts = list(by_hash.values())
+            new_vectors = self.underlying.embed_documents(unique_texts)
+            self.cache.put_many(self.model_name, unique_texts, new_vectors)
+            vector_by_hash = dict(zip(by_hash, new_vectors))
+            for i in missing:
+                vectors[i] = list(vector_by_hash[text_hash(texts[i])])
+
+        logger.info(
+            f"Embedding cache: {len(texts) - len(missing)}/{len(texts)} hits "
+            f"({self.cache.size_bytes / 1e6:.1f} MB on disk)"
+        )
+        return vectors  # type: ignore[return-value]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.underlying.embed_query(text)
@@ -0,0 +1,37 @@
+"""Embedding post-processing applied identically at build and query time."""
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+def truncate_vectors(vectors: Sequence[Sequence[float]], dimensions: int) -> np.ndarray:
+    """
+    Keep the leading `dimensions` components and re-normalize to unit length.
+
+    Gemini embeddings are Matryoshka-trained, so a prefix of the vector is
+    itself a usable (lower fidelity) embedding once re-normalized.
+    """
+    array = np.asarray(vectors, dtype=np.float32)[:, :dimensions]
+    norms = np.linalg.norm(array, axis=1, keepdims=True)
+    return array / np.maximum(norms, 1e-12)
+
+
+def embedding_signature(model: str, dimensions: Optional[int]) -> str:
+    """Identifier for how vectors were produced (model plus truncation)."""
+    return f"{model}@{dimensions}" if dimensions else model
+
+
+class TruncatedEmbeddings(Embeddings):
+    """Embeddings wrapper that truncates and re-normalizes every vector."""
+
+    def __init__(self, underlying: Embeddings, dimensions: int):
+        self.underlying = underlying
+        self.dimensions = dimensions
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return truncate_vectors(self.underlying.embed_documents(texts), self.dimensions).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return truncate_vectors([self.underlying.embed_query(text)], self.dimensions)[0].tolist()
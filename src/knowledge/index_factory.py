@@ -0,0 +1,198 @@
+"""FAISS index construction for the selectable ANN index types."""
+
+import logging
+import struct
+from pathlib import Path
+from typing import Optional
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("flat", "hnsw", "ivf", "ivfpq")
+QUANTIZATIONS = ("none", "fp16", "int8")
+
+# index_factory encodings for scalar quantization
+_SQ_CODES = {"fp16": "SQfp16", "int8": "SQ8"}
+_SQ_QTYPES = {
+    faiss.ScalarQuantizer.QT_fp16: "fp16",
+    faiss.ScalarQuantizer.QT_8bit: "int8",
+}
+
+# FAISS warns below ~39 training points per IVF centroid
+_MIN_POINTS_PER_CENTROID = 39
+# Training on more than this many points per centroid gives little benefit
+_MAX_POINTS_PER_CENTROID = 256
+
+
+def index_kind(index: faiss.Index) -> str:
+    """Classify a FAISS index as one of INDEX_TYPES."""
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf"
+    return "flat"
+
+
+def index_quantization(index: faiss.Index) -> str:
+    """Scalar quantization used by an index's stored vectors (one of QUANTIZATIONS)."""
+    if isinstance(index, faiss.IndexHNSW):
+        index = faiss.downcast_index(index.storage)
+    if isinstance(index, (faiss.IndexScalarQuantizer, faiss.IndexIVFScalarQuantizer)):
+        return _SQ_QTYPES.get(index.sq.qtype, "none")
+    return "none"
+
+
+def _largest_divisor_at_most(dim: int, limit: int) -> int:
+    for m in range(min(limit, dim), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def describe_index(
+    index_type: str,
+    dim: int,
+    num_vectors: int,
+    nlist: int = 1024,
+    hnsw_m: int = 32,
+    pq_m: int = 16,
+    pq_nbits: int = 8,
+    quantization: str = "none",
+) -> str:
+    """
+    FAISS index_factory description for an index type, with the parameters
+    clamped to what `num_vectors` training points and `dim` can support.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATIONS}")
+    # Encoding of the stored vectors for flat/HNSW/IVF
+    storage = _SQ_CODES.get(quantization, "Flat")
+
+    if index_type == "flat":
+        return storage
+    if index_type == "hnsw":
+        return f"HNSW{hnsw_m}" if storage == "Flat" else f"HNSW{hnsw_m},{storage}"
+
+    effective_nlist = max(1, min(nlist, num_vectors // _MIN_POINTS_PER_CENTROID))
+    if effective_nlist != nlist:
+        logger.warning(f"Only {num_vectors} vectors: reducing nlist from {nlist} to {effective_nlist}")
+    if index_type == "ivf":
+        return f"IVF{effective_nlist},{storage}"
+
+    if quantization != "none":
+        logger.warning("IVF-PQ already compresses vectors; ignoring scalar quantization")
+
+    if num_vectors < 2 ** pq_nbits:
+        logger.warning(f"Too few vectors ({num_vectors}) to train PQ; using IVF,Flat")
+        return f"IVF{effective_nlist},Flat"
+    m = _largest_divisor_at_most(dim, pq_m)
+    if m != pq_m:
+        logger.warning(f"pq_m={pq_m} does not divide dimension {dim}; using {m}")
+    return f"IVF{effective_nlist},PQ{m}x{pq_nbits}"
+
+
+def build_index(
+    vectors: np.ndarray,
+    index_type: str,
+    nlist: int = 1024,
+    hnsw_m: int = 32,
+    hnsw_ef_construction: int = 200,
+    pq_m: int = 16,
+    pq_nbits: int = 8,
+    quantization: str = "none",
+    seed: int = 0,
+) -> faiss.Index:
+    """
+    Build, train and fill an L2 index of the given type.
+
+    Vectors are added in order, so row i of the result is `vectors[i]` and
+    an existing index_to_docstore_id mapping stays valid.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    num_vectors, dim = vectors.shape
+    description = describe_index(
+        index_type, dim, num_vectors, nlist, hnsw_m, pq_m, pq_nbits, quantization
+    )
+    index = faiss.index_factory(dim, description, faiss.METRIC_L2)
+
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efConstruction = hnsw_ef_construction
+
+    if not index.is_trained:
+        if isinstance(index, faiss.IndexIVF):
+            sample_size = min(num_vectors, index.nlist * _MAX_POINTS_PER_CENTROID)
+        else:
+            # Scalar quantizer ranges need far fewer points than IVF centroids
+            sample_size = min(num_vectors, 100_000)
+        if sample_size < num_vectors:
+            rng = np.random.default_rng(seed)
+            sample = vectors[rng.choice(num_vectors, sample_size, replace=False)]
+        else:
+            sample = vectors
+        index.train(sample)
+
+    if num_vectors:
+        index.add(vectors)
+    logger.info(f"Built {description} index over {num_vectors} vectors")
+    return index
+
+
+def _flat_l2_header(dim: int, num_vectors: int) -> Optional[bytes]:
+    """
+    Serialized IndexFlatL2 header for `num_vectors` rows (the codes follow it),
+    or None if this FAISS build does not use the expected layout.
+    """
+    def header(n: int) -> bytes:
+        empty = faiss.serialize_index(faiss.IndexFlatL2(dim)).tobytes()
+        # fourcc and d, then ntotal; the code vector's length (in floats) ends the header
+        return empty[:8] + struct.pack("<q", n) + empty[16:-8] + struct.pack("<Q", n * dim)
+
+    probe = np.arange(2 * dim, dtype=np.float32).reshape(2, dim)
+    index = faiss.IndexFlatL2(dim)
+    index.add(probe)
+    if faiss.serialize_index(index).tobytes() != header(2) + probe.tobytes():
+        return None
+    return header(num_vectors)
+
+
+def write_flat_index(path: Path, vectors: np.ndarray, block_rows: int = 65536):
+    """
+    Write a flat L2 index over `vectors` (e.g. a memmap) block by block, so
+    the codes never have to fit in memory. Falls back to building the index
+    in memory if the serialized layout is not the one checked for.
+    """
+    num_vectors, dim = vectors.shape
+    header = _flat_l2_header(dim, num_vectors)
+    if header is None:
+        logger.warning("Unexpected flat index layout; building the index in memory")
+        faiss.write_index(build_index(vectors, "flat"), str(path))
+        return
+    with open(path, "wb") as f:
+        f.write(header)
+        for start in range(0, num_vectors, block_rows):
+            block = np.ascontiguousarray(vectors[start:start + block_rows], dtype=np.float32)
+            f.write(block.tobytes())
+
+
+def reconstruct_all(index: faiss.Index) -> np.ndarray:
+    """Return every stored vector in row order (approximate for PQ/SQ indexes)."""
+    if isinstance(index, faiss.IndexIVF):
+        index.make_direct_map()
+    if index.ntotal == 0:
+        return np.zeros((0, index.d), dtype=np.float32)
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def set_search_params(index: faiss.Index, nprobe: Optional[int] = None,
+                      ef_search: Optional[int] = None):
+    """Apply query-time tuning (IVF nprobe, HNSW efSearch) where relevant."""
+    if nprobe is not None and isinstance(index, faiss.IndexIVF):
+        index.nprobe = min(nprobe, index.nlist)
+    if ef_search is not None and isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
@@ -0,0 +1,303 @@
+"""Bounded-memory streaming ingestion: pages -> chunks -> embeddings -> on-disk shards -> index."""
+
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.knowledge.docstore import ColumnarDocstore, write_columnar_docstore
+from src.knowledge.loader import DocumentLoader
+from src.knowledge.manifest import KnowledgeBaseManifest, chunk_ids_for, file_sha256
+from src.knowledge.vector_store import VectorStoreManager
+
+logger = logging.getLogger(__name__)
+
+# Per-shard files: a columnar docstore plus these; the marker is written last
+SHARD_VECTORS = "vectors.npy"
+SHARD_MARKER = "shard.json"
+
+
+class StreamingIngestor:
+    """
+    Builds the index by streaming chunks through fixed-size windows.
+
+    Apart from the manifest's chunk ids, nothing held in memory grows with
+    the corpus: one PDF page, one window of chunks and the vectors embedded
+    since the last checkpoint are transient.
+    Every `checkpoint_every` windows those chunks are appended under
+    `work_dir` as a shard (a columnar docstore, its vectors and the ids
+    deleted since the previous shard), followed by a manifest of the work
+    done so far. An interrupted build resumes after the last shard.
+
+    `finalize` merges the shards from disk into the published index: rows
+    are streamed into the docstore and vectors into a memory-mapped file
+    the index is written from.
+    """
+
+    def __init__(
+        self,
+        loader: DocumentLoader,
+        manager: VectorStoreManager,
+        embedding_model: str,
+        work_dir: Path,
+        window_size: int = 256,
+        checkpoint_every: int = 4,
+    ):
+        self.loader = loader
+        self.manager = manager
+        self.embedding_model = embedding_model
+        self.work_dir = Path(work_dir)
+        self.window_size = max(1, window_size)
+        self.checkpoint_every = max(1, checkpoint_every)
+
+        self.manifest = KnowledgeBaseManifest(self.work_dir / "manifest.json")
+        self._window: List[Tuple[str, int, str, Document]] = []
+        self._finished: List[Tuple[Path, str, int]] = []
+        self._windows_since_checkpoint = 0
+        # Changes since the last checkpoint: added chunks (with their vectors) and deleted ids
+        self._pending: Dict[str, Tuple[Document, np.ndarray]] = {}
+        self._deleted: List[str] = []
+        self._shard_seq = 0
+
+    @property
+    def _shards_dir(self) -> Path:
+        return self.work_dir / "shards"
+
+    def _delete(self, ids: List[str]):
+        """Drop chunks from the pending window and record them for the next shard."""
+        if not ids:
+            return
+        for id_ in ids:
+            self._pending.pop(id_, None)
+        self._deleted.extend(ids)
+
+    def _committed_shards(self) -> List[Path]:
+        """Shard directories whose marker was written, in order; unfinished ones are removed."""
+        if not self._shards_dir.exists():
+            return []
+        shards = []
+        for shard in sorted(p for p in self._shards_dir.iterdir() if p.is_dir()):
+            if (shard / SHARD_MARKER).exists():
+                shards.append(shard)
+            else:
+                shutil.rmtree(shard, ignore_errors=True)
+        return shards
+
+    @staticmethod
+    def _live_rows(shards: List[Path]) -> Iterator[Tuple[int, int, str]]:
+        """
+        (shard position, row, chunk id) of every chunk not deleted by a later
+        shard, in order. Only deleted ids are held in memory.
+        """
+        deleted_at: Dict[str, int] = {}
+        for seq, shard in enumerate(shards):
+            for id_ in json.loads((shard / SHARD_MARKER).read_text(encoding="utf-8"))["deleted"]:
+                deleted_at[id_] = seq
+        for seq, shard in enumerate(shards):
+            docstore = ColumnarDocstore(shard)
+            for row in range(len(docstore)):
+                id_ = docstore.doc_id(row)
+                # A shard's deletions only apply to earlier shards
+                if deleted_at.get(id_, -1) <= seq:
+                    yield seq, row, id_
+
+    def _record(self, pdf_path: Path, sha256: str, count: int):
+        self.manifest.record_file(
+            pdf_path,
+            chunk_ids_for(pdf_path.name, count),
+            chunk_size=self.loader.chunk_size,
+            chunk_overlap=self.loader.chunk_overlap,
+            embedding_model=self.embedding_model,
+            sha256=sha256,
+        )
+
+    def _resume(self) -> Optional[dict]:
+        """Restore state from the last checkpoint; returns the in-progress file entry."""
+        manifest = KnowledgeBaseManifest.load(self.work_dir / "manifest.json")
+        if manifest is None or not self._shards_dir.exists():
+            return None
+
+        config = (self.loader.chunk_size, self.loader.chunk_overlap, self.embedding_model)
+        for entry in manifest.files.values():
+            if (entry["chunk_size"], entry["chunk_overlap"], entry["embedding_model"]) != config:
+                logger.warning("Checkpoint was made with a different config. Starting over.")
+                return None
+
+        shards = self._committed_shards()
+        if not shards:
+            return None
+        self._shard_seq = int(shards[-1].name) + 1
+
+        # Drop chunks written after the checkpoint was recorded
+        expected = set(manifest.all_chunk_ids())
+        live = 0
+        stale = []
+        for _, _, id_ in self._live_rows(shards):
+            live += 1
+            if id_ not in expected:
+                stale.append(id_)
+        self._delete(stale)
+
+        self.manifest = manifest
+        self.manifest.path = self.work_dir / "manifest.json"
+        logger.info(
+            f"Resuming from checkpoint: {len(manifest.files)} papers done, "
+            f"{live - len(stale)} chunks in {len(shards)} shards"
+        )
+        return manifest.in_progress
+
+    def _checkpoint(self):
+        """Append a shard with the changes since the last checkpoint, then save the manifest."""
+        if self._pending or self._deleted:
+            shard = self._shards_dir / f"{self._shard_seq:06d}"
+            shutil.rmtree(shard, ignore_errors=True)
+            ids = list(self._pending)
+            write_columnar_docstore(shard, ((id_, self._pending[id_][0]) for id_ in ids))
+            vectors = (np.stack([self._pending[id_][1] for id_ in ids]) if ids
+                       else np.zeros((0, 0), dtype=np.float32))
+            np.save(shard / SHARD_VECTORS, vectors)
+            # The marker is written last: a shard only counts once it exists
+            marker_tmp = shard / f"{SHARD_MARKER}.tmp"
+            marker_tmp.write_text(json.dumps({"deleted": self._deleted}), encoding="utf-8")
+            marker_tmp.replace(shard / SHARD_MARKER)
+            self._shard_seq += 1
+            logger.info(f"Checkpoint shard {shard.name}: {len(ids)} added, {len(self._deleted)} deleted")
+            self._pending = {}
+            self._deleted = []
+        self.manifest.save()
+        self._windows_since_checkpoint = 0
+
+    def _flush(self):
+        """Embed the current window, then mark fully read papers done."""
+        if self._window:
+            documents = [doc for _, _, _, doc in self._window]
+            vectors = self.manager.embed_documents([doc.page_content for doc in documents])
+            for (name, i, _, doc), vector in zip(self._window, vectors):
+                self._pending[f"{name}#{i}"] = (doc, vector)
+
+        for pdf_path, sha256, count in self._finished:
+            self._record(pdf_path, sha256, count)
+        self._finished.clear()
+
+        if self._window:
+            name, i, sha256, _ = self._window[-1]
+            if name in self.manifest.files:
+                self.manifest.in_progress = None
+            else:
+                self.manifest.in_progress = {"file": name, "sha256": sha256, "chunks_done": i + 1}
+        self._window = []
+
+        self._windows_since_checkpoint += 1
+        if self._windows_since_checkpoint >= self.checkpoint_every:
+            self._checkpoint()
+
+    def run(self, pdf_files: Sequence[Path], resume: bool = True) -> KnowledgeBaseManifest:
+        """
+        Stream all papers into checkpoint shards.
+
+        Args:
+            pdf_files: PDFs to index, in a stable order
+            resume: Continue from an existing checkpoint in work_dir
+
+        Returns:
+            Manifest describing the completed index (not yet saved to its final path)
+        """
+        in_progress = self._resume() if resume else None
+        if in_progress is None and not self.manifest.files:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            self._pending, self._deleted, self._shard_seq = {}, [], 0
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+
+        # Papers indexed before the interruption that have since been removed
+        names = {Path(p).name for p in pdf_files}
+        for name in [n for n in self.manifest.files if n not in names]:
+            self._delete(self.manifest.chunk_ids(name))
+            self.manifest.remove_file(name)
+        if in_progress and in_progress["file"] not in names:
+            self._delete(chunk_ids_for(in_progress["file"], in_progress["chunks_done"]))
+            in_progress = None
+
+        for pdf_path in pdf_files:
+            pdf_path = Path(pdf_path)
+            sha256 = file_sha256(pdf_path)
+            entry = self.manifest.files.get(pdf_path.name)
+            if entry and entry["sha256"] == sha256:
+                continue
+            if entry:
+                # Changed since it was checkpointed
+                self._delete(self.manifest.chunk_ids(pdf_path.name))
+                self.manifest.remove_file(pdf_path.name)
+
+            skip = 0
+            if in_progress and in_progress["file"] == pdf_path.name:
+                if in_progress["sha256"] == sha256:
+                    skip = in_progress["chunks_done"]
+                else:
+                    self._delete(chunk_ids_for(pdf_path.name, in_progress["chunks_done"]))
+
+            count = 0
+            for i, chunk in enumerate(self.loader.iter_pdf_chunks(pdf_path)):
+                count = i + 1
+                if i < skip:
+                    continue
+                chunk.metadata["chunk_id"] = self.manifest.next_chunk_id
+                self.manifest.next_chunk_id += 1
+                self._window.append((pdf_path.name, i, sha256, chunk))
+                if len(self._window) >= self.window_size:
+                    self._flush()
+
+            self._finished.append((pdf_path, sha256, count))
+            logger.info(f"Streamed {pdf_path.name}: {count} chunks")
+
+        if self._window or self._finished:
+            self._flush()
+        self.manifest.in_progress = None
+        if self._windows_since_checkpoint:
+            self._checkpoint()
+        return self.manifest
+
+    def finalize(self, index_path: Path, manifest_path: Path):
+        """
+        Merge the shards into the published index and manifest, then remove
+        the work dir. Rows and vectors are copied shard by shard from disk.
+        """
+        shards = self._committed_shards()
+        count = 0
+        dim = 0
+        for seq, _, _ in self._live_rows(shards):
+            count += 1
+            if not dim:
+                dim = np.load(shards[seq] / SHARD_VECTORS, mmap_mode="r").shape[1]
+        if not count:
+            logger.warning("No chunks were indexed; nothing to publish")
+        else:
+            vectors = np.lib.format.open_memmap(
+                self.work_dir / "vectors.npy", mode="w+", dtype=np.float32, shape=(count, dim)
+            )
+            # Only the current shard is open: live rows come in shard order
+            current, shard_vectors = -1, None
+            for out_row, (seq, row, _) in enumerate(self._live_rows(shards)):
+                if seq != current:
+                    current, shard_vectors = seq, np.load(shards[seq] / SHARD_VECTORS, mmap_mode="r")
+                vectors[out_row] = shard_vectors[row]
+            vectors.flush()
+            shard_vectors = None
+
+            def rows() -> Iterator[Tuple[str, Document]]:
+                current, docstore = -1, None
+                for seq, row, id_ in self._live_rows(shards):
+                    if seq != current:
+                        current, docstore = seq, ColumnarDocstore(shards[seq])
+                    doc = docstore.get_row(row)
+                    yield id_, Document(page_content=doc.page_content, metadata=doc.metadata)
+
+            self.manager.save_from_vectors(vectors, rows(), path=Path(index_path))
+            del vectors
+        self.manager.index_path = Path(index_path)
+        self.manifest.path = Path(manifest_path)
+        self.manifest.save()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
@@ -1,8 +1,10 @@
 """Document loading and chunking for educational research papers."""
 
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Sequence, Tuple
 import logging
+import time
 
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -11,6 +13,23 @@ from langchain_core.documents import Document
 logger = logging.getLogger(__name__)
 
 
+def _load_and_chunk_worker(args: Tuple[str, int, int]) -> Tuple[List[Document], int, float]:
+    """
+    Process-pool entry point: parse and chunk a single PDF.
+    
+    Kept at module level so it can be pickled by ProcessPoolExecutor.
+    
+    Args:
+        args: Tuple of (pdf_path, chunk_size, chunk_overlap)
+        
+    Returns:
+        Tuple of (chunks, page_count, elapsed_seconds)
+    """
+    pdf_path, chunk_size, chunk_overlap = args
+    loader = DocumentLoader(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return loader.load_and_chunk_pdf(Path(pdf_path))
+
+
 class DocumentLoader:
     """Load and chunk academic papers intelligently."""
     
@@ -25,6 +44,9 @@ class DocumentLoader:
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         
+        # Per-file processing time (seconds) from the last load
+        self.file_timings: Dict[str, float] = {}
+        
         # Separators that respect academic paper structure
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
@@ -66,6 +88,45 @@ class DocumentLoader:
             logger.error(f"Error loading {pdf_path.name}: {e}")
             return []
     
+    def iter_pdf_chunks(self, pdf_path: Path) -> Iterator[Document]:
+        """
+        Stream chunks from a PDF one page at a time.
+        
+        Produces the same chunks as `load_and_chunk_pdf` (the splitter works
+        per page) while holding only a single page in memory. Chunk ids are
+        left to the caller.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Yields:
+            Chunked Document objects in page order
+        """
+        try:
+            for page in PyPDFLoader(str(pdf_path)).lazy_load():
+                page.metadata["source"] = pdf_path.name
+                page.metadata["source_path"] = str(pdf_path)
+                for chunk in self.text_splitter.split_documents([page]):
+                    chunk.metadata["chunk_size"] = len(chunk.page_content)
+                    yield chunk
+        except Exception as e:
+            logger.error(f"Error streaming {pdf_path.name}: {e}")
+    
+    def load_and_chunk_pdf(self, pdf_path: Path) -> Tuple[List[Document], int, float]:
+        """
+        Load and chunk a single PDF without assigning chunk ids.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Returns:
+            Tuple of (chunks, page_count, elapsed_seconds)
+        """
+        start = time.perf_counter()
+        pages = self.load_pdf(pdf_path)
+        chunks = self.text_splitter.split_documents(pages)
+        return chunks, len(pages), time.perf_counter() - start
+    
     def chunk_documents(self, documents: List[Document]) -> List[Document]:
         """
         Split documents into smaller chunks while preserving context.
@@ -86,18 +147,20 @@ class DocumentLoader:
         logger.info(f"Created {len(chunks)} chunks from {len(documents)} documents")
         return chunks
     
-    def load_directory(self, papers_dir: Path) -> List[Document]:
+    def load_directory(self, papers_dir: Path, num_workers: int = 1) -> List[Document]:
         """
         Load all PDFs from a directory and chunk them.
         
         Args:
             papers_dir: Directory containing PDF files
+            num_workers: Number of worker processes (1 = sequential)
             
         Returns:
             List of chunked Document objects ready for embedding
         """
         papers_dir = Path(papers_dir)
-        pdf_files = list(papers_dir.glob("*.pdf"))
+        # Sorted so chunk ids are identical across runs and worker counts
+        pdf_files = sorted(papers_dir.glob("*.pdf"))
         
         if not pdf_files:
             logger.warning(f"No PDF files found in {papers_dir}")
@@ -105,17 +168,56 @@ class DocumentLoader:
         
         logger.info(f"Found {len(pdf_files)} PDF files in {papers_dir}")
         
-        all_documents = []
-        for pdf_path in pdf_files:
-            pages = self.load_pdf(pdf_path)
-            all_documents.extend(pages)
+        return self.load_files(pdf_files, num_workers=num_workers)
+    
+    def load_files(self, pdf_files: Sequence[Path], num_workers: int = 1,
+                   start_chunk_id: int = 0) -> List[Document]:
+        """
+        Load and chunk the given PDFs, optionally across worker processes.
         
-        # Chunk all documents
-        chunked_docs = self.chunk_documents(all_documents)
+        Chunks are returned in the order of `pdf_files` and numbered
+        sequentially, so the result does not depend on `num_workers`.
+        
+        Args:
+            pdf_files: PDF paths to process
+            num_workers: Number of worker processes (1 = sequential)
+            start_chunk_id: First chunk id to assign (for appending to an index)
+            
+        Returns:
+            List of chunked Document objects ready for embedding
+        """
+        pdf_files = [Path(p) for p in pdf_files]
+        num_workers = max(1, min(num_workers, len(pdf_files)))
+        self.file_timings = {}
+        
+        start = time.perf_counter()
+        if num_workers > 1:
+            logger.info(f"Processing {len(pdf_files)} PDFs with {num_workers} worker processes")
+            args = [(str(p), self.chunk_size, self.chunk_overlap) for p in pdf_files]
+            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+                # map() yields in submission order, keeping the output deterministic
+                results = list(executor.map(_load_and_chunk_worker, args))
+        else:
+            results = [self.load_and_chunk_pdf(p) for p in pdf_files]
+        
+        chunked_docs: List[Document] = []
+        total_pages = 0
+        for pdf_path, (chunks, page_count, elapsed) in zip(pdf_files, results):
+            self.file_timings[pdf_path.name] = elapsed
+            total_pages += page_count
+            logger.info(
+                f"Processed {pdf_path.name}: {page_count} pages, "
+                f"{len(chunks)} chunks in {elapsed:.2f}s"
+            )
+            chunked_docs.extend(chunks)
+        
+        for i, chunk in enumerate(chunked_docs, start=start_chunk_id):
+            chunk.metadata["chunk_id"] = i
+            chunk.metadata["chunk_size"] = len(chunk.page_content)
         
         logger.info(
-            f"Loaded {len(all_documents)} pages from {len(pdf_files)} papers, "
-            f"created {len(chunked_docs)} chunks"
+            f"Loaded {total_pages} pages from {len(pdf_files)} papers, "
+            f"created {len(chunked_docs)} chunks in {time.perf_counter() - start:.2f}s"
         )
         
         return chunked_docs
@@ -0,0 +1,149 @@
+"""Content-hash manifest for incremental knowledge base rebuilds."""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """Return the hex SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_ids_for(source: str, count: int) -> List[str]:
+    """Deterministic docstore ids for the chunks of one paper."""
+    return [f"{source}#{i}" for i in range(count)]
+
+
+@dataclass
+class ManifestDiff:
+    """Files that need work to bring the index up to date."""
+
+    added: List[Path] = field(default_factory=list)
+    changed: List[Path] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+class KnowledgeBaseManifest:
+    """
+    Tracks which papers are in the index and how they were embedded.
+
+    Each entry records the file's content hash, the chunking config and
+    embedding model used, and the docstore ids of its chunks, so a rebuild
+    can re-embed only what changed and delete vectors for removed papers.
+    """
+
+    def __init__(self, path: Path, files: Optional[Dict[str, Dict[str, Any]]] = None,
+                 next_chunk_id: int = 0, in_progress: Optional[Dict[str, Any]] = None):
+        self.path = Path(path)
+        self.files: Dict[str, Dict[str, Any]] = files or {}
+        self.next_chunk_id = next_chunk_id
+        # Partially indexed paper during a streaming build (checkpoints only)
+        self.in_progress = in_progress
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["KnowledgeBaseManifest"]:
+        """Load a manifest from disk, or None if missing or unreadable."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to read manifest {path}: {e}")
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            logger.warning(f"Ignoring manifest with unsupported version: {data.get('version')}")
+            return None
+        return cls(
+            path,
+            files=data.get("files", {}),
+            next_chunk_id=data.get("next_chunk_id", 0),
+            in_progress=data.get("in_progress"),
+        )
+
+    def save(self):
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        data: Dict[str, Any] = {
+            "version": MANIFEST_VERSION,
+            "next_chunk_id": self.next_chunk_id,
+            "files": self.files,
+        }
+        if self.in_progress is not None:
+            data["in_progress"] = self.in_progress
+        tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+        tmp_path.replace(self.path)
+        logger.info(f"Manifest saved to {self.path} ({len(self.files)} papers)")
+
+    def diff(self, pdf_files: Sequence[Path], chunk_size: int, chunk_overlap: int,
+             embedding_model: str) -> ManifestDiff:
+        """
+        Compare the papers on disk against the manifest.
+
+        A paper counts as changed if its contents, chunking config or
+        embedding model differ from what was indexed.
+        """
+        result = ManifestDiff()
+        on_disk = set()
+        for pdf_path in pdf_files:
+            pdf_path = Path(pdf_path)
+            on_disk.add(pdf_path.name)
+            entry = self.files.get(pdf_path.name)
+            if entry is None:
+                result.added.append(pdf_path)
+            elif (
+                entry.get("sha256") != file_sha256(pdf_path)
+                or entry.get("chunk_size") != chunk_size
+                or entry.get("chunk_overlap") != chunk_overlap
+                or entry.get("embedding_model") != embedding_model
+            ):
+                result.changed.append(pdf_path)
+            else:
+                result.unchanged.append(pdf_path.name)
+        result.removed = sorted(name for name in self.files if name not in on_disk)
+        return result
+
+    def record_file(self, pdf_path: Path, chunk_ids: List[str], chunk_size: int,
+                    chunk_overlap: int, embedding_model: str, sha256: Optional[str] = None):
+        """Record a paper as indexed with the given chunk ids."""
+        pdf_path = Path(pdf_path)
+        self.files[pdf_path.name] = {
+            "sha256": sha256 or file_sha256(pdf_path),
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "embedding_model": embedding_model,
+            "chunk_ids": chunk_ids,
+        }
+
+    def all_chunk_ids(self) -> List[str]:
+        """Docstore ids of every chunk the manifest accounts for."""
+        ids = [id_ for entry in self.files.values() for id_ in entry.get("chunk_ids", [])]
+        if self.in_progress:
+            ids.extend(chunk_ids_for(self.in_progress["file"], self.in_progress["chunks_done"]))
+        return ids
+
+    def chunk_ids(self, name: str) -> List[str]:
+        """Docstore ids recorded for a paper (empty if unknown)."""
+        return list(self.files.get(name, {}).get("chunk_ids", []))
+
+    def remove_file(self, name: str):
+        """Forget a paper."""
+        self.files.pop(name, None)
@@ -2,65 +2,750 @@
 
 import logging
 import os
+import random
+import re
+import shutil
+import sqlite3
 import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 
 from src.config import settings
+from src.knowledge.bm25 import BM25Index
+from src.knowledge.docstore import (
+    DOCSTORE_FILES,
+    ColumnarDocstore,
+    RowKeys,
+    has_columnar_docstore,
+    write_columnar_docstore,
+)
+from src.knowledge.embedding_cache import CachedEmbeddings, EmbeddingCache
+from src.knowledge.embeddings import TruncatedEmbeddings, truncate_vectors
+from src.knowledge.query_cache import TTLCache
+from src.knowledge.rwlock import ReadWriteLock
+from src.knowledge.index_factory import (
+    build_index,
+    index_kind,
+    index_quantization,
+    reconstruct_all,
+    set_search_params,
+    write_flat_index,
+)
 
 logger = logging.getLogger(__name__)
 
-# Thread lock for FAISS (CRITICAL for memory safety)
-_faiss_lock = threading.Lock()
+# Guards the loaded store (CRITICAL for memory safety): searches share it,
+# mutations and index swaps hold it exclusively. FAISS releases the GIL
+# while searching, so concurrent readers run in parallel.
+_faiss_lock = ReadWriteLock()
+
+INDEX_FILE = "index.faiss"
+LEGACY_DOCSTORE_FILE = "index.pkl"
+# Names the version subdirectory holding the published index and docstore
+CURRENT_FILE = "CURRENT"
+
+# HTTP statuses worth retrying when embedding (quota and transient server errors)
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_RETRYABLE_PATTERN = re.compile(
+    r"\b(429|500|502|503|504)\b|resource.?exhausted|quota|rate.?limit|unavailable|deadline",
+    re.IGNORECASE,
+)
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Whether an embedding error is a rate-limit or transient server error."""
+    current: Optional[BaseException] = error
+    while current is not None:
+        for attr in ("status_code", "code"):
+            status = getattr(current, attr, None)
+            if isinstance(status, int) and status in _RETRYABLE_STATUS:
+                return True
+        response = getattr(current, "response", None)
+        if getattr(response, "status_code", None) in _RETRYABLE_STATUS:
+            return True
+        if _RETRYABLE_PATTERN.search(str(current)):
+            return True
+        current = current.__cause__
+    return False
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting request starts per second."""
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: Tokens added per second (<= 0 disables limiting)
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+class EmbeddingScheduler:
+    """
+    Embeds texts in batches with bounded concurrency, rate limiting and retries.
+    
+    Batches are yielded as they complete (not in order), so callers can write
+    vectors into the index while later batches are still in flight.
+    """
+    
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        batch_size: int = 100,
+        max_concurrency: int = 4,
+        requests_per_minute: float = 0,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.embeddings = embeddings
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.bucket = TokenBucket(requests_per_minute / 60.0, capacity=self.max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+    
+    def _embed_with_retry(self, texts: List[str]) -> List[List[float]]:
+        """Embed one batch, retrying rate-limit/5xx errors with jittered backoff."""
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                return self.embeddings.embed_documents(texts)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable_error(e):
+                    raise
+                # Full jitter: spreads retries from concurrent batches apart
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                logger.warning(
+                    f"Embedding batch failed (attempt {attempt + 1}/{self.max_retries + 1}), "
+                    f"retrying in {delay:.1f}s: {e}"
+                )
+                time.sleep(delay)
+        raise RuntimeError("unreachable")
+    
+    def run(self, texts: Sequence[str]) -> Iterator[Tuple[int, List[List[float]]]]:
+        """
+        Embed texts, yielding (start_offset, vectors) for each completed batch.
+        
+        At most `max_concurrency` requests are in flight at any time.
+        """
+        starts = iter(range(0, len(texts), self.batch_size))
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            in_flight: Dict[Future, int] = {}
+            
+            def submit_next() -> bool:
+                start = next(starts, None)
+                if start is None:
+                    return False
+                batch = list(texts[start:start + self.batch_size])
+                in_flight[executor.submit(self._embed_with_retry, batch)] = start
+                return True
+            
+            while len(in_flight) < self.max_concurrency and submit_next():
+                pass
+            
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start = in_flight.pop(future)
+                    try:
+                        vectors = future.result()
+                    except Exception:
+                        for pending in in_flight:
+                            pending.cancel()
+                        raise
+                    yield start, vectors
+                    submit_next()
+
+
+def _read_index_mmap(index_file: str) -> faiss.Index:
+    """
+    Read an index with its vector codes memory-mapped from the file.
+    
+    IO_FLAG_MMAP_IFC maps the codes of flat, scalar-quantized, HNSW and IVF
+    indexes in place; plain IO_FLAG_MMAP still copies flat codes into RAM, so
+    it is only the fallback for index types (or FAISS builds) without it.
+    """
+    flags = []
+    if hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+        flags.append(faiss.IO_FLAG_MMAP_IFC)
+    flags.append(faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    for flag in flags:
+        try:
+            return faiss.read_index(index_file, flag)
+        except RuntimeError as e:
+            logger.warning(f"Memory-mapping (flags={flag}) not supported for this index: {e}")
+    logger.warning("Reading the FAISS index into memory")
+    return faiss.read_index(index_file)
+
+
+def resolve_index_dir(path: Path) -> Path:
+    """
+    Directory holding the FAISS index and docstore published at `path`.
+    
+    Saves write both into a fresh version subdirectory and then swap the
+    CURRENT pointer to it, so readers see either the old set or the new one,
+    never a mix. Indexes saved before versioning keep their files in `path`.
+    """
+    path = Path(path)
+    try:
+        version = (path / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return path
+    return path / version
+
+
+def _new_version_dir(path: Path) -> Path:
+    """Create an empty, unpublished version subdirectory under `path`."""
+    path.mkdir(parents=True, exist_ok=True)
+    while True:
+        version_dir = path / f"v{time.time_ns()}"
+        try:
+            version_dir.mkdir()
+            return version_dir
+        except FileExistsError:
+            continue
+
+
+def _publish_version(path: Path, version_dir: Path):
+    """
+    Point CURRENT at `version_dir`, then remove older versions. The version
+    it replaces is kept for readers that resolved it just before the swap.
+    """
+    previous = resolve_index_dir(path)
+    tmp = path / f"{CURRENT_FILE}.tmp"
+    tmp.write_text(version_dir.name, encoding="utf-8")
+    tmp.replace(path / CURRENT_FILE)
+    
+    for child in path.iterdir():
+        if child.is_dir() and child.name.startswith("v") and child not in (version_dir, previous):
+            shutil.rmtree(child, ignore_errors=True)
+    if previous != path:
+        # Files of the unversioned layout, now two saves old
+        for name in (INDEX_FILE, LEGACY_DOCSTORE_FILE) + DOCSTORE_FILES:
+            (path / name).unlink(missing_ok=True)
 
 
 class VectorStoreManager:
     """Manages the FAISS vector store with thread-safe operations."""
     
-    def __init__(self):
-        self.embeddings = GoogleGenerativeAIEmbeddings(
+    def __init__(self, embeddings: Optional[Embeddings] = None):
+        """
+        Args:
+            embeddings: Full-dimension embedder to use instead of Gemini (e.g.
+                for benchmarks); used as-is, without the embedding cache
+        """
+        # Full-dimension embedder; the cache always stores untruncated vectors
+        self.base_embeddings: Embeddings = embeddings or GoogleGenerativeAIEmbeddings(
             model=settings.embedding_model,
         )
+        if embeddings is None and settings.embedding_cache_enabled:
+            # Reuse vectors for chunk texts embedded by earlier builds
+            try:
+                self.base_embeddings = CachedEmbeddings(
+                    self.base_embeddings,
+                    EmbeddingCache(
+                        settings.embedding_cache_path,
+                        max_bytes=settings.embedding_cache_max_mb * 1024 * 1024,
+                    ),
+                    model_name=settings.embedding_model,
+                )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Embedding cache unavailable, embedding without it: {e}")
+        # Embedder used by the store for queries; matches the indexed dimension
+        self.embeddings: Embeddings = self.base_embeddings
+        if settings.embedding_dimensions:
+            self.embeddings = TruncatedEmbeddings(self.base_embeddings, settings.embedding_dimensions)
         self.vector_store = None
+        # Keyword index over the saved docstore rows (None if not built or stale)
+        self.keyword_index: Optional[BM25Index] = None
+        # Bumped whenever the searchable contents change, so callers can drop cached results
+        self.generation = 0
+        self.query_embedding_cache = TTLCache(
+            max_size=settings.query_cache_size, ttl=settings.query_cache_ttl_seconds
+        )
         self.index_path = settings.vector_store_dir
+        # Serializes off-lock index rebuilds
+        self._rebuild_lock = threading.Lock()
     
-    def load_or_create(self, documents: Optional[List[Document]] = None):
-        """Load existing index or create new one with thread safety."""
-        with _faiss_lock:  # Lock FAISS operations
-            if self.index_path.exists():
-                logger.info(f"Loading existing FAISS index from {self.index_path}")
-                try:
-                    self.vector_store = FAISS.load_local(
-                        str(self.index_path),
-                        self.embeddings,
-                        allow_dangerous_deserialization=True
+    def _make_scheduler(self, embeddings: Embeddings) -> EmbeddingScheduler:
+        return EmbeddingScheduler(
+            embeddings,
+            batch_size=settings.embed_batch_size,
+            max_concurrency=settings.embed_max_concurrency,
+            requests_per_minute=settings.embed_requests_per_minute,
+            max_retries=settings.embed_max_retries,
+        )
+    
+    def _embed_batches(self, texts: List[str]) -> Iterator[Tuple[List[int], Sequence[Sequence[float]]]]:
+        """
+        Embed texts through the batch scheduler, yielding (positions, vectors)
+        as batches complete.
+        
+        Cached vectors are yielded first and never count against the request
+        rate limit. Vectors are truncated to `settings.embedding_dimensions`.
+        """
+        def truncated(vectors: Sequence[Sequence[float]]) -> Sequence[Sequence[float]]:
+            if settings.embedding_dimensions:
+                return truncate_vectors(vectors, settings.embedding_dimensions)
+            return vectors
+        
+        pending = list(range(len(texts)))
+        embedder = self.base_embeddings
+        cache = None
+        if isinstance(embedder, CachedEmbeddings):
+            model_name = embedder.model_name
+            cache = embedder.cache
+            embedder = embedder.underlying
+            cached = cache.get_many(model_name, texts)
+            hits = [i for i, v in enumerate(cached) if v is not None]
+            if hits:
+                yield hits, truncated([cached[i] for i in hits])
+            pending = [i for i, v in enumerate(cached) if v is None]
+            logger.info(f"Embedding cache: {len(hits)}/{len(texts)} hits")
+        
+        if pending:
+            scheduler = self._make_scheduler(embedder)
+            pending_texts = [texts[i] for i in pending]
+            completed = 0
+            for start, vectors in scheduler.run(pending_texts):
+                positions = pending[start:start + len(vectors)]
+                if cache is not None:
+                    cache.put_many(model_name, [texts[i] for i in positions], vectors)
+                yield positions, truncated(vectors)
+                completed += len(vectors)
+                logger.info(f"Embedded {completed}/{len(pending)} chunks")
+    
+    def _embed_and_index(self, documents: List[Document], ids: Optional[List[str]],
+                         vector_store: Optional[FAISS] = None) -> FAISS:
+        """
+        Embed documents through the batch scheduler, writing each batch into
+        `vector_store` as it completes (a new store is created if None).
+        """
+        texts = [doc.page_content for doc in documents]
+        for positions, vectors in self._embed_batches(texts):
+            text_embeddings = [(texts[i], list(v)) for i, v in zip(positions, vectors)]
+            metadatas = [documents[i].metadata for i in positions]
+            batch_ids = [ids[i] for i in positions] if ids else None
+            with _faiss_lock.write():
+                if vector_store is None:
+                    vector_store = FAISS.from_embeddings(
+                        text_embeddings, self.embeddings, metadatas=metadatas, ids=batch_ids
                     )
-                    logger.info("FAISS index loaded successfully")
-                except Exception as e:
-                    logger.error(f"Failed to load FAISS index: {e}")
-                    if documents:
-                        logger.info("Creating new index from provided documents")
-                        self.vector_store = FAISS.from_documents(documents, self.embeddings)
-                        self.save()
+                else:
+                    vector_store.add_embeddings(text_embeddings, metadatas=metadatas, ids=batch_ids)
+        return vector_store
+    
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        """Embed texts as they would be indexed (cached, batched, truncated), in order."""
+        result = np.zeros((len(texts), 0), dtype=np.float32)
+        for positions, vectors in self._embed_batches(texts):
+            vectors = np.asarray(vectors, dtype=np.float32)
+            if result.shape[1] != vectors.shape[1]:
+                result = np.zeros((len(texts), vectors.shape[1]), dtype=np.float32)
+            result[positions] = vectors
+        return result
+    
+    def _load(self, path: Path, writable: bool) -> FAISS:
+        """
+        Open an index directory.
+        
+        Read-only loads memory-map the FAISS index and the columnar docstore,
+        so startup is near-instant and processes share pages via the OS
+        cache. Writable loads materialize both in memory for add/delete.
+        """
+        directory = resolve_index_dir(path)
+        if has_columnar_docstore(directory):
+            index_file = str(directory / INDEX_FILE)
+            if writable:
+                index = faiss.read_index(index_file)
+                docs, index_to_docstore_id = ColumnarDocstore(directory).to_dicts()
+                docstore = InMemoryDocstore(docs)
             else:
-                if documents:
-                    logger.info("Creating new FAISS index from documents")
-                    self.vector_store = FAISS.from_documents(documents, self.embeddings)
-                    self.save()
+                index = _read_index_mmap(index_file)
+                docstore = ColumnarDocstore(directory)
+                index_to_docstore_id = RowKeys(len(docstore))
+            set_search_params(index, nprobe=settings.ivf_nprobe, ef_search=settings.hnsw_ef_search)
+            return FAISS(self.embeddings, index, docstore, index_to_docstore_id)
+        
+        # Indexes saved before the columnar format pickled their docstore
+        logger.warning(
+            f"Loading legacy pickled docstore ({LEGACY_DOCSTORE_FILE}); "
+            "rebuild the knowledge base to switch to the memory-mapped format"
+        )
+        return FAISS.load_local(str(path), self.embeddings, allow_dangerous_deserialization=True)
+    
+    @staticmethod
+    def _reindex(index: faiss.Index, vectors: np.ndarray, index_type: str,
+                 quantization: str) -> faiss.Index:
+        """Build an `index_type` index over `vectors` (the contents of `index`), keeping row order."""
+        current = index_kind(index)
+        current_quantization = index_quantization(index)
+        if current == "ivfpq" or current_quantization != "none":
+            logger.warning("Rebuilding from compressed codes: vectors are approximate reconstructions")
+        logger.info(
+            f"Rebuilding {current} ({current_quantization}) index as {index_type} "
+            f"({quantization}) ({len(vectors)} vectors)"
+        )
+        return VectorStoreManager._build(vectors, index_type, quantization)
+    
+    @staticmethod
+    def _build(vectors: np.ndarray, index_type: str, quantization: str) -> faiss.Index:
+        """Build an `index_type` index over `vectors` with the configured parameters."""
+        index = build_index(
+            vectors,
+            index_type,
+            nlist=settings.ivf_nlist,
+            hnsw_m=settings.hnsw_m,
+            hnsw_ef_construction=settings.hnsw_ef_construction,
+            pq_m=settings.pq_m,
+            pq_nbits=settings.pq_nbits,
+            quantization=quantization,
+        )
+        set_search_params(index, nprobe=settings.ivf_nprobe, ef_search=settings.hnsw_ef_search)
+        return index
+    
+    def _rebuild_index(self, index_type: str, quantization: str = "none"):
+        """
+        Re-index the stored vectors as `index_type` with `quantization` (lock
+        held). Row order is kept.
+        """
+        store = self.vector_store
+        store.index = self._reindex(store.index, reconstruct_all(store.index), index_type, quantization)
+        self.generation += 1
+    
+    def _rebuild_index_concurrently(self, index_type: str, quantization: str = "none"):
+        """
+        `_rebuild_index` without blocking searches (lock not held).
+        
+        Vectors are copied under the read lock and the new index is trained
+        and filled with no lock held; only the swap is exclusive. If the
+        store was modified meanwhile, the rebuild is redone during the swap.
+        """
+        with self._rebuild_lock:
+            with _faiss_lock.read():
+                store = self.vector_store
+                index = store.index
+                ntotal = index.ntotal
+                # IVF direct maps are not used by searches, so building one here is safe
+                vectors = reconstruct_all(index)
+            new_index = self._reindex(index, vectors, index_type, quantization)
+            with _faiss_lock.write():
+                if self.vector_store is store and store.index is index and index.ntotal == ntotal:
+                    store.index = new_index
+                    self.generation += 1
                 else:
-                    logger.warning("No existing index and no documents provided")
+                    logger.info("Index changed during rebuild; rebuilding under the lock")
+                    self._rebuild_index(index_type, quantization)
+    
+    def index_version(self) -> str:
+        """Identifier of the saved index on disk; changes whenever it is rebuilt."""
+        try:
+            stat = (resolve_index_dir(self.index_path) / INDEX_FILE).stat()
+        except OSError:
+            return "none"
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+    
+    def index_matches_settings(self) -> bool:
+        """Whether the loaded index already has the configured type and quantization."""
+        if self.vector_store is None:
+            return True
+        index = self.vector_store.index
+        return (
+            index_kind(index) == settings.index_type
+            and index_quantization(index) == settings.vector_quantization
+        )
+    
+    def _ensure_writable(self):
+        """Swap a memory-mapped, read-only store for an in-memory copy before mutating it."""
+        if self.vector_store is not None and isinstance(self.vector_store.docstore, ColumnarDocstore):
+            vector_store = self._load(self.vector_store.docstore.directory, writable=True)
+            with _faiss_lock.write():
+                self.vector_store = vector_store
+    
+    def _invalidate(self):
+        """Mark search results as stale after the index changed (lock held)."""
+        self.keyword_index = None
+        self.generation += 1
+    
+    def _read_keyword_index(self, vector_store: FAISS) -> Optional[BM25Index]:
+        """Load the BM25 index saved with the FAISS index, if it matches `vector_store`."""
+        if not settings.hybrid_search:
+            return None
+        try:
+            keyword_index = BM25Index.load(self.index_path, k1=settings.bm25_k1, b=settings.bm25_b)
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Failed to load BM25 index: {e}")
+            return None
+        if keyword_index is None:
+            logger.info("No BM25 index found; using dense retrieval only")
+        elif keyword_index.num_docs != vector_store.index.ntotal:
+            logger.warning("BM25 index is out of date with the FAISS index; ignoring it")
+            return None
+        return keyword_index
+    
+    def build_keyword_index(self, path: Optional[Path] = None):
+        """Build the BM25 index from a saved docstore (default index_path) and save it beside it."""
+        path = Path(path) if path else self.index_path
+        keyword_index = BM25Index.from_texts(
+            (doc.page_content for _, doc in ColumnarDocstore(resolve_index_dir(path)).iter_rows()),
+            k1=settings.bm25_k1,
+            b=settings.bm25_b,
+        )
+        keyword_index.save(path)
+        if path == self.index_path:
+            with _faiss_lock.write():
+                self.keyword_index = keyword_index
+    
+    def load_or_create(self, documents: Optional[List[Document]] = None,
+                       ids: Optional[List[str]] = None, writable: bool = False):
+        """
+        Load existing index or create new one with thread safety.
+        
+        Args:
+            documents: Documents to build an index from if none can be loaded
+            ids: Docstore ids for `documents`
+            writable: Load into memory for add/delete instead of memory-mapping
+        """
+        if self.index_path.exists():
+            logger.info(f"Loading existing FAISS index from {self.index_path}")
+            try:
+                # Read outside the lock: searches on the current index continue
+                vector_store = self._load(self.index_path, writable)
+                keyword_index = self._read_keyword_index(vector_store)
+            except Exception as e:
+                logger.error(f"Failed to load FAISS index: {e}")
+                if documents:
+                    logger.info("Creating new index from provided documents")
+            else:
+                with _faiss_lock.write():  # Only the swap is exclusive
+                    self.vector_store = vector_store
+                    self._invalidate()
+                    self.keyword_index = keyword_index
+                self.query_embedding_cache.clear()
+                logger.info("FAISS index loaded successfully")
+                return
+        elif not documents:
+            logger.warning("No existing index and no documents provided")
+            return
+        
+        if documents:
+            self.create(documents, ids=ids)
     
-    def save(self):
-        """Save the vector store with thread safety."""
+    def create(self, documents: List[Document], ids: Optional[List[str]] = None):
+        """Build a fresh index from documents (replacing any loaded one) and save it."""
+        logger.info(f"Creating new FAISS index from {len(documents)} documents")
+        vector_store = self._embed_and_index(documents, ids)
+        with _faiss_lock.write():
+            self.vector_store = vector_store
+            self._invalidate()
+        self.save()
+    
+    def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None):
+        """Embed and append documents to the loaded index (creating it if needed, unsaved)."""
+        if not documents:
+            return
+        if self.vector_store is None:
+            vector_store = self._embed_and_index(documents, ids)
+            with _faiss_lock.write():
+                self.vector_store = vector_store
+                self._invalidate()
+            logger.info(f"Created FAISS index with {len(documents)} documents")
+            return
+        self._ensure_writable()
+        with _faiss_lock.write():
+            self._invalidate()
+        # Batches are embedded outside the lock; only index writes take it
+        self._embed_and_index(documents, ids, vector_store=self.vector_store)
+        logger.info(f"Added {len(documents)} documents to FAISS index")
+    
+    def delete(self, ids: List[str]) -> int:
+        """Remove vectors by docstore id, ignoring ids that are not present."""
+        if self.vector_store is None or not ids:
+            return 0
+        self._ensure_writable()
+        with _faiss_lock.write():
+            existing = set(self.vector_store.index_to_docstore_id.values())
+            to_delete = [id_ for id_ in ids if id_ in existing]
+            if to_delete:
+                self._invalidate()
+                if index_kind(self.vector_store.index) != "flat":
+                    # HNSW graphs do not support removal, and IVF removal keeps the
+                    # old row ids where the docstore mapping expects them renumbered;
+                    # delete from a flat copy and let save() rebuild the configured type
+                    self._rebuild_index("flat", index_quantization(self.vector_store.index))
+                self.vector_store.delete(to_delete)
+        logger.info(f"Deleted {len(to_delete)} documents from FAISS index")
+        return len(to_delete)
+    
+    def save(self, path: Optional[Path] = None, convert_index: bool = True):
+        """
+        Save the vector store (to `path`, default index_path) with thread safety.
+        
+        Writes the raw FAISS index plus a columnar docstore into a new version
+        directory and publishes both at once (see `resolve_index_dir`);
+        nothing is pickled.
+        Indexes are built flat; with `convert_index` the vectors are re-indexed
+        as `settings.index_type` (HNSW/IVF/IVF-PQ) with
+        `settings.vector_quantization` before writing, so IVF and quantizer
+        training see the whole corpus rather than the first batch.
+        """
+        path = Path(path) if path else self.index_path
         if self.vector_store:
-            with _faiss_lock:  # Lock save operations
-                self.index_path.parent.mkdir(parents=True, exist_ok=True)
-                self.vector_store.save_local(str(self.index_path))
-                logger.info(f"FAISS index saved to {self.index_path}")
+            if convert_index and not self.index_matches_settings():
+                self._rebuild_index_concurrently(settings.index_type, settings.vector_quantization)
+            # Serializing only reads the store, so searches can continue meanwhile
+            with _faiss_lock.read():
+                version_dir = _new_version_dir(path)
+                store = self.vector_store
+                if isinstance(store.docstore, ColumnarDocstore):
+                    rows = store.docstore.iter_rows()
+                else:
+                    rows = (
+                        (doc_id, store.docstore.search(doc_id))
+                        for _, doc_id in sorted(store.index_to_docstore_id.items())
+                    )
+                try:
+                    count = write_columnar_docstore(version_dir, rows)
+                    faiss.write_index(store.index, str(version_dir / INDEX_FILE))
+                except BaseException:
+                    shutil.rmtree(version_dir, ignore_errors=True)
+                    raise
+            # Readers may still have the old version mapped; it is not modified
+            _publish_version(path, version_dir)
+            logger.info(f"FAISS index saved to {path} ({count} documents)")
+    
+    def save_from_vectors(self, vectors: np.ndarray, rows: Iterable[Tuple[str, Document]],
+                          path: Optional[Path] = None):
+        """
+        Write an index directory (to `path`, default index_path) from vectors
+        on disk, e.g. a memmap, and the docstore rows in the same order,
+        without loading a store.
+        
+        Rows are streamed into the columnar docstore and a flat, unquantized
+        index is streamed to its file, so neither has to fit in memory. Other
+        index types are built in memory from `vectors`.
+        """
+        path = Path(path) if path else self.index_path
+        version_dir = _new_version_dir(path)
+        try:
+            count = write_columnar_docstore(version_dir, rows)
+            if count != len(vectors):
+                raise ValueError(f"{count} docstore rows for {len(vectors)} vectors")
+            index_file = version_dir / INDEX_FILE
+            if settings.index_type == "flat" and settings.vector_quantization == "none":
+                write_flat_index(index_file, vectors)
+            else:
+                index = self._build(vectors, settings.index_type, settings.vector_quantization)
+                faiss.write_index(index, str(index_file))
+        except BaseException:
+            shutil.rmtree(version_dir, ignore_errors=True)
+            raise
+        _publish_version(path, version_dir)
+        logger.info(f"FAISS index saved to {path} ({count} documents)")
+    
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a search query, reusing recent embeddings of the same text."""
+        key = " ".join(query.split())
+        vector = self.query_embedding_cache.get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(query)
+            self.query_embedding_cache.put(key, vector)
+        return vector
+    
+    def _embed_query_batch(self, queries: List[str]) -> List[List[float]]:
+        """Embed several queries with as few API requests as possible."""
+        embedder = self.base_embeddings
+        if isinstance(embedder, CachedEmbeddings):
+            # Only document vectors are persisted; queries go straight through
+            embedder = embedder.underlying
+        if isinstance(embedder, GoogleGenerativeAIEmbeddings):
+            vectors = embedder.embed_documents(queries, task_type="RETRIEVAL_QUERY")
+        else:
+            vectors = [embedder.embed_query(query) for query in queries]
+        if settings.embedding_dimensions:
+            vectors = truncate_vectors(vectors, settings.embedding_dimensions).tolist()
+        return vectors
+    
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed search queries in one batch, reusing cached query embeddings."""
+        keys = [" ".join(query.split()) for query in queries]
+        vectors = {key: self.query_embedding_cache.get(key) for key in keys}
+        missing = [key for key, vector in vectors.items() if vector is None]
+        if missing:
+            for key, vector in zip(missing, self._embed_query_batch(missing)):
+                self.query_embedding_cache.put(key, vector)
+                vectors[key] = vector
+        return [vectors[key] for key in keys]
+    
+    def batch_similarity_search(self, queries: List[str], k: int = 5) -> List[List[Document]]:
+        """
+        Similarity search for several queries at once.
+        
+        Queries are embedded in a single batched request and searched with one
+        matrix FAISS call. Returns one result list per query, in order.
+        """
+        if not self.vector_store or not queries:
+            if not self.vector_store:
+                logger.warning("Vector store not initialized")
+            return [[] for _ in queries]
+        
+        try:
+            embeddings = np.asarray(self.embed_queries(queries), dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Query embedding failed: {e}")
+            return [[] for _ in queries]
+        
+        with _faiss_lock.read():
+            try:
+                store = self.vector_store
+                _, rows = store.index.search(embeddings, k)
+                results = []
+                for query_rows in rows:
+                    docs = []
+                    for row in query_rows:
+                        if row == -1:  # Fewer than k vectors
+                            continue
+                        doc = store.docstore.search(store.index_to_docstore_id[int(row)])
+                        if isinstance(doc, Document):
+                            docs.append(doc)
+                    results.append(docs)
+                logger.info(f"Retrieved documents for {len(queries)} queries in one batch")
+                return results
+            except Exception as e:
+                logger.error(f"Batch similarity search failed: {e}")
+                return [[] for _ in queries]
     
     def similarity_search(self, query: str, k: int = 5) -> List[Document]:
         """Perform similarity search with thread safety."""
@@ -68,11 +753,39 @@ class VectorStoreManager:
             logger.warning("Vector store not initialized")
             return []
         
-        with _faiss_lock:  # Lock search operations
+        try:
+            # Network call: keep it outside the lock
+            embedding = self.embed_query(query)
+        except Exception as e:
+            logger.error(f"Query embedding failed: {e}")
+            return []
+        
+        with _faiss_lock.read():  # Shared: concurrent searches run in parallel
             try:
-                results = self.vector_store.similarity_search(query, k=k)
+                results = self.vector_store.similarity_search_by_vector(embedding, k=k)
                 logger.info(f"Retrieved {len(results)} documents for query: '{query[:50]}...'")
                 return results
             except Exception as e:
                 logger.error(f"Similarity search failed: {e}")
                 return []
+    
+    def keyword_search(self, query: str, k: int = 5) -> List[Document]:
+        """BM25 search over the saved chunks (empty if no keyword index is loaded)."""
+        if not self.vector_store or self.keyword_index is None:
+            return []
+        
+        with _faiss_lock.read():
+            try:
+                store = self.vector_store
+                keyword_index = self.keyword_index
+                if keyword_index is None:
+                    return []
+                results = []
+                for row, _ in keyword_index.search(query, k=k):
+                    doc = store.docstore.search(store.index_to_docstore_id[row])
+                    if isinstance(doc, Document):
+                        results.append(doc)
+                return results
+            except Exception as e:
+                logger.error(f"Keyword search failed: {e}")
+                return []
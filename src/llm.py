@@ -0,0 +1,35 @@
+"""Shared Gemini chat clients."""
+
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+from src.config import settings
+
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+
+@lru_cache(maxsize=None)
+def get_llm(temperature: Optional[float] = None) -> "ChatGoogleGenerativeAI":
+    """
+    Chat client for the configured model, built once per temperature.
+
+    Clients are thread-safe and hold their own connection pool, so every
+    node, session and the safety validator share them.
+
+    Args:
+        temperature: Sampling temperature (defaults to settings.temperature)
+        
+    Raises:
+        ValueError: If GOOGLE_API_KEY is not configured
+    """
+    # Deferred: the Gemini SDK takes most of a second to import
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    
+    if not settings.google_api_key:
+        raise ValueError("GOOGLE_API_KEY is not set. Add it to .env to use the agent.")
+    return ChatGoogleGenerativeAI(
+        model=settings.gemini_model,
+        google_api_key=settings.google_api_key,
+        temperature=settings.temperature if temperature is None else temperature,
+    )
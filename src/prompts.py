@@ -52,6 +52,12 @@ PLANNER_PROMPT_WITH_HISTORY = ChatPromptTemplate.from_messages([
         ("user", "{query}")
     ])
 
+# Answer Validation Prompt
+CHECKER_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are an academic editor validating research answers. Be constructive but thorough."),
+    ("user", "{user_input}")
+])
+
 # 6. Safety Validation Prompt
 SAFETY_PROMPT = ChatPromptTemplate.from_messages([
     ("system", """You are a safety guardrail for an Educational Research Agent.
@@ -1,12 +1,32 @@
 """Tools for the educational research agent."""
 
-from .retriever import search_knowledge_base, SearchTool
+import importlib
+
 from .validator import ContentValidator, validator
-from .web_search import search_web, WebSearchTool
-from .academic import search_academic
+
+# Tool modules pull in FAISS and the API clients, so they load on first access
+_LAZY_EXPORTS = {
+    "search_knowledge_base": ".retriever",
+    "search_knowledge_base_batch": ".retriever",
+    "SearchTool": ".retriever",
+    "search_web": ".web_search",
+    "WebSearchTool": ".web_search",
+    "search_academic": ".academic",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "search_knowledge_base", 
+    "search_knowledge_base_batch",
     "SearchTool", 
     "ContentValidator", 
     "validator",
@@ -2,25 +2,114 @@
 
 import logging
 import threading
-import arxiv
-from typing import Dict, Any
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+import httpx
+from typing import TYPE_CHECKING, Dict, Any, List
 
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
+
+from src.config import settings
+from src.context_budget import ContextBudget
+from src.tools.cache import cache_key, get_tool_cache
+from src.tools.http import RequestPacer, aget_with_retry
+
+if TYPE_CHECKING:
+    import arxiv
 
 logger = logging.getLogger(__name__)
 
-# Thread lock for ArXiv API
+# Thread lock for ArXiv API (the client paces its own requests); cache hits
+# and coalesced duplicate queries never take it
 _arxiv_lock = threading.Lock()
 
 
+@lru_cache(maxsize=None)
+def _get_arxiv_client() -> "arxiv.Client":
+    """Shared ArXiv client for sync searches, built on first use."""
+    # Deferred: only the sync path uses the arxiv library (and its feedparser import)
+    import arxiv
+    return arxiv.Client()
+
+
+# Async requests are spaced out instead of serialized behind the lock
+_arxiv_pacer = RequestPacer(settings.arxiv_min_interval_seconds)
+
+_ATOM_NS = {"atom": "http://www.w3.org/2005/Atom"}
+
+
+def _format_papers(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Shape paper dicts (title/authors/summary/url/published) into the tool result."""
+    if not results:
+        return {
+            "context_str": "⚠️ No academic papers found for this query.",
+            "source": "arxiv"
+        }
+    
+    formatted = []
+    for paper in results:
+        authors_str = ", ".join(paper["authors"][:3])
+        formatted.append(
+            f"**{paper['title']}**\n"
+            f"Authors: {authors_str}\n"
+            f"Published: {paper['published']}\n"
+            f"Link: {paper['url']}\n"
+            f"Summary: {paper['summary']}\n"
+        )
+    
+    context_str = ContextBudget("academic", settings.academic_context_tokens).pack(
+        formatted, separator="\n---\n"
+    )
+    
+    return {
+        "context_str": f"--- ACADEMIC PAPERS (ArXiv) ---\n{context_str}",
+        "source": "arxiv"
+    }
+
+
+def _parse_atom(feed: str) -> List[Dict[str, Any]]:
+    """Paper dicts from an ArXiv API Atom feed."""
+    root = ET.fromstring(feed)
+    results = []
+    for entry in root.findall("atom:entry", _ATOM_NS):
+        def text(tag: str) -> str:
+            return (entry.findtext(f"atom:{tag}", default="", namespaces=_ATOM_NS) or "").strip()
+        
+        results.append({
+            "title": " ".join(text("title").split()),
+            "authors": [
+                (author.findtext("atom:name", default="", namespaces=_ATOM_NS) or "").strip()
+                for author in entry.findall("atom:author", _ATOM_NS)
+            ],
+            "summary": " ".join(text("summary").split())[:300],
+            "url": text("id"),
+            "published": text("published")[:10]
+        })
+    return results
+
+
 class AcademicSearchTool:
     """Tool for searching academic papers on ArXiv with thread safety."""
     
     @staticmethod
     def search(query: str, max_results: int = 5) -> Dict[str, Any]:
+        cache = get_tool_cache()
+        if cache is None:
+            return AcademicSearchTool._search_uncached(query, max_results)
+        return cache.get_or_compute(
+            "arxiv",
+            cache_key(query, max_results=max_results),
+            settings.arxiv_cache_ttl_seconds,
+            lambda: AcademicSearchTool._search_uncached(query, max_results),
+        )
+    
+    @staticmethod
+    def _search_uncached(query: str, max_results: int = 5) -> Dict[str, Any]:
         try:
             logger.info(f"Searching ArXiv for: {query}")
             
+            import arxiv
+            
             # Lock ArXiv searches
             with _arxiv_lock:
                 search = arxiv.Search(
@@ -30,7 +119,7 @@ class AcademicSearchTool:
                 )
                 
                 results = []
-                for paper in search.results():
+                for paper in _get_arxiv_client().results(search):
                     results.append({
                         "title": paper.title,
                         "authors": [author.name for author in paper.authors],
@@ -39,31 +128,44 @@ class AcademicSearchTool:
                         "published": str(paper.published.date())
                     })
             
-            if not results:
-                return {
-                    "context_str": "⚠️ No academic papers found for this query.",
-                    "source": "arxiv"
-                }
-            
-            formatted = []
-            for paper in results:
-                authors_str = ", ".join(paper["authors"][:3])
-                formatted.append(
-                    f"**{paper['title']}**\n"
-                    f"Authors: {authors_str}\n"
-                    f"Published: {paper['published']}\n"
-                    f"Link: {paper['url']}\n"
-                    f"Summary: {paper['summary']}\n"
-                )
-            
-            context_str = "\n---\n".join(formatted)
+            return _format_papers(results)
             
+        except Exception as e:
+            logger.error(f"ArXiv search failed: {e}")
             return {
-                "context_str": f"--- ACADEMIC PAPERS (ArXiv) ---\n{context_str}",
-                "source": "arxiv"
+                "context_str": "⚠️ Academic search failed.",
+                "error": str(e)
             }
-            
-        except Exception as e:
+    
+    @staticmethod
+    async def asearch(query: str, max_results: int = 5) -> Dict[str, Any]:
+        """Async search over the ArXiv API with a pooled client."""
+        cache = get_tool_cache()
+        if cache is None:
+            return await AcademicSearchTool._asearch_uncached(query, max_results)
+        return await cache.aget_or_compute(
+            "arxiv",
+            cache_key(query, max_results=max_results),
+            settings.arxiv_cache_ttl_seconds,
+            lambda: AcademicSearchTool._asearch_uncached(query, max_results),
+        )
+    
+    @staticmethod
+    async def _asearch_uncached(query: str, max_results: int = 5) -> Dict[str, Any]:
+        try:
+            logger.info(f"Searching ArXiv (async) for: {query}")
+            await _arxiv_pacer.wait()
+            response = await aget_with_retry(
+                settings.arxiv_api_url,
+                params={
+                    "search_query": query,
+                    "max_results": max_results,
+                    "sortBy": "relevance",
+                    "sortOrder": "descending",
+                },
+            )
+            return _format_papers(_parse_atom(response.text))
+        except (httpx.HTTPError, ET.ParseError) as e:
             logger.error(f"ArXiv search failed: {e}")
             return {
                 "context_str": "⚠️ Academic search failed.",
@@ -71,11 +173,17 @@ class AcademicSearchTool:
             }
 
 
-@tool
-def search_academic(query: str) -> str:
-    """
-    Search for academic papers on ArXiv.
-    Thread-safe implementation.
-    """
-    result = AcademicSearchTool.search(query)
-    return result.get("context_str", "")
+def _search_academic(query: str) -> str:
+    return AcademicSearchTool.search(query).get("context_str", "")
+
+
+async def _asearch_academic(query: str) -> str:
+    return (await AcademicSearchTool.asearch(query)).get("context_str", "")
+
+
+search_academic = StructuredTool.from_function(
+    func=_search_academic,
+    coroutine=_asearch_academic,
+    name="search_academic",
+    description="Search for academic papers on ArXiv.\nThread-safe implementation.",
+)
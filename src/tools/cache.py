@@ -0,0 +1,271 @@
+"""Persistent TTL cache with single-flight deduplication for external tool calls."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _FlightAbandoned(Exception):
+    """The caller computing a shared result was cancelled; waiters should retry."""
+
+
+def cache_key(query: str, **params: Any) -> str:
+    """Key for a query and its parameters; case and whitespace are normalized."""
+    normalized = " ".join(query.lower().split())
+    payload = json.dumps({"q": normalized, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ToolResultCache:
+    """
+    SQLite-backed cache of tool results keyed by (source, query key).
+
+    Each entry carries its own expiry, so sources can use different TTLs.
+    When the total size exceeds `max_bytes`, least recently used entries are
+    evicted down to 90% of it. `get_or_compute` coalesces concurrent misses
+    for the same key into a single call (single-flight).
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 64 * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple[str, str], Future] = {}
+        self._in_flight_lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tool_results (
+                source TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (source, key)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tool_results_last_access ON tool_results (last_access)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._size()
+
+    def _size(self) -> int:
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM tool_results"
+        ).fetchone()[0]
+
+    def get(self, source: str, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM tool_results WHERE source = ? AND key = ?",
+                (source, key),
+            ).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._conn.execute(
+                        "DELETE FROM tool_results WHERE source = ? AND key = ?", (source, key)
+                    )
+                    self._conn.commit()
+                    self._total_bytes -= len(row[0])
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE tool_results SET last_access = ? WHERE source = ? AND key = ?",
+                (now, source, key),
+            )
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, source: str, key: str, value: Dict[str, Any], ttl: float):
+        """Store a result for `ttl` seconds, evicting old entries if over the size limit."""
+        now = time.time()
+        data = json.dumps(value, ensure_ascii=False, default=str)
+        with self._lock:
+            replaced = self._conn.execute(
+                "SELECT LENGTH(value) FROM tool_results WHERE source = ? AND key = ?", (source, key)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tool_results (source, key, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (source, key, data, now + ttl, now),
+            )
+            self._conn.commit()
+            # Running total: a full SUM() on every write slows down as the cache grows
+            self._total_bytes += len(data) - (replaced[0] if replaced else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict(now)
+
+    def _evict(self, now: float):
+        """Drop expired, then least recently used, entries until under 90% of max_bytes (lock held)."""
+        self._conn.execute("DELETE FROM tool_results WHERE expires_at <= ?", (now,))
+        # Eviction is rare; re-sync the running total here
+        total = self._size()
+        target = int(self.max_bytes * 0.9)
+        to_delete = []
+        rows = self._conn.execute(
+            "SELECT rowid, LENGTH(value) FROM tool_results ORDER BY last_access ASC"
+        )
+        for rowid, size in rows:
+            if total <= target:
+                break
+            to_delete.append((rowid,))
+            total -= size
+        self._conn.executemany("DELETE FROM tool_results WHERE rowid = ?", to_delete)
+        self._conn.commit()
+        self._total_bytes = total
+        logger.info(f"Tool cache evicted {len(to_delete)} entries ({total / 1e6:.1f} MB kept)")
+
+    def get_or_compute(self, source: str, key: str, ttl: float,
+                       compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Return the cached result or compute it, sharing one computation
+        between concurrent callers with the same key.
+
+        Results containing an "error" key are returned but never cached.
+        """
+        while True:
+            cached = self.get(source, key)
+            if cached is not None:
+                return cached
+
+            future, leader = self._join_flight(source, key)
+            if not leader:
+                try:
+                    return future.result()
+                except _FlightAbandoned:
+                    continue
+            try:
+                result = compute()
+            except Exception as e:
+                self._finish_flight(source, key, future, ttl, error=e)
+                raise
+            except BaseException:
+                self._abandon_flight(source, key, future)
+                raise
+            self._finish_flight(source, key, future, ttl, result=result)
+            return result
+
+    async def aget_or_compute(self, source: str, key: str, ttl: float,
+                              compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Async `get_or_compute`. In-flight calls are shared with sync callers
+        and with coroutines on other event loops.
+        """
+        while True:
+            # Local SQLite lookups take well under a millisecond; not worth a thread hop
+            cached = self.get(source, key)
+            if cached is not None:
+                return cached
+
+            future, leader = self._join_flight(source, key)
+            if not leader:
+                try:
+                    # Shielded: a cancelled waiter must not cancel the shared future
+                    return await asyncio.shield(asyncio.wrap_future(future))
+                except _FlightAbandoned:
+                    continue
+            try:
+                result = await compute()
+            except Exception as e:
+                self._finish_flight(source, key, future, ttl, error=e)
+                raise
+            except BaseException:
+                # Cancelled (or interrupted): let a waiter take over instead of failing them all
+                self._abandon_flight(source, key, future)
+                raise
+            self._finish_flight(source, key, future, ttl, result=result)
+            return result
+
+    def _join_flight(self, source: str, key: str) -> Tuple[Future, bool]:
+        """Return the in-flight future for a key and whether the caller must compute it."""
+        with self._in_flight_lock:
+            future = self._in_flight.get((source, key))
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._in_flight[(source, key)] = future
+            return future, True
+
+    def _abandon_flight(self, source: str, key: str, future: Future):
+        """Release a flight whose leader stopped early; waiters retry, one as the new leader."""
+        with self._in_flight_lock:
+            self._in_flight.pop((source, key), None)
+        future.set_exception(_FlightAbandoned())
+
+    def _finish_flight(self, source: str, key: str, future: Future, ttl: float,
+                       result: Optional[Dict[str, Any]] = None,
+                       error: Optional[Exception] = None):
+        """Cache a successful result and release callers waiting on it."""
+        if error is None and "error" not in result:
+            try:
+                self.put(source, key, result, ttl)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to cache {source} result: {e}")
+        with self._in_flight_lock:
+            self._in_flight.pop((source, key), None)
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._total_bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit/miss/coalesced counters."""
+        return {
+            "size_bytes": self._total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_tool_cache: Optional[ToolResultCache] = None
+_tool_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> Optional[ToolResultCache]:
+    """Shared tool result cache (None if disabled or the database cannot be opened)."""
+    global _tool_cache
+    if not settings.tool_cache_enabled:
+        return None
+    with _tool_cache_lock:
+        if _tool_cache is None:
+            try:
+                _tool_cache = ToolResultCache(
+                    settings.tool_cache_path,
+                    max_bytes=settings.tool_cache_max_mb * 1024 * 1024,
+                )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Tool cache unavailable, calling tools directly: {e}")
+                return None
+        return _tool_cache
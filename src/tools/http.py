@@ -0,0 +1,105 @@
+"""Pooled async HTTP clients and non-blocking retries for external tools."""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+from typing import Any, Dict
+
+import httpx
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying (quota and transient server errors)
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# httpx.AsyncClient is bound to the event loop it was first used on
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Keep-alive client shared by every tool call on the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.http_timeout_seconds),
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_connections,
+                ),
+                follow_redirects=True,
+            )
+            _clients[loop] = client
+        return client
+
+
+async def aclose_async_client():
+    """Close the running loop's client (call before the loop shuts down)."""
+    with _clients_lock:
+        client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def aget_with_retry(url: str, params: Dict[str, Any], max_retries: int = 3,
+                          base_delay: float = 1.0, max_delay: float = 10.0) -> httpx.Response:
+    """
+    GET with full-jitter exponential backoff on timeouts, connection errors
+    and retryable statuses. Sleeping yields to the event loop.
+
+    Raises:
+        httpx.HTTPError: If the last attempt fails or the status is not retryable
+    """
+    client = get_async_client()
+    for attempt in range(max_retries):
+        try:
+            response = await client.get(url, params=params)
+            if response.status_code not in _RETRYABLE_STATUS:
+                response.raise_for_status()
+                return response
+            error: httpx.HTTPError = httpx.HTTPStatusError(
+                f"HTTP {response.status_code}", request=response.request, response=response
+            )
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            error = e
+        if attempt == max_retries - 1:
+            raise error
+        delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+        logger.warning(f"Request to {url} failed (attempt {attempt + 1}/{max_retries}): {error}. "
+                       f"Retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+    raise RuntimeError("unreachable")
+
+
+class RequestPacer:
+    """
+    Spaces requests to one API at least `interval` seconds apart across all
+    threads and event loops, without blocking any of them while waiting.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Claim the next slot; returns how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            return slot - now
+
+    async def wait(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
@@ -1,22 +1,31 @@
 """Retrieval tool for the agent."""
 
 import logging
-from typing import List, Dict, Any
+import threading
+from typing import TYPE_CHECKING, List, Dict, Any
 from langchain_core.tools import tool
 from langchain_core.documents import Document
 
-from src.knowledge.vector_store import VectorStoreManager
+from src.context_budget import ContextBudget
+from src.knowledge.bm25 import reciprocal_rank_fusion
+from src.knowledge.query_cache import TTLCache
 from src.config import settings
 
+if TYPE_CHECKING:
+    from src.knowledge.vector_store import VectorStoreManager
+
 logger = logging.getLogger(__name__)
 
 # Global manager instance to avoid reloading FAISS every time
 _vector_manager = None
 
-def get_vector_manager() -> VectorStoreManager:
+def get_vector_manager() -> "VectorStoreManager":
     """Get or initialize the global vector manager."""
     global _vector_manager
     if _vector_manager is None:
+        # Deferred: FAISS and the embedding client are only needed once a search runs
+        from src.knowledge.vector_store import VectorStoreManager
+        
         _vector_manager = VectorStoreManager()
         try:
             _vector_manager.load_or_create()
@@ -25,9 +34,93 @@ def get_vector_manager() -> VectorStoreManager:
     return _vector_manager
 
 
+# (query, k, index generation) -> documents
+_result_cache = TTLCache(max_size=settings.query_cache_size, ttl=settings.query_cache_ttl_seconds)
+_result_cache_generation = None
+_result_cache_lock = threading.Lock()
+
+
+def _format_doc(doc: Document) -> str:
+    """Render a retrieved chunk with its source for the LLM."""
+    source = doc.metadata.get("source", "Unknown")
+    page = doc.metadata.get("page", 0)
+    content = doc.page_content.replace("\n", " ")
+    return f"[Source: {source}, Page: {page}] {content}"
+
+
+def _sync_result_cache(manager: "VectorStoreManager") -> int:
+    """Drop cached results if the index changed since they were stored; returns the generation."""
+    global _result_cache_generation
+    with _result_cache_lock:
+        generation = manager.generation
+        if _result_cache_generation != generation:
+            _result_cache.clear()
+            _result_cache_generation = generation
+        return generation
+
+
+def _result_key(query: str, k: int, generation: int) -> tuple:
+    """
+    Cache key for a search. The generation is the one read before searching,
+    so results of a search that overlapped an index change are stored under
+    the old generation and never served afterwards.
+    """
+    return (" ".join(query.split()), k, generation)
+
+
 class SearchTool:
     """Tool for searching the educational knowledge base."""
     
+    @staticmethod
+    def _retrieve(manager: "VectorStoreManager", query: str, k: int) -> List[Document]:
+        """Dense results, fused with BM25 keyword results when available."""
+        if not settings.hybrid_search or manager.keyword_index is None:
+            return manager.similarity_search(query, k=k)
+        
+        candidates = max(k, settings.hybrid_candidates)
+        dense = manager.similarity_search(query, k=candidates)
+        keyword = manager.keyword_search(query, k=candidates)
+        return reciprocal_rank_fusion([dense, keyword], k=settings.rrf_k, limit=k)
+    
+    @staticmethod
+    def _retrieve_many(manager: "VectorStoreManager", queries: List[str], k: int) -> List[List[Document]]:
+        """`_retrieve` for several queries, sharing one embedding request and FAISS call."""
+        if not settings.hybrid_search or manager.keyword_index is None:
+            return manager.batch_similarity_search(queries, k=k)
+        
+        candidates = max(k, settings.hybrid_candidates)
+        dense = manager.batch_similarity_search(queries, k=candidates)
+        return [
+            reciprocal_rank_fusion(
+                [dense_docs, manager.keyword_search(query, k=candidates)],
+                k=settings.rrf_k,
+                limit=k,
+            )
+            for query, dense_docs in zip(queries, dense)
+        ]
+    
+    @staticmethod
+    def _cached_retrieve(manager: "VectorStoreManager", query: str, k: int) -> List[Document]:
+        """`_retrieve` behind the result cache, dropped whenever the index changes."""
+        generation = _sync_result_cache(manager)
+        key = _result_key(query, k, generation)
+        results = _result_cache.get(key)
+        if results is None:
+            results = SearchTool._retrieve(manager, query, k)
+            # Empty results may come from a transient failure; don't pin them.
+            # Nor results from an index that changed while searching.
+            if results and manager.generation == generation:
+                _result_cache.put(key, results)
+        return results
+    
+    @staticmethod
+    def cache_stats() -> Dict[str, Dict[str, Any]]:
+        """Hit/miss counters for the search result and query embedding caches."""
+        return {
+            "results": _result_cache.stats(),
+            "query_embeddings": get_vector_manager().query_embedding_cache.stats(),
+        }
+    
     @staticmethod
     def search(query: str, k: int = 5) -> Dict[str, Any]:
         """
@@ -46,18 +139,14 @@ class SearchTool:
             return {"error": "Knowledge base not loaded", "documents": []}
             
         try:
-            results = manager.similarity_search(query, k=k)
+            results = SearchTool._cached_retrieve(manager, query, k)
             
-            # Format for the LLM
-            formatted_docs = []
-            for doc in results:
-                source = doc.metadata.get("source", "Unknown")
-                page = doc.metadata.get("page", 0)
-                content = doc.page_content.replace("\n", " ")
-                formatted_docs.append(f"[Source: {source}, Page: {page}] {content}")
+            # Format for the LLM, best-ranked chunks first into the token budget
+            formatted_docs = [_format_doc(doc) for doc in results]
+            budget = ContextBudget("knowledge_base", settings.kb_context_tokens)
             
             return {
-                "context_str": "\n\n".join(formatted_docs),
+                "context_str": budget.pack(formatted_docs),
                 "raw_docs": results
             }
             
@@ -65,6 +154,84 @@ class SearchTool:
             logger.error(f"Search failed: {e}")
             return {"error": str(e), "documents": []}
 
+    @staticmethod
+    def search_many(queries: List[str], k: int = 5) -> Dict[str, Any]:
+        """
+        Search for several sub-queries at once.
+        
+        Uncached queries are embedded in one request and searched with one
+        FAISS call. Chunks already returned for an earlier query are not
+        repeated.
+        
+        Args:
+            queries: The search queries (e.g. the steps of a research plan)
+            k: Number of documents to retrieve per query
+            
+        Returns:
+            Dictionary with 'context_str' (grouped by query), 'raw_docs'
+            (deduplicated) and 'per_query' (results for each query)
+        """
+        manager = get_vector_manager()
+        
+        if manager.vector_store is None:
+            return {"error": "Knowledge base not loaded", "documents": []}
+        
+        queries = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+        if not queries:
+            return {"error": "No queries provided", "documents": []}
+        
+        try:
+            generation = _sync_result_cache(manager)
+            keys = [_result_key(query, k, generation) for query in queries]
+            per_query = {query: _result_cache.get(key) for query, key in zip(queries, keys)}
+            missing = [i for i, query in enumerate(queries) if per_query[query] is None]
+            if missing:
+                retrieved = SearchTool._retrieve_many(manager, [queries[i] for i in missing], k)
+                for i, results in zip(missing, retrieved):
+                    per_query[queries[i]] = results
+                    if results and manager.generation == generation:
+                        _result_cache.put(keys[i], results)
+            
+            # Each chunk is shown only the first time it appears
+            seen = set()
+            candidates = []  # (query index, rank, doc)
+            for q, query in enumerate(queries):
+                for rank, doc in enumerate(per_query[query]):
+                    key = doc.id or doc.page_content
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    candidates.append((q, rank, doc))
+            
+            # Share the budget across queries: every query's top chunk before any second chunk
+            budget = ContextBudget("knowledge_base_batch", settings.kb_context_tokens)
+            kept = budget.select(
+                [_format_doc(doc) for _, _, doc in candidates],
+                scores=[-(rank * len(queries) + q) for q, rank, _ in candidates],
+            )
+            
+            # Group by query
+            raw_docs = []
+            sections = []
+            for q, query in enumerate(queries):
+                formatted_docs = []
+                for (doc_q, _, doc), text in zip(candidates, kept):
+                    if doc_q == q and text is not None:
+                        raw_docs.append(doc)
+                        formatted_docs.append(text)
+                body = "\n\n".join(formatted_docs) or "(No new results; see sources above.)"
+                sections.append(f"### {query}\n{body}")
+            
+            return {
+                "context_str": "\n\n".join(sections),
+                "raw_docs": raw_docs,
+                "per_query": per_query,
+            }
+            
+        except Exception as e:
+            logger.error(f"Batch search failed: {e}")
+            return {"error": str(e), "documents": []}
+
 # LangChain Tool Definition
 @tool
 def search_knowledge_base(query: str) -> str:
@@ -76,3 +243,16 @@ def search_knowledge_base(query: str) -> str:
     if "error" in result:
         return f"Error searching knowledge base: {result['error']}"
     return result["context_str"]
+
+
+@tool
+def search_knowledge_base_batch(queries: List[str]) -> str:
+    """
+    Search the educational research knowledge base for several queries in one call.
+    Use this tool to cover all the search steps of a research plan at once,
+    passing one focused query per step, instead of calling search_knowledge_base repeatedly.
+    """
+    result = SearchTool.search_many(queries)
+    if "error" in result:
+        return f"Error searching knowledge base: {result['error']}"
+    return result["context_str"]
@@ -4,11 +4,10 @@ import logging
 import re
 from typing import List, Dict, Any
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from src.prompts import SAFETY_PROMPT
 from langchain_core.documents import Document
 
-from src.config import settings
+from src.llm import get_llm
 
 logger = logging.getLogger(__name__)
 
@@ -16,13 +15,18 @@ class ContentValidator:
     """Validates content for safety, citations, and hallucinations."""
     
     def __init__(self):
-        """Initialize the LLM for safety checks."""
-        self.llm = ChatGoogleGenerativeAI(
-            model=settings.gemini_model,
-            google_api_key=settings.google_api_key,
-            temperature=0,  # Deterministic for classification
-        )
-        self.safety_chain = SAFETY_PROMPT | self.llm
+        """The safety LLM is built on first use."""
+        self._safety_chain = None
+    
+    @property
+    def llm(self):
+        return get_llm(temperature=0)  # Deterministic for classification
+    
+    @property
+    def safety_chain(self):
+        if self._safety_chain is None:
+            self._safety_chain = SAFETY_PROMPT | self.llm
+        return self._safety_chain
 
     def validate_citations(self, answer: str, retrieved_docs: List[Any]) -> Dict[str, Any]:
         """
@@ -3,35 +3,82 @@
 import logging
 import time
 import threading
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+import httpx
 import urllib3
 
-from langchain_google_community import GoogleSearchAPIWrapper
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 
 from src.config import settings
+from src.context_budget import ContextBudget
+from src.tools.cache import cache_key, get_tool_cache
+from src.tools.http import aget_with_retry
 
 logger = logging.getLogger(__name__)
 
 # Disable SSL warnings (only if you're okay with it)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# Thread lock for Google Search (prevent concurrent API calls)
+# Thread lock for Google Search (the API client is not thread-safe); cache
+# hits and coalesced duplicate queries never take it
 _search_lock = threading.Lock()
 
-# Initialize Google Search Wrapper
-search_wrapper: Optional[GoogleSearchAPIWrapper] = None
+if TYPE_CHECKING:
+    from langchain_google_community import GoogleSearchAPIWrapper
 
-if settings.google_cse_id and settings.google_search_api_key:
-    try:
-        search_wrapper = GoogleSearchAPIWrapper(
-            google_cse_id=settings.google_cse_id,
-            google_api_key=settings.google_search_api_key,
-            k=5  # Limit results
+# Google Search Wrapper, built on first use (the client library is slow to import)
+_search_wrapper: Optional["GoogleSearchAPIWrapper"] = None
+_search_wrapper_initialized = False
+_search_wrapper_lock = threading.Lock()
+
+
+def get_search_wrapper() -> Optional["GoogleSearchAPIWrapper"]:
+    """Shared Google Search client (None if not configured or it failed to initialize)."""
+    global _search_wrapper, _search_wrapper_initialized
+    with _search_wrapper_lock:
+        if not _search_wrapper_initialized:
+            _search_wrapper_initialized = True
+            if settings.google_cse_id and settings.google_search_api_key:
+                try:
+                    from langchain_google_community import GoogleSearchAPIWrapper
+                    
+                    _search_wrapper = GoogleSearchAPIWrapper(
+                        google_cse_id=settings.google_cse_id,
+                        google_api_key=settings.google_search_api_key,
+                        k=5  # Limit results
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to initialize Google Search: {e}")
+                    _search_wrapper = None
+        return _search_wrapper
+
+
+def _format_results(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Shape Custom Search items (title/link/snippet) into the tool result."""
+    if not items:
+        return {
+            "context_str": "⚠️ No web results found for this query.",
+            "source": "google_search"
+        }
+    
+    formatted_results = []
+    for item in items:
+        title = item.get("title", "No Title")
+        link = item.get("link", "#")
+        snippet = item.get("snippet", "")
+        
+        formatted_results.append(
+            f"Source: [{title}]({link})\nContent: {snippet}\n"
         )
-    except Exception as e:
-        logger.error(f"Failed to initialize Google Search: {e}")
-        search_wrapper = None
+    
+    context_str = ContextBudget("web", settings.web_context_tokens).pack(
+        formatted_results, separator="\n---\n"
+    )
+    
+    return {
+        "context_str": f"--- WEB SEARCH RESULTS ---\n{context_str}",
+        "source": "google_search"
+    }
 
 
 class WebSearchTool:
@@ -39,12 +86,24 @@ class WebSearchTool:
     
     @staticmethod
     def search(query: str, max_retries: int = 3) -> Dict[str, Any]:
-        if search_wrapper is None:
+        if get_search_wrapper() is None:
             return {
                 "context_str": "⚠️ Google Search not configured.",
                 "error": "Missing API keys"
             }
         
+        cache = get_tool_cache()
+        if cache is None:
+            return WebSearchTool._search_uncached(query, max_retries)
+        return cache.get_or_compute(
+            "google_search",
+            cache_key(query, num_results=5),
+            settings.web_cache_ttl_seconds,
+            lambda: WebSearchTool._search_uncached(query, max_retries),
+        )
+    
+    @staticmethod
+    def _search_uncached(query: str, max_retries: int = 3) -> Dict[str, Any]:
         # Use thread lock to prevent concurrent searches
         with _search_lock:
             for attempt in range(max_retries):
@@ -52,31 +111,11 @@ class WebSearchTool:
                     logger.info(f"Googling (attempt {attempt + 1}/{max_retries}): {query}")
                     
                     # Use .results() to get metadata
-                    raw_results = search_wrapper.results(query, num_results=5)
+                    raw_results = get_search_wrapper().results(query, num_results=5)
                     
                     if not raw_results:
                         logger.warning(f"No results found for: {query}")
-                        return {
-                            "context_str": "⚠️ No web results found for this query.",
-                            "source": "google_search"
-                        }
-                    
-                    formatted_results = []
-                    for item in raw_results:
-                        title = item.get("title", "No Title")
-                        link = item.get("link", "#")
-                        snippet = item.get("snippet", "")
-                        
-                        formatted_results.append(
-                            f"Source: [{title}]({link})\nContent: {snippet}\n"
-                        )
-                    
-                    context_str = "\n---\n".join(formatted_results)
-                    
-                    return {
-                        "context_str": f"--- WEB SEARCH RESULTS ---\n{context_str}",
-                        "source": "google_search"
-                    }
+                    return _format_results(raw_results)
                     
                 except Exception as e:
                     error_msg = str(e).lower()
@@ -120,13 +159,74 @@ class WebSearchTool:
                 "context_str": "⚠️ Web search unavailable after multiple attempts.",
                 "error": "Max retries exceeded"
             }
+    
+    @staticmethod
+    async def asearch(query: str, max_retries: int = 3) -> Dict[str, Any]:
+        """Async search over the Custom Search REST API with a pooled client."""
+        if not (settings.google_cse_id and settings.google_search_api_key):
+            return {
+                "context_str": "⚠️ Google Search not configured.",
+                "error": "Missing API keys"
+            }
+        
+        cache = get_tool_cache()
+        if cache is None:
+            return await WebSearchTool._asearch_uncached(query, max_retries)
+        # Same key as the sync path, so both share cached results
+        return await cache.aget_or_compute(
+            "google_search",
+            cache_key(query, num_results=5),
+            settings.web_cache_ttl_seconds,
+            lambda: WebSearchTool._asearch_uncached(query, max_retries),
+        )
+    
+    @staticmethod
+    async def _asearch_uncached(query: str, max_retries: int = 3) -> Dict[str, Any]:
+        logger.info(f"Googling (async): {query}")
+        try:
+            response = await aget_with_retry(
+                settings.google_cse_base_url,
+                params={
+                    "key": settings.google_search_api_key,
+                    "cx": settings.google_cse_id,
+                    "q": query,
+                    "num": 5,
+                },
+                max_retries=max_retries,
+            )
+            items = response.json().get("items", [])
+        except httpx.TimeoutException as e:
+            logger.warning(f"Web search timed out: {e}")
+            return {
+                "context_str": "⚠️ Web search timed out. Using other sources.",
+                "error": "Timeout"
+            }
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error(f"Google search failed: {e}")
+            return {
+                "context_str": "⚠️ Web search failed. Using knowledge base.",
+                "error": str(e)
+            }
+        
+        if not items:
+            logger.warning(f"No results found for: {query}")
+        return _format_results(items)
+
+
+def _search_web(query: str) -> str:
+    return WebSearchTool.search(query).get("context_str", "")
+
+
+async def _asearch_web(query: str) -> str:
+    return (await WebSearchTool.asearch(query)).get("context_str", "")
 
 
-@tool
-def search_web(query: str) -> str:
-    """
-    Search the web using Google Custom Search.
-    Thread-safe with automatic retry on SSL/timeout errors.
-    """
-    result = WebSearchTool.search(query)
-    return result.get("context_str", "")
+search_web = StructuredTool.from_function(
+    func=_search_web,
+    coroutine=_asearch_web,
+    name="search_web",
+    description=(
+        "Search the web using Google Custom Search.\n"
+        "Thread-safe with automatic retry on SSL/timeout errors."
+    ),
+)
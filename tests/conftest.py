@@ -0,0 +1,90 @@
+"""Shared test fixtures."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+# (method, path, query params, body) -> (status, body, content type)
+Responder = Callable[[str, str, Dict[str, List[str]], bytes], Tuple[int, bytes, str]]
+
+
+class StubHTTPServer:
+    """
+    Local HTTP server for tool and embedding clients.
+
+    Each request waits `latency` seconds, then gets the next status from
+    `failures` (with an empty body) or, once those run out, the response
+    from `respond`. Requests and peak concurrency are recorded.
+    """
+
+    def __init__(self, respond: Responder, latency: float = 0.0, failures: Sequence[int] = ()):
+        self.latency = latency
+        self.failures = list(failures)
+        self.requests: List[Tuple[str, str, Dict[str, List[str]], bytes]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self, method: str):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                with stub._lock:
+                    stub.requests.append((method, url.path, query, body))
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    failure = stub.failures.pop(0) if stub.failures else None
+                try:
+                    if stub.latency:
+                        time.sleep(stub.latency)
+                    if failure is not None:
+                        self.send_response(failure)
+                        self.end_headers()
+                        return
+                    status, payload, content_type = respond(method, url.path, query, body)
+                    self.send_response(status)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def stub_http():
+    """Start StubHTTPServers (`stub_http(respond, **kwargs)`); all are closed after the test."""
+    servers = []
+
+    def start(respond: Responder, **kwargs) -> StubHTTPServer:
+        server = StubHTTPServer(respond, **kwargs)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
@@ -0,0 +1,124 @@
+"""Tests for the semantic answer cache."""
+
+import os
+import zlib
+import sys
+from itertools import cycle
+from pathlib import Path
+
+import numpy as np
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from src.agents import nodes
+from src.agents.answer_cache import SemanticAnswerCache, is_follow_up
+from src.agents.graph import build_graph, record_cached_turn
+
+
+def bag_of_words(text: str):
+    """Deterministic embedding: near-identical wording gives near-identical vectors."""
+    vector = np.zeros(64, dtype=np.float32)
+    for word in text.lower().replace("?", "").split():
+        vector[zlib.crc32(word.encode()) % 64] += 1.0
+    return vector.tolist()
+
+
+def make_cache(version="v1", **kwargs):
+    state = {"version": version}
+    cache = SemanticAnswerCache(bag_of_words, lambda: state["version"], threshold=0.9, **kwargs)
+    return cache, state
+
+
+def test_hits_only_validated_answers_to_similar_questions():
+    cache, _ = make_cache()
+    cache.store("What is active learning?", "draft", "INVALID")
+    assert cache.lookup("What is active learning?") is None
+
+    cache.store("What is active learning?", "Active learning is ...", "VALID")
+
+    hit = cache.lookup("what is active learning")
+    assert hit is not None and hit.answer == "Active learning is ..."
+    assert cache.lookup("How effective are MOOCs for adult learners?") is None
+
+
+def test_knowledge_base_change_invalidates_entries():
+    cache, state = make_cache()
+    cache.store("What is active learning?", "answer", "VALID")
+
+    state["version"] = "v2"
+
+    assert cache.lookup("What is active learning?") is None
+    assert len(cache) == 0
+
+
+def test_follow_ups_bypass_the_cache():
+    history = ["previous question", "previous answer"]
+    assert is_follow_up("Tell me more about that", history)
+    assert is_follow_up("Why?", history)
+    assert not is_follow_up("Tell me more about that", [])
+
+    cache, _ = make_cache()
+    cache.store("Summarize our conversation so far", "summary", "VALID", history)
+    assert len(cache) == 0
+
+
+def test_ttl_and_size_eviction():
+    cache, _ = make_cache(ttl=0.0)
+    cache.store("What is active learning?", "answer", "VALID")
+    assert cache.lookup("What is active learning?") is None
+
+    cache, _ = make_cache(max_entries=2)
+    for topic in ["active learning", "flipped classrooms", "automated grading"]:
+        cache.store(f"What is {topic}?", topic, "VALID")
+    assert len(cache) == 2
+    assert cache.lookup("What is active learning?") is None
+
+
+class ScriptedModel(GenericFakeChatModel):
+    """Replays scripted messages; tools are "bound" by ignoring them."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def test_cached_turn_is_recorded_in_the_thread(monkeypatch):
+    histories = []
+    real_format_history = nodes.format_history
+
+    def recording_format_history(messages, *args, **kwargs):
+        histories.append(real_format_history(messages, *args, **kwargs))
+        return histories[-1]
+
+    model = ScriptedModel(messages=cycle([
+        AIMessage(content="Plan the follow-up."),
+        AIMessage(content="More on active learning [Smith, 2021]."),
+        AIMessage(content="VALID"),
+    ]))
+    monkeypatch.setattr(nodes, "get_llm", lambda: model)
+    monkeypatch.setattr(nodes, "format_history", recording_format_history)
+    cached = [nodes.get_planner_chain, nodes.get_checker_chain, nodes.get_researcher_agent]
+    for getter in cached:
+        getter.cache_clear()
+    graph = build_graph(checkpointer=InMemorySaver())
+    config = {"configurable": {"thread_id": "t1"}}
+
+    try:
+        record_cached_turn(graph, config, "What is active learning?", "Active learning is ...")
+        assert graph.get_state(config).next == ()
+        graph.invoke({"query": "Tell me more about that",
+                      "messages": [HumanMessage(content="Tell me more about that")],
+                      "plan": "", "iteration": 0}, config)
+    finally:
+        for getter in cached:
+            getter.cache_clear()
+
+    contents = [m.content for m in graph.get_state(config).values["messages"]]
+    assert contents[:3] == ["What is active learning?", "Active learning is ...", "Tell me more about that"]
+    assert contents[-1].startswith("[CHECKER] VALID")
+    # The planner resolved the follow-up against the cached turn
+    assert "Active learning is ..." in histories[0]
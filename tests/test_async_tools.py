@@ -0,0 +1,117 @@
+"""Tests for the async web and ArXiv tools against a local stub HTTP server."""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import settings
+from src.tools import academic, cache, http
+from src.tools.academic import search_academic
+from src.tools.web_search import search_web
+
+ATOM_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <id>http://arxiv.org/abs/2101.00001v1</id>
+    <published>2021-01-01T00:00:00Z</published>
+    <title>Active Learning
+      in Classrooms</title>
+    <summary>A study of active learning.</summary>
+    <author><name>Ada Lovelace</name></author>
+    <author><name>Alan Turing</name></author>
+  </entry>
+</feed>"""
+
+
+def search_response(method, path, query, body):
+    """Custom Search JSON on /cse and an Atom feed on /arxiv."""
+    if path == "/cse":
+        q = query["q"][0]
+        return 200, json.dumps({"items": [
+            {"title": f"Result for {q}", "link": "https://example.org", "snippet": "snippet"}
+        ]}).encode(), "application/json"
+    return 200, ATOM_FEED.encode(), "application/atom+xml"
+
+
+@pytest.fixture
+def stub(stub_http, monkeypatch, tmp_path):
+    def start(fail_first: int = 0, delay: float = 0.0):
+        server = stub_http(search_response, latency=delay, failures=[503] * fail_first)
+        monkeypatch.setattr(settings, "google_cse_base_url", f"{server.url}/cse")
+        monkeypatch.setattr(settings, "arxiv_api_url", f"{server.url}/arxiv")
+        monkeypatch.setattr(settings, "google_cse_id", "cx")
+        monkeypatch.setattr(settings, "google_search_api_key", "key")
+        monkeypatch.setattr(settings, "tool_cache_path", tmp_path / "tools.sqlite")
+        monkeypatch.setattr(cache, "_tool_cache", None)
+        monkeypatch.setattr(academic, "_arxiv_pacer", http.RequestPacer(0))
+        return server
+
+    return start
+
+
+def run(coro):
+    async def with_cleanup():
+        try:
+            return await coro
+        finally:
+            await http.aclose_async_client()
+    return asyncio.run(with_cleanup())
+
+
+def test_async_web_and_arxiv_results(stub):
+    server = stub()
+
+    web = run(search_web.ainvoke({"query": "active learning"}))
+    papers = run(search_academic.ainvoke({"query": "active learning"}))
+
+    assert "[Result for active learning](https://example.org)" in web
+    assert "**Active Learning in Classrooms**" in papers
+    assert "Authors: Ada Lovelace, Alan Turing" in papers
+    assert "Published: 2021-01-01" in papers
+    assert server.requests[0][2]["num"] == ["5"]
+
+
+def test_retries_transient_errors(stub, monkeypatch):
+    server = stub(fail_first=1)
+    monkeypatch.setattr(http.random, "uniform", lambda a, b: 0.0)
+
+    web = run(search_web.ainvoke({"query": "flipped classroom"}))
+
+    assert "Result for flipped classroom" in web
+    assert len(server.requests) == 2
+
+
+def test_concurrent_identical_calls_share_one_request(stub):
+    server = stub(delay=0.2)
+
+    async def many():
+        return await asyncio.gather(*[
+            search_web.ainvoke({"query": "peer instruction"}) for _ in range(5)
+        ])
+
+    results = run(many())
+
+    assert len(set(results)) == 1
+    assert len(server.requests) == 1
+    # Later calls are served from the cache
+    assert run(search_web.ainvoke({"query": "Peer  Instruction"})) == results[0]
+    assert len(server.requests) == 1
+
+
+def test_tool_modules_defer_client_libraries():
+    code = (
+        "import sys, src.tools.academic, src.tools.web_search; "
+        "print([m for m in ('arxiv', 'googleapiclient') if m in sys.modules])"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent,
+                            capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
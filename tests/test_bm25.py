@@ -0,0 +1,48 @@
+"""Tests for the BM25 keyword index and reciprocal rank fusion."""
+
+import sys
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.knowledge.bm25 import BM25Index, reciprocal_rank_fusion, tokenize
+
+TEXTS = [
+    "Dropout rates in MOOC courses remain high despite open enrollment.",
+    "Flipped classroom designs move lectures outside class time.",
+    "Educational data mining (EDM) predicts student dropout from logs.",
+    "Active learning improves exam performance in STEM courses.",
+]
+
+
+def test_tokenize_lowercases_and_drops_stopwords():
+    assert tokenize("The MOOC, and EDM-2023") == ["mooc", "edm", "2023"]
+
+
+def test_exact_terms_rank_matching_chunks_first():
+    index = BM25Index.from_texts(TEXTS)
+
+    assert [row for row, _ in index.search("MOOC", k=5)] == [0]
+    assert index.search("EDM dropout", k=1)[0][0] == 2
+    assert index.search("unrelated words", k=5) == []
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = BM25Index.from_texts(TEXTS)
+    index.save(tmp_path)
+
+    loaded = BM25Index.load(tmp_path)
+
+    assert loaded.num_docs == len(TEXTS)
+    assert loaded.search("student dropout", k=2) == index.search("student dropout", k=2)
+    assert BM25Index.load(tmp_path / "missing") is None
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    a, b, c = (Document(page_content=t, id=str(i)) for i, t in enumerate("abc"))
+
+    fused = reciprocal_rank_fusion([[a, b, c], [b, c]], limit=2)
+
+    assert [doc.id for doc in fused] == ["1", "2"]
@@ -0,0 +1,157 @@
+"""Tests for manifest-driven incremental knowledge base builds."""
+
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import List, Sequence
+
+import pytest
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.documents import Document
+
+from scripts import build_knowledge_base as build_kb
+from src.config import settings
+from src.knowledge.docstore import ColumnarDocstore
+from src.knowledge.manifest import KnowledgeBaseManifest
+from src.knowledge.vector_store import VectorStoreManager, resolve_index_dir
+
+from tests.test_vector_store import HashEmbeddings
+
+
+class StubLoader:
+    """Turns each line of a fake PDF into one chunk and records which files were loaded."""
+
+    def __init__(self, **kwargs):
+        self.file_timings = {}
+        self.loaded: List[List[str]] = []
+
+    def load_files(self, pdf_files: Sequence[Path], num_workers: int = 1,
+                   start_chunk_id: int = 0) -> List[Document]:
+        self.loaded.append([p.name for p in pdf_files])
+        docs = [
+            Document(page_content=line, metadata={"source": p.name})
+            for p in pdf_files
+            for line in p.read_text().splitlines()
+        ]
+        for i, doc in enumerate(docs, start=start_chunk_id):
+            doc.metadata["chunk_id"] = i
+        return docs
+
+
+@pytest.fixture
+def kb(tmp_path, monkeypatch):
+    papers = tmp_path / "papers"
+    papers.mkdir()
+    monkeypatch.setattr(settings, "papers_dir", papers)
+    monkeypatch.setattr(settings, "vector_store_dir", tmp_path / "faiss_index")
+    monkeypatch.setattr(settings, "manifest_path", tmp_path / "manifest.json")
+    monkeypatch.setattr(settings, "embedding_cache_enabled", False)
+    monkeypatch.setattr(settings, "embed_requests_per_minute", 0)
+    monkeypatch.setattr(settings, "ingest_workers", 1)
+
+    loaders = []
+
+    def make_loader(**kwargs):
+        loaders.append(StubLoader(**kwargs))
+        return loaders[-1]
+
+    def make_manager():
+        manager = VectorStoreManager()
+        manager.base_embeddings = manager.embeddings = HashEmbeddings()
+        return manager
+
+    monkeypatch.setattr(build_kb, "DocumentLoader", make_loader)
+    monkeypatch.setattr(build_kb, "VectorStoreManager", make_manager)
+    return papers, loaders
+
+
+def write_paper(papers: Path, name: str, *lines: str):
+    (papers / name).write_text("\n".join(lines))
+
+
+def indexed_texts() -> dict:
+    rows = ColumnarDocstore(resolve_index_dir(settings.vector_store_dir)).iter_rows()
+    return {doc_id: doc.page_content for doc_id, doc in rows}
+
+
+def test_diff_classifies_papers(tmp_path):
+    for name in ["a.pdf", "b.pdf", "c.pdf"]:
+        (tmp_path / name).write_text(name)
+    manifest = KnowledgeBaseManifest(tmp_path / "manifest.json")
+    for name in ["a.pdf", "b.pdf"]:
+        manifest.record_file(tmp_path / name, [], chunk_size=800, chunk_overlap=100, embedding_model="m")
+    manifest.record_file(tmp_path / "gone.pdf", [], chunk_size=800, chunk_overlap=100,
+                         embedding_model="m", sha256="0" * 64)
+    (tmp_path / "b.pdf").write_text("edited")
+
+    files = sorted(tmp_path.glob("*.pdf"))
+    diff = manifest.diff(files, chunk_size=800, chunk_overlap=100, embedding_model="m")
+
+    assert diff.added == [tmp_path / "c.pdf"]
+    assert diff.changed == [tmp_path / "b.pdf"]
+    assert diff.removed == ["gone.pdf"]
+    assert diff.unchanged == ["a.pdf"]
+    # A different chunking config or model re-embeds unchanged papers too
+    rechunked = manifest.diff(files, chunk_size=400, chunk_overlap=100, embedding_model="m")
+    assert rechunked.changed == [tmp_path / "a.pdf", tmp_path / "b.pdf"]
+    remodelled = manifest.diff(files, chunk_size=800, chunk_overlap=100, embedding_model="m2")
+    assert remodelled.changed == [tmp_path / "a.pdf", tmp_path / "b.pdf"]
+
+
+def test_incremental_build_replaces_changed_and_removed_papers(kb):
+    papers, loaders = kb
+    write_paper(papers, "a.pdf", "a one", "a two")
+    write_paper(papers, "b.pdf", "b one", "b two", "b three")
+    write_paper(papers, "c.pdf", "c one")
+    build_kb.build_knowledge_base()
+
+    write_paper(papers, "b.pdf", "b new")
+    (papers / "c.pdf").unlink()
+    write_paper(papers, "d.pdf", "d one", "d two")
+    build_kb.build_knowledge_base()
+
+    # Only the added and changed papers were loaded and embedded again
+    assert loaders[-1].loaded == [["d.pdf", "b.pdf"]]
+    assert indexed_texts() == {
+        "a.pdf#0": "a one", "a.pdf#1": "a two",
+        "b.pdf#0": "b new",
+        "d.pdf#0": "d one", "d.pdf#1": "d two",
+    }
+    manifest = KnowledgeBaseManifest.load(settings.manifest_path)
+    assert sorted(manifest.all_chunk_ids()) == sorted(indexed_texts())
+
+    reader = build_kb.VectorStoreManager()
+    reader.load_or_create()
+    assert reader.similarity_search("b new", k=1)[0].page_content == "b new"
+    assert sorted(doc.page_content for doc in reader.keyword_search("two", k=5)) == ["a two", "d two"]
+
+
+def test_unchanged_papers_leave_index_alone(kb):
+    papers, loaders = kb
+    write_paper(papers, "a.pdf", "a one")
+    build_kb.build_knowledge_base()
+    version = build_kb.VectorStoreManager().index_version()
+
+    build_kb.build_knowledge_base()
+
+    assert loaders[-1].loaded == []
+    assert build_kb.VectorStoreManager().index_version() == version
+
+
+def test_missing_index_forces_full_rebuild(kb):
+    papers, loaders = kb
+    write_paper(papers, "a.pdf", "a one")
+    write_paper(papers, "b.pdf", "b one")
+    build_kb.build_knowledge_base()
+    shutil.rmtree(settings.vector_store_dir)
+    write_paper(papers, "b.pdf", "b new")
+
+    build_kb.build_knowledge_base()
+
+    # The manifest alone would only re-embed b.pdf and drop a.pdf from retrieval
+    assert loaders[-1].loaded == [["a.pdf", "b.pdf"]]
+    assert indexed_texts() == {"a.pdf#0": "a one", "b.pdf#0": "b new"}
@@ -0,0 +1,153 @@
+"""Tests for the durable SQLite checkpointer."""
+
+import asyncio
+import operator
+import os
+import sqlite3
+import sys
+import time
+from itertools import cycle
+from pathlib import Path
+from typing import Annotated, List, TypedDict
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.tools import tool
+from langgraph.graph import END, StateGraph
+
+from src.agents import nodes
+from src.agents.checkpointer import SQLiteCheckpointer
+from src.agents.graph import build_graph
+
+
+class ChatState(TypedDict):
+    messages: Annotated[List[BaseMessage], operator.add]
+    turns: int
+
+
+def build(checkpointer):
+    def reply(state: ChatState):
+        return {
+            "messages": [AIMessage(content="answer " + state["messages"][-1].content * 50)],
+            "turns": state.get("turns", 0) + 1,
+        }
+
+    graph = StateGraph(ChatState)
+    graph.add_node("reply", reply)
+    graph.set_entry_point("reply")
+    graph.add_edge("reply", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def ask(graph, thread_id, text):
+    config = {"configurable": {"thread_id": thread_id}}
+    return graph.invoke({"messages": [HumanMessage(content=text)]}, config)
+
+
+def test_conversation_survives_restart(tmp_path):
+    path = tmp_path / "checkpoints.sqlite"
+    saver = SQLiteCheckpointer(path, vacuum_interval=0)
+    ask(build(saver), "t1", "first")
+    saver.close()
+
+    result = ask(build(SQLiteCheckpointer(path, vacuum_interval=0)), "t1", "second")
+
+    assert result["turns"] == 2
+    assert [m.content for m in result["messages"] if isinstance(m, HumanMessage)] == ["first", "second"]
+
+
+def test_retention_keeps_latest_checkpoints(tmp_path):
+    saver = SQLiteCheckpointer(tmp_path / "checkpoints.sqlite", max_per_thread=3, vacuum_interval=0)
+    graph = build(saver)
+    for i in range(10):
+        ask(graph, "t1", f"q{i}")
+
+    assert saver.stats()["checkpoints"] == 3
+    # The latest state is intact
+    state = graph.get_state({"configurable": {"thread_id": "t1"}})
+    assert state.values["turns"] == 10
+    assert len(state.values["messages"]) == 20
+
+
+def test_sweep_deletes_idle_threads(tmp_path):
+    saver = SQLiteCheckpointer(tmp_path / "checkpoints.sqlite", thread_ttl=0.2, vacuum_interval=0)
+    graph = build(saver)
+    ask(graph, "idle", "hello")
+    time.sleep(0.3)
+    ask(graph, "active", "hello")
+
+    assert saver.sweep() == 1
+    assert saver.get_tuple({"configurable": {"thread_id": "idle"}}) is None
+    assert saver.get_tuple({"configurable": {"thread_id": "active"}}) is not None
+    assert saver.stats()["threads"] == 1
+
+
+def test_payloads_are_compressed(tmp_path):
+    path = tmp_path / "checkpoints.sqlite"
+    saver = SQLiteCheckpointer(path, vacuum_interval=0)
+    ask(build(saver), "t1", "a long question " * 20)
+
+    types = {row[0] for row in sqlite3.connect(path).execute("SELECT type FROM checkpoints")}
+    assert any(t.startswith("zlib:") for t in types)
+
+
+def test_async_graph(tmp_path):
+    saver = SQLiteCheckpointer(tmp_path / "checkpoints.sqlite", vacuum_interval=0)
+    graph = build(saver)
+    config = {"configurable": {"thread_id": "t1"}}
+
+    async def run():
+        await graph.ainvoke({"messages": [HumanMessage(content="one")]}, config)
+        return await graph.ainvoke({"messages": [HumanMessage(content="two")]}, config)
+
+    assert asyncio.run(run())["turns"] == 2
+
+
+class ScriptedModel(GenericFakeChatModel):
+    """Replays scripted messages; tools are "bound" by ignoring them."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+@tool
+def search_knowledge_base(query: str) -> str:
+    """Knowledge base stand-in."""
+    return f"kb results for {query}"
+
+
+def test_agent_graph_stays_bounded_across_turns(tmp_path, monkeypatch):
+    model = ScriptedModel(messages=cycle([
+        AIMessage(content="Search the knowledge base."),
+        AIMessage(content="", tool_calls=[
+            {"name": "search_knowledge_base", "args": {"query": "active learning"}, "id": "call_1"}
+        ]),
+        AIMessage(content="Active learning helps [Smith, 2021]."),
+        AIMessage(content="VALID"),
+    ]))
+    monkeypatch.setattr(nodes, "get_llm", lambda: model)
+    monkeypatch.setattr(nodes, "search_knowledge_base", search_knowledge_base)
+    cached = [nodes.get_planner_chain, nodes.get_checker_chain, nodes.get_researcher_agent]
+    for getter in cached:
+        getter.cache_clear()
+    saver = SQLiteCheckpointer(tmp_path / "checkpoints.sqlite", max_per_thread=3, vacuum_interval=0)
+    graph = build_graph(checkpointer=saver)
+    config = {"configurable": {"thread_id": "t1"}}
+
+    try:
+        counts = []
+        for i in range(6):
+            graph.invoke({"query": f"q{i}", "messages": [HumanMessage(content=f"q{i}")],
+                          "plan": "", "iteration": 0}, config)
+            with saver._lock:
+                namespaces, = saver._conn.execute(
+                    "SELECT COUNT(DISTINCT checkpoint_ns) FROM checkpoints").fetchone()
+            counts.append((namespaces, saver.stats()["checkpoints"]))
+    finally:
+        for getter in cached:
+            getter.cache_clear()
+
+    assert counts[-1] == counts[1] == (1, 3)
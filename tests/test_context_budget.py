@@ -0,0 +1,102 @@
+"""Tests for token-budgeted context packing."""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain.agents import create_agent
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+
+from src.agents.prompt_budget import OMITTED, PromptBudgetMiddleware, _message_tokens
+from src.context_budget import ContextBudget, count_tokens, truncate_to_tokens
+
+
+def passage(word, n=50):
+    return " ".join([word] * n)
+
+
+def test_truncate_respects_limit():
+    text = passage("evidence", 400)
+
+    cut = truncate_to_tokens(text, 50)
+
+    assert count_tokens(cut) <= 50
+    assert cut.endswith("[truncated]")
+    assert truncate_to_tokens("short", 50) == "short"
+
+
+def test_highest_scores_are_kept_in_original_order():
+    items = [passage("alpha"), passage("beta"), passage("gamma")]
+    budget = ContextBudget("test", count_tokens(items[0]) * 2 + 10, min_partial_tokens=10 ** 6)
+
+    kept = budget.select(items, scores=[0.1, 0.9, 0.5])
+
+    assert kept == [None, items[1], items[2]]
+    assert budget.pack(items, scores=[0.1, 0.9, 0.5]) == items[1] + "\n\n" + items[2]
+
+
+def test_overflowing_item_is_truncated_into_remaining_space():
+    items = [passage("alpha"), passage("beta", 500)]
+    budget = ContextBudget("test", count_tokens(items[0]) + 60, min_partial_tokens=20)
+
+    kept = budget.select(items)
+
+    assert kept[0] == items[0]
+    assert kept[1].startswith("beta") and kept[1].endswith("[truncated]")
+    assert count_tokens(budget.pack(items)) <= budget.max_tokens
+
+
+def test_fit_leaves_small_text_alone():
+    budget = ContextBudget("test", 100)
+
+    assert budget.fit("a short draft") == "a short draft"
+    assert count_tokens(budget.fit(passage("draft", 1000))) <= 100
+
+
+class RecordingModel(GenericFakeChatModel):
+    """Replays scripted messages and records every prompt it is sent."""
+
+    prompts: list = []
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, *args, **kwargs):
+        self.prompts.append(messages)
+        return super()._generate(messages, *args, **kwargs)
+
+
+@tool
+def search(query: str) -> str:
+    """Returns a long result."""
+    return passage(query, 300)
+
+
+def test_researcher_prompt_stays_in_budget_across_tool_turns():
+    turns = [
+        AIMessage(content="", tool_calls=[{"name": "search", "args": {"query": f"topic{i}"}, "id": f"call_{i}"}])
+        for i in range(20)
+    ]
+    model = RecordingModel(messages=iter(turns + [AIMessage(content="Final answer.")]))
+    budget = 1500
+    agent = create_agent(model=model, tools=[search], system_prompt="You research.",
+                         middleware=[PromptBudgetMiddleware(budget)])
+
+    result = agent.invoke({"messages": [HumanMessage(content="Research everything.")]})
+
+    assert len(model.prompts) == 21
+    # Unbounded, the last prompt would hold 20 results of ~300 tokens each
+    assert sum(count_tokens(m.content) for m in result["messages"] if isinstance(m, ToolMessage)) > 5 * budget
+    for prompt in model.prompts:
+        assert sum(_message_tokens(m) for m in prompt) <= budget
+    last = model.prompts[-1]
+    tool_results = [m.content for m in last if isinstance(m, ToolMessage)]
+    # Every tool call still has its result; the newest are kept verbatim
+    assert len(tool_results) == 20
+    assert tool_results[-1] == passage("topic19", 300)
+    assert tool_results[0] == OMITTED
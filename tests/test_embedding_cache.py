@@ -0,0 +1,34 @@
+"""Tests for the persistent embedding cache."""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.knowledge.embedding_cache import EmbeddingCache
+
+
+def stored_bytes(cache):
+    return cache._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+
+def test_size_counter_tracks_inserts_and_replacements(tmp_path):
+    cache = EmbeddingCache(tmp_path / "embeddings.sqlite")
+    cache.put_many("m", ["a", "b", "a "], [[1.0] * 4, [2.0] * 4, [3.0] * 4])  # "a " normalizes to "a"
+    cache.put_many("m", ["b", "c"], [[4.0] * 8, [5.0] * 4])
+
+    assert cache.size_bytes == stored_bytes(cache) == (4 + 8 + 4) * 4
+    assert cache.get_many("m", ["a", "b"]) == [[3.0] * 4, [4.0] * 8]
+    # Re-opening re-syncs from disk
+    assert EmbeddingCache(tmp_path / "embeddings.sqlite").size_bytes == cache.size_bytes
+
+
+def test_evicts_least_recently_used_over_size_limit(tmp_path):
+    cache = EmbeddingCache(tmp_path / "embeddings.sqlite", max_bytes=100)
+    for i in range(5):
+        cache.put_many("m", [f"text {i}"], [[float(i)] * 8])  # 32 bytes each
+
+    assert cache.size_bytes == stored_bytes(cache) <= 100
+    assert cache.get_many("m", ["text 0", "text 4"]) == [None, [4.0] * 8]
@@ -0,0 +1,120 @@
+"""Tests for the batch embedding scheduler against a local stub embedding server."""
+
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import List
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.config import settings
+from src.knowledge.vector_store import EmbeddingScheduler, VectorStoreManager, is_retryable_error
+
+
+def fake_vector(text: str) -> List[float]:
+    return [float(len(text)), float(sum(map(ord, text)) % 997), 1.0]
+
+
+def embed_response(method, path, query, body):
+    """Stub embedding endpoint: one fake vector per posted text."""
+    texts = json.loads(body)["texts"]
+    return 200, json.dumps({"vectors": [fake_vector(t) for t in texts]}).encode(), "application/json"
+
+
+class StubServerEmbeddings(Embeddings):
+    """Embeddings client for the stub server (HTTP errors surface as HTTPError.code)."""
+
+    def __init__(self, server_url: str):
+        self.url = f"{server_url}/embed"
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({"texts": texts}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return json.loads(response.read())["vectors"]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+@pytest.fixture
+def stub_server(stub_http):
+    return lambda **kwargs: stub_http(embed_response, **kwargs)
+
+
+def test_scheduler_retries_rate_limits_and_server_errors(stub_server):
+    server = stub_server(failures=[429, 503, 429])
+    scheduler = EmbeddingScheduler(
+        StubServerEmbeddings(server.url), batch_size=7, max_concurrency=3, base_delay=0.01
+    )
+    texts = [f"chunk {i}" for i in range(50)]
+
+    results = {}
+    for start, vectors in scheduler.run(texts):
+        for offset, vector in enumerate(vectors):
+            results[start + offset] = vector
+
+    assert [results[i] for i in range(len(texts))] == [fake_vector(t) for t in texts]
+    assert len(server.requests) == 8 + 3  # 8 batches plus 3 retried failures
+
+
+def test_scheduler_bounds_in_flight_requests(stub_server):
+    server = stub_server(latency=0.05)
+    scheduler = EmbeddingScheduler(StubServerEmbeddings(server.url), batch_size=2, max_concurrency=3)
+
+    list(scheduler.run([f"t{i}" for i in range(30)]))
+
+    assert server.max_in_flight <= 3
+    assert server.max_in_flight > 1
+
+
+def test_scheduler_does_not_retry_client_errors(stub_server):
+    server = stub_server(failures=[400])
+    scheduler = EmbeddingScheduler(StubServerEmbeddings(server.url), batch_size=10, base_delay=0.01)
+
+    with pytest.raises(urllib.error.HTTPError):
+        list(scheduler.run(["a", "b"]))
+    assert len(server.requests) == 1
+
+
+def test_retryable_error_classification():
+    assert is_retryable_error(RuntimeError("429 RESOURCE_EXHAUSTED: quota exceeded"))
+    assert not is_retryable_error(ValueError("400 INVALID_ARGUMENT"))
+
+    wrapped = RuntimeError("Error embedding content")
+    wrapped.__cause__ = urllib.error.HTTPError("http://x", 503, "Unavailable", None, None)
+    assert is_retryable_error(wrapped)
+
+
+def test_manager_writes_batches_into_index(stub_server, tmp_path, monkeypatch):
+    server = stub_server(failures=[500])
+    monkeypatch.setattr(settings, "embedding_cache_enabled", False)
+    monkeypatch.setattr(settings, "embed_batch_size", 4)
+    monkeypatch.setattr(settings, "embed_requests_per_minute", 0)
+
+    manager = VectorStoreManager()
+    manager.base_embeddings = manager.embeddings = StubServerEmbeddings(server.url)
+    manager.index_path = tmp_path / "faiss_index"
+    documents = [Document(page_content=f"paper text {i}", metadata={"chunk_id": i}) for i in range(10)]
+    ids = [f"paper.pdf#{i}" for i in range(10)]
+
+    manager.create(documents, ids=ids)
+
+    store = manager.vector_store
+    assert store.index.ntotal == 10
+    for i in range(10):
+        assert store.docstore.search(ids[i]).metadata["chunk_id"] == i
+    assert (tmp_path / "faiss_index").exists()
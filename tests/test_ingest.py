@@ -0,0 +1,148 @@
+"""Tests for streaming ingestion with delta checkpoints."""
+
+import os
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.documents import Document
+
+from src.config import settings
+from src.knowledge.docstore import ColumnarDocstore
+from src.knowledge.ingest import StreamingIngestor
+from src.knowledge.vector_store import VectorStoreManager, resolve_index_dir
+
+from tests.test_vector_store import HashEmbeddings
+
+
+class StubLoader:
+    """Yields `chunks` chunks per file, optionally failing after `fail_after` in total."""
+
+    chunk_size = 800
+    chunk_overlap = 100
+
+    def __init__(self, chunks: int, fail_after: int = -1):
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.yielded = 0
+
+    def iter_pdf_chunks(self, pdf_path: Path) -> Iterator[Document]:
+        for i in range(self.chunks):
+            if self.yielded == self.fail_after:
+                raise RuntimeError("interrupted")
+            self.yielded += 1
+            yield Document(page_content=f"{pdf_path.name} chunk {i}", metadata={"source": pdf_path.name})
+
+
+def make_manager():
+    manager = VectorStoreManager()
+    manager.base_embeddings = manager.embeddings = HashEmbeddings()
+    return manager
+
+
+@pytest.fixture
+def pdfs(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "embedding_cache_enabled", False)
+    monkeypatch.setattr(settings, "embed_requests_per_minute", 0)
+    paths = []
+    for name in ["a.pdf", "b.pdf", "c.pdf"]:
+        path = tmp_path / name
+        path.write_bytes(name.encode())
+        paths.append(path)
+    return paths
+
+
+def finalize(ingestor, tmp_path):
+    ingestor.finalize(tmp_path / "index", tmp_path / "manifest.json")
+    return sorted(doc_id for doc_id, _ in ColumnarDocstore(resolve_index_dir(tmp_path / "index")).iter_rows())
+
+
+def shard_sizes(work_dir):
+    return [len(ColumnarDocstore(p.parent)) for p in sorted((work_dir / "shards").glob("*/shard.json"))]
+
+
+def test_resume_continues_after_last_shard(pdfs, tmp_path):
+    work_dir = tmp_path / "partial"
+    first = StreamingIngestor(StubLoader(10, fail_after=17), make_manager(), "model", work_dir,
+                              window_size=4, checkpoint_every=1)
+    with pytest.raises(RuntimeError):
+        first.run(pdfs)
+
+    # Each checkpoint holds only its own window
+    assert shard_sizes(work_dir) == [4, 4, 4, 4]
+
+    second = StreamingIngestor(StubLoader(10), make_manager(), "model", work_dir, window_size=4, checkpoint_every=1)
+    manifest = second.run(pdfs)
+
+    expected = sorted(f"{p.name}#{i}" for p in pdfs for i in range(10))
+    assert sorted(manifest.all_chunk_ids()) == expected
+    # Chunks checkpointed before the interruption were not embedded again
+    assert sum(shard_sizes(work_dir)) == 30
+    assert finalize(second, tmp_path) == expected
+    assert not work_dir.exists()
+
+    reader = make_manager()
+    reader.index_path = tmp_path / "index"
+    reader.load_or_create()
+    assert reader.vector_store.index.ntotal == 30
+    # Published vectors are the ones that were embedded
+    assert reader.similarity_search("b.pdf chunk 3", k=1)[0].page_content == "b.pdf chunk 3"
+
+
+def test_changed_file_deletions_survive_resume(pdfs, tmp_path):
+    work_dir = tmp_path / "partial"
+    StreamingIngestor(StubLoader(6), make_manager(), "model", work_dir,
+                      window_size=4, checkpoint_every=1).run(pdfs)
+
+    # b.pdf shrinks; its old chunks are deleted, then the build is interrupted
+    pdfs[1].write_bytes(b"changed")
+    with pytest.raises(RuntimeError):
+        StreamingIngestor(StubLoader(3, fail_after=2), make_manager(), "model", work_dir,
+                          window_size=1, checkpoint_every=1).run(pdfs)
+
+    ingestor = StreamingIngestor(StubLoader(3), make_manager(), "model", work_dir,
+                                 window_size=1, checkpoint_every=1)
+    ingestor.run(pdfs)
+
+    assert finalize(ingestor, tmp_path) == sorted(
+        [f"a.pdf#{i}" for i in range(6)] + [f"b.pdf#{i}" for i in range(3)] + [f"c.pdf#{i}" for i in range(6)]
+    )
+
+
+def test_memory_does_not_grow_with_corpus(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "embedding_cache_enabled", False)
+    monkeypatch.setattr(settings, "embed_requests_per_minute", 0)
+
+    class BigChunkLoader(StubLoader):
+        def iter_pdf_chunks(self, pdf_path):
+            for doc in super().iter_pdf_chunks(pdf_path):
+                doc.page_content += " " + "x" * 4000
+                yield doc
+
+    def peak_during_run(num_files):
+        papers = tmp_path / f"papers{num_files}"
+        papers.mkdir()
+        pdfs = []
+        for i in range(num_files):
+            pdfs.append(papers / f"{i:04d}.pdf")
+            pdfs[-1].write_bytes(str(i).encode())
+        ingestor = StreamingIngestor(BigChunkLoader(20), make_manager(), "model",
+                                     tmp_path / f"partial{num_files}", window_size=16, checkpoint_every=2)
+        tracemalloc.start()
+        try:
+            ingestor.run(pdfs)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small = peak_during_run(5)
+    large = peak_during_run(40)
+
+    # 700 more chunks of ~4 KB each would add ~2.8 MB if they were kept in memory
+    assert large - small < 500_000
@@ -0,0 +1,62 @@
+"""Tests for PDF loading and chunking."""
+
+import sys
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.knowledge.loader import DocumentLoader
+
+
+def write_pdf(path: Path, pages: List[List[str]]):
+    """Minimal text PDF: one Helvetica line per string, one page per list."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for lines in pages:
+        text = " ".join(f"({line}) Tj 0 -14 Td" for line in lines)
+        stream = f"BT /F1 10 Tf 40 780 Td {text} ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects),)
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+def test_chunks_do_not_depend_on_worker_count(tmp_path):
+    pdf_files = []
+    for paper, page_count in enumerate([3, 1, 4, 2]):
+        pdf_files.append(tmp_path / f"paper_{paper}.pdf")
+        write_pdf(pdf_files[-1], [
+            [f"Paper {paper} page {page} sentence {line} about active learning." for line in range(12)]
+            for page in range(page_count)
+        ])
+    loader = DocumentLoader(chunk_size=200, chunk_overlap=40)
+
+    sequential = loader.load_files(pdf_files, num_workers=1, start_chunk_id=7)
+    parallel = loader.load_files(pdf_files, num_workers=3, start_chunk_id=7)
+
+    assert len(sequential) > 2 * sum([3, 1, 4, 2])
+    assert [doc.page_content for doc in parallel] == [doc.page_content for doc in sequential]
+    assert [doc.metadata for doc in parallel] == [doc.metadata for doc in sequential]
+    assert [doc.metadata["chunk_id"] for doc in parallel] == list(range(7, 7 + len(sequential)))
+    # Grouped by paper in the given order
+    sources = [doc.metadata["source"] for doc in parallel]
+    assert sorted(set(sources), key=sources.index) == [p.name for p in pdf_files]
@@ -0,0 +1,44 @@
+"""Tests for the in-memory LRU/TTL query cache."""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.knowledge.query_cache import TTLCache
+
+
+def test_evicts_least_recently_used():
+    cache = TTLCache(max_size=2, ttl=None)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(max_size=10, ttl=0.05)
+    cache.put("query", [0.1, 0.2])
+    assert cache.get("query") == [0.1, 0.2]
+
+    time.sleep(0.06)
+
+    assert cache.get("query") is None
+    assert len(cache) == 0
+
+
+def test_stats_count_hits_and_misses():
+    cache = TTLCache(max_size=10)
+    cache.get("missing")
+    cache.put("present", 1)
+    cache.get("present")
+
+    stats = cache.stats()
+
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
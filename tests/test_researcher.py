@@ -0,0 +1,62 @@
+"""Tests for the researcher node's single-pass agent run."""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+
+from src.agents import nodes
+
+
+class CountingFakeModel(GenericFakeChatModel):
+    """Replays scripted messages and counts model calls."""
+
+    calls: int = 0
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, *args, **kwargs):
+        self.calls += 1
+        return super()._generate(*args, **kwargs)
+
+
+@tool
+def search_knowledge_base(query: str) -> str:
+    """Knowledge base stand-in."""
+    return f"kb results for {query}"
+
+
+def test_researcher_runs_agent_once(monkeypatch):
+    model = CountingFakeModel(messages=iter([
+        AIMessage(content="", tool_calls=[
+            {"name": "search_knowledge_base", "args": {"query": "active learning"}, "id": "call_1"}
+        ]),
+        AIMessage(content=[{"type": "text", "text": "Final answer with References."}]),
+    ]))
+    monkeypatch.setattr(nodes, "get_llm", lambda: model)
+    monkeypatch.setattr(nodes, "search_knowledge_base", search_knowledge_base)
+    nodes.get_researcher_agent.cache_clear()
+
+    result = nodes.researcher_node({
+        "query": "What is active learning?",
+        "plan": "Search the knowledge base.",
+        "messages": [HumanMessage(content="What is active learning?")],
+        "iteration": 0,
+    })
+
+    assert model.calls == 2
+    assert result["draft_answer"] == "Final answer with References."
+    assert [step["type"] for step in result["agent_steps"]] == ["reasoning", "tool_call", "reasoning"]
+    assert result["agent_steps"][0]["content"] == "Calling tools: search_knowledge_base"
+    assert result["agent_steps"][1]["result"] == "kb results for active learning"
+    assert result["iteration"] == 1
+    # Later iterations reuse the compiled agent
+    assert nodes.get_researcher_agent() is nodes.get_researcher_agent()
+    nodes.get_researcher_agent.cache_clear()
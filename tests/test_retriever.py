@@ -0,0 +1,113 @@
+"""Tests for the knowledge base search tool and its result cache."""
+
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import settings
+from src.context_budget import count_tokens
+from src.tools import retriever
+from src.tools.retriever import SearchTool
+
+from tests.test_vector_store import HashEmbeddings, documents, manager  # noqa: F401  (fixture)
+
+
+@pytest.fixture
+def kb(manager, monkeypatch):  # noqa: F811
+    manager.create(documents(0, 50), ids=[f"doc#{i}" for i in range(50)])
+    monkeypatch.setattr(retriever, "_vector_manager", manager)
+    retriever._result_cache.clear()
+    return manager
+
+
+def test_results_from_a_search_overlapping_an_index_change_are_not_cached(kb, monkeypatch):
+    search = kb.similarity_search
+
+    def search_during_update(query, k=5):
+        results = search(query, k=k)
+        # The index changes after the results were read but before they are cached,
+        # and another search sees the new generation first
+        kb.delete(["doc#7"])
+        monkeypatch.setattr(kb, "similarity_search", search)
+        SearchTool.search("chunk 8", k=1)
+        return results
+
+    monkeypatch.setattr(kb, "similarity_search", search_during_update)
+    stale = SearchTool.search("chunk 7", k=1)["raw_docs"]
+
+    fresh = SearchTool.search("chunk 7", k=1)["raw_docs"]
+
+    assert stale[0].metadata["chunk_id"] == 7
+    assert fresh[0].metadata["chunk_id"] != 7
+
+
+class RecordingGeminiEmbeddings(GoogleGenerativeAIEmbeddings):
+    """Gemini embedder that records its requests and returns HashEmbeddings vectors."""
+
+    requests: List[List[str]] = []
+
+    def embed_documents(self, texts, **kwargs):
+        self.requests.append(list(texts))
+        return HashEmbeddings().embed_documents(texts)
+
+    def embed_query(self, text, **kwargs):
+        raise AssertionError("batched queries must not be embedded one by one")
+
+
+def test_batch_queries_are_embedded_in_one_request(kb):
+    embedder = RecordingGeminiEmbeddings(model="models/test", google_api_key="test-key")
+    kb.base_embeddings = embedder
+
+    result = SearchTool.search_many(["chunk 3", "chunk 11", "  chunk 3 ", "chunk 20"], k=3)
+
+    # The repeated query is searched (and embedded) once
+    assert embedder.requests == [["chunk 3", "chunk 11", "chunk 20"]]
+    assert list(result["per_query"]) == ["chunk 3", "chunk 11", "chunk 20"]
+
+    # Results are cached under each query's key
+    hits = retriever._result_cache.hits
+    again = SearchTool.search_many(["chunk 11", "chunk 3"], k=3)
+    assert retriever._result_cache.hits == hits + 2
+    assert len(embedder.requests) == 1
+    assert again["per_query"]["chunk 3"] == result["per_query"]["chunk 3"]
+
+
+def test_batch_results_match_single_query_search(kb):
+    queries = ["chunk 3", "chunk 11", "chunk 20"]
+
+    batched = SearchTool.search_many(queries, k=4)["per_query"]
+    retriever._result_cache.clear()
+
+    for query in queries:
+        single = SearchTool.search(query, k=4)["raw_docs"]
+        assert [doc.id for doc in batched[query]] == [doc.id for doc in single]
+        assert len(single) == 4
+
+
+def test_batch_budget_keeps_every_querys_top_chunk_first(kb, monkeypatch):
+    # Queries whose results don't overlap, so none is deduplicated away
+    queries = ["chunk 0", "chunk 1", "chunk 4"]
+    per_query = SearchTool.search_many(queries, k=4)["per_query"]
+    ids = [doc.id for query in queries for doc in per_query[query]]
+    assert len(set(ids)) == len(ids) == 12
+    tops = [per_query[query][0] for query in queries]
+    assert [doc.metadata["chunk_id"] for doc in tops] == [0, 1, 4]
+
+    # Room for exactly one chunk per query
+    texts = [retriever._format_doc(doc) for doc in tops]
+    budget = sum(count_tokens(text) for text in texts) + 2 * count_tokens("\n\n")
+    monkeypatch.setattr(settings, "kb_context_tokens", budget)
+
+    result = SearchTool.search_many(queries, k=4)
+
+    assert result["raw_docs"] == tops
+    assert result["context_str"] == "\n\n".join(
+        f"### {query}\n{text}" for query, text in zip(queries, texts)
+    )
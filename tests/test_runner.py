@@ -0,0 +1,83 @@
+"""Tests for the shared background agent runner."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents.runner import AgentRunner
+
+
+@pytest.fixture
+def runner():
+    runner = AgentRunner(max_concurrent=2)
+    yield runner
+    runner.shutdown()
+
+
+def test_streams_run_on_one_loop_with_bounded_concurrency(runner):
+    active = []
+    peak = []
+    loops = set()
+    lock = threading.Lock()
+
+    async def events(n):
+        loops.add(id(asyncio.get_running_loop()))
+        with lock:
+            active.append(n)
+            peak.append(len(active))
+        await asyncio.sleep(0.2)
+        yield f"event {n}"
+        with lock:
+            active.remove(n)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda n: list(runner.stream(lambda: events(n))), range(4)))
+
+    assert results == [[f"event {n}"] for n in range(4)]
+    assert max(peak) == 2
+    assert len(loops) == 1
+    stats = runner.stats()
+    assert stats["completed"] == 4 and stats["queued"] == 0 and stats["running"] == 0
+    assert stats["max_wait_seconds"] > 0.1
+
+
+def test_errors_reach_the_caller(runner):
+    async def events():
+        yield 1
+        raise ValueError("boom")
+
+    stream = runner.stream(events)
+    assert next(stream) == 1
+    with pytest.raises(ValueError, match="boom"):
+        next(stream)
+    assert runner.stats()["failed"] == 1
+
+
+def test_closing_the_stream_cancels_the_run(runner):
+    finished = threading.Event()
+
+    async def events():
+        yield "first"
+        await asyncio.sleep(5)
+        finished.set()
+        yield "never"
+
+    stream = runner.stream(events)
+    assert next(stream) == "first"
+    stream.close()
+
+    deadline = time.time() + 2
+    while runner.stats()["running"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert runner.stats()["running"] == 0
+    assert runner.stats()["cancelled"] == 1
+    assert not finished.is_set()
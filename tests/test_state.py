@@ -0,0 +1,92 @@
+"""Tests for the bounded conversation state reducers."""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.agents.nodes import format_history
+from src.agents.state import SUMMARY_ID, bounded_messages, bounded_steps, split_summary
+from src.config import settings
+
+
+def turn(i):
+    return [
+        HumanMessage(content=f"question {i}"),
+        AIMessage(content=f"[PLAN] plan {i}", name="planner"),
+        AIMessage(content=f"[RESEARCH DRAFT 1] answer {i}...", name="researcher"),
+        AIMessage(content="[CHECKER] VALID", name="checker"),
+    ]
+
+
+def test_window_is_kept_verbatim_until_full():
+    messages = bounded_messages([], turn(0))
+    messages = bounded_messages(messages, turn(1))
+
+    assert [m.content for m in messages] == [m.content for m in turn(0) + turn(1)]
+
+
+def test_overflow_folds_into_rolling_summary(monkeypatch):
+    monkeypatch.setattr(settings, "message_window", 4)
+    messages = []
+    for i in range(3):
+        for message in turn(i):
+            messages = bounded_messages(messages, [message])
+
+    summary, recent = split_summary(messages)
+    assert messages[0].id == SUMMARY_ID
+    assert len(recent) == 4
+    assert recent[0].content == "question 2"
+    assert summary.splitlines()[1:] == [
+        "- User asked: question 0",
+        "- Answered: answer 0...",
+        "- User asked: question 1",
+        "- Answered: answer 1...",
+    ]
+
+
+def test_summary_is_capped_and_rolls(monkeypatch):
+    monkeypatch.setattr(settings, "message_window", 2)
+    monkeypatch.setattr(settings, "summary_max_lines", 3)
+    messages = []
+    for i in range(50):
+        messages = bounded_messages(messages, turn(i))
+
+    summary, recent = split_summary(messages)
+    assert len(messages) == 3
+    assert summary.splitlines()[1:] == [
+        "- User asked: question 48",
+        "- Answered: answer 48...",
+        "- User asked: question 49",
+    ]
+    assert recent[0].content == "[RESEARCH DRAFT 1] answer 49..."
+
+
+def test_messages_with_same_id_are_replaced_not_appended():
+    first = HumanMessage(content="draft", id="m1")
+    messages = bounded_messages([first], [HumanMessage(content="edited", id="m1")])
+
+    assert [m.content for m in messages] == ["edited"]
+
+
+def test_steps_are_capped(monkeypatch):
+    monkeypatch.setattr(settings, "max_agent_steps", 5)
+    steps = [{"type": "reasoning", "content": str(i)} for i in range(12)]
+
+    kept = bounded_steps([{"type": "old"}], steps)
+
+    assert [s["content"] for s in kept] == ["7", "8", "9", "10", "11"]
+
+
+def test_history_includes_summary_then_recent(monkeypatch):
+    monkeypatch.setattr(settings, "message_window", 2)
+    messages = bounded_messages([], turn(0) + turn(1))
+
+    history = format_history(messages, limit=1, max_chars=10)
+
+    assert history.startswith("Summary of earlier conversation:")
+    assert history.endswith("AI: [CHECKER] ")
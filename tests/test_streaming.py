@@ -0,0 +1,138 @@
+"""Tests for token-level streaming of the researcher's draft."""
+
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_core.tools import StructuredTool
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.agents import nodes
+from src.agents.graph import build_graph
+from src.agents.streaming import astream_run, stream_run
+
+
+class StreamingFakeModel(GenericFakeChatModel):
+    """Replays scripted messages word by word; tool calls arrive as one chunk."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = next(self.messages)
+        if message.tool_calls:
+            chunks = [AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                for i, call in enumerate(message.tool_calls)
+            ])]
+        else:
+            chunks = [AIMessageChunk(content=word + " ") for word in message.content.split(" ")]
+        for chunk in chunks:
+            generation = ChatGenerationChunk(message=chunk)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.content, chunk=generation)
+            yield generation
+
+
+tool_paths = []
+
+
+def _kb_sync(query: str) -> str:
+    tool_paths.append("sync")
+    return f"kb results for {query}"
+
+
+async def _kb_async(query: str) -> str:
+    tool_paths.append("async")
+    return f"kb results for {query}"
+
+
+# Records which implementation the graph used
+search_knowledge_base = StructuredTool.from_function(
+    func=_kb_sync, coroutine=_kb_async, name="search_knowledge_base",
+    description="Knowledge base stand-in.",
+)
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    model = StreamingFakeModel(messages=iter([
+        AIMessage(content="Search the knowledge base."),
+        AIMessage(content="", tool_calls=[
+            {"name": "search_knowledge_base", "args": {"query": "active learning"}, "id": "call_1"}
+        ]),
+        AIMessage(content="Active learning helps [Smith, 2021]."),
+        AIMessage(content="VALID"),
+    ]))
+    monkeypatch.setattr(nodes, "get_llm", lambda: model)
+    monkeypatch.setattr(nodes, "search_knowledge_base", search_knowledge_base)
+    tool_paths.clear()
+    cached = [nodes.get_planner_chain, nodes.get_checker_chain, nodes.get_researcher_agent]
+    for getter in cached:
+        getter.cache_clear()
+    yield build_graph(checkpointer=MemorySaver())
+    for getter in cached:
+        getter.cache_clear()
+
+
+def initial_state(query):
+    return {"query": query, "messages": [HumanMessage(content=query)], "plan": "", "iteration": 0}
+
+
+def test_draft_tokens_stream_before_validation(agent):
+    config = {"configurable": {"thread_id": "t1"}}
+    events = list(stream_run(agent, initial_state("What is active learning?"), config))
+
+    kinds = [kind for kind, _ in events]
+    nodes_done = [payload[0] for kind, payload in events if kind == "node"]
+    tokens = [payload for kind, payload in events if kind == "token"]
+    final_state = [payload for kind, payload in events if kind == "state"][-1]
+
+    assert nodes_done == ["planner", "researcher", "checker"]
+    assert kinds.count("draft") == 1
+    # Only the researcher's answer streams, and it arrives before the checker runs
+    assert "".join(tokens).strip() == final_state["draft_answer"].strip()
+    assert kinds.index("token") < kinds.index("node", kinds.index("draft"))
+    assert final_state["validation_status"] == "VALID"
+
+
+def test_async_stream(agent):
+    async def collect():
+        config = {"configurable": {"thread_id": "t2"}}
+        return [event async for event in astream_run(agent, initial_state("Active learning?"), config)]
+
+    events = asyncio.run(collect())
+    tokens = [payload for kind, payload in events if kind == "token"]
+
+    assert "".join(tokens).strip() == "Active learning helps [Smith, 2021]."
+
+
+def test_sync_and_async_runs_use_matching_tool_paths(agent):
+    list(stream_run(agent, initial_state("Active learning?"), {"configurable": {"thread_id": "t3"}}))
+    assert tool_paths == ["sync"]
+
+    async def collect():
+        config = {"configurable": {"thread_id": "t4"}}
+        return [event async for event in astream_run(agent, initial_state("Active learning?"), config)]
+
+    agent_model = nodes.get_llm()
+    agent_model.messages = iter([
+        AIMessage(content="Search the knowledge base."),
+        AIMessage(content="", tool_calls=[
+            {"name": "search_knowledge_base", "args": {"query": "active learning"}, "id": "call_2"}
+        ]),
+        AIMessage(content="Active learning helps."),
+        AIMessage(content="VALID"),
+    ])
+    asyncio.run(collect())
+    assert tool_paths == ["sync", "async"]
@@ -0,0 +1,114 @@
+"""Tests for the persistent tool result cache."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.tools.cache import ToolResultCache, cache_key
+
+
+def test_key_normalizes_case_and_whitespace():
+    assert cache_key("Active  Learning ", max_results=5) == cache_key("active learning", max_results=5)
+    assert cache_key("active learning", max_results=5) != cache_key("active learning", max_results=10)
+
+
+def test_concurrent_identical_requests_share_one_call(tmp_path):
+    cache = ToolResultCache(tmp_path / "tools.sqlite")
+    calls = []
+    lock = threading.Lock()
+
+    def compute():
+        with lock:
+            calls.append(1)
+        time.sleep(0.2)
+        return {"context_str": "results"}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(
+            lambda _: cache.get_or_compute("arxiv", "k", 60, compute), range(8)
+        ))
+
+    assert len(calls) == 1
+    assert all(r == {"context_str": "results"} for r in results)
+    # Later callers are served from disk, including by a new instance
+    assert ToolResultCache(tmp_path / "tools.sqlite").get("arxiv", "k") == {"context_str": "results"}
+
+
+def test_expired_and_error_results_are_recomputed(tmp_path):
+    cache = ToolResultCache(tmp_path / "tools.sqlite")
+    cache.put("google_search", "k", {"context_str": "old"}, ttl=0.0)
+    assert cache.get("google_search", "k") is None
+
+    cache.get_or_compute("google_search", "e", 60, lambda: {"context_str": "", "error": "Timeout"})
+    assert cache.get("google_search", "e") is None
+
+
+def test_evicts_least_recently_used_over_size_limit(tmp_path):
+    cache = ToolResultCache(tmp_path / "tools.sqlite", max_bytes=2000)
+    for i in range(5):
+        cache.put("arxiv", f"k{i}", {"context_str": "x" * 500}, ttl=60)
+
+    assert cache.size_bytes <= 2000
+    assert cache.get("arxiv", "k0") is None
+    assert cache.get("arxiv", "k4") is not None
+
+
+def test_size_counter_tracks_writes_without_rescanning(tmp_path):
+    cache = ToolResultCache(tmp_path / "tools.sqlite")
+    cache.put("arxiv", "a", {"context_str": "x" * 100}, ttl=60)
+    cache.put("arxiv", "a", {"context_str": "x" * 40}, ttl=60)  # Replaced
+    cache.put("arxiv", "b", {"context_str": "y" * 10}, ttl=0.0)
+    cache.get("arxiv", "b")  # Expired and deleted
+
+    assert cache.size_bytes == cache._size()
+
+
+def test_cancelled_leader_hands_over_to_a_waiter(tmp_path):
+    cache = ToolResultCache(tmp_path / "tools.sqlite")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return {"context_str": f"call {len(calls)}"}
+
+    async def main():
+        leader = asyncio.create_task(cache.aget_or_compute("arxiv", "k", 60, compute))
+        await asyncio.sleep(0.05)
+        followers = [asyncio.create_task(cache.aget_or_compute("arxiv", "k", 60, compute))
+                     for _ in range(3)]
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        return await asyncio.gather(*followers)
+
+    results = asyncio.run(main())
+
+    # One follower recomputed; the others shared its result instead of being cancelled
+    assert len(calls) == 2
+    assert results == [{"context_str": "call 2"}] * 3
+
+
+def test_cancelled_waiter_does_not_affect_others(tmp_path):
+    cache = ToolResultCache(tmp_path / "tools.sqlite")
+
+    async def compute():
+        await asyncio.sleep(0.2)
+        return {"context_str": "results"}
+
+    async def main():
+        leader = asyncio.create_task(cache.aget_or_compute("arxiv", "k", 60, compute))
+        await asyncio.sleep(0.05)
+        waiters = [asyncio.create_task(cache.aget_or_compute("arxiv", "k", 60, compute))
+                   for _ in range(2)]
+        await asyncio.sleep(0.05)
+        waiters[0].cancel()
+        return await leader, await waiters[1]
+
+    assert asyncio.run(main()) == ({"context_str": "results"},) * 2
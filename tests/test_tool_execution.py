@@ -0,0 +1,172 @@
+"""Tests for concurrent, time-limited tool execution in the researcher agent."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain.agents import create_agent
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+
+from src.agents.tool_execution import ToolConcurrencyMiddleware
+
+
+class ToolCallingFakeModel(GenericFakeChatModel):
+    """Replays scripted messages; tool binding is a no-op."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+@tool
+def slow_kb(query: str) -> str:
+    """Knowledge base stand-in."""
+    time.sleep(0.3)
+    return f"kb: {query}"
+
+
+@tool
+def slow_web(query: str) -> str:
+    """Web search stand-in."""
+    time.sleep(0.3)
+    return f"web: {query}"
+
+
+@tool
+def hung_arxiv(query: str) -> str:
+    """ArXiv stand-in that never answers in time."""
+    time.sleep(2)
+    return f"arxiv: {query}"
+
+
+release_blocked = threading.Event()
+
+
+@tool
+def blocked_kb(query: str) -> str:
+    """Knowledge base stand-in that hangs until released."""
+    release_blocked.wait(timeout=5)
+    return f"kb: {query}"
+
+
+def make_agent(tools, middleware):
+    calls = [
+        {"name": t.name, "args": {"query": f"q{i}"}, "id": f"call_{i}"}
+        for i, t in enumerate(tools)
+    ]
+    model = ToolCallingFakeModel(messages=iter([
+        AIMessage(content="", tool_calls=calls),
+        AIMessage(content="done"),
+    ]))
+    return create_agent(model=model, tools=tools, middleware=[middleware])
+
+
+def tool_messages(result):
+    return [m for m in result["messages"] if isinstance(m, ToolMessage)]
+
+
+def test_tool_calls_run_concurrently_in_call_order():
+    agent = make_agent([slow_kb, slow_web, slow_kb], ToolConcurrencyMiddleware(4, timeout=5))
+
+    start = time.perf_counter()
+    result = agent.invoke({"messages": [{"role": "user", "content": "hi"}]})
+    elapsed = time.perf_counter() - start
+
+    assert [m.content for m in tool_messages(result)] == ["kb: q0", "web: q1", "kb: q2"]
+    assert elapsed < 0.8
+
+
+def test_slow_tool_times_out_without_blocking_others():
+    agent = make_agent([slow_kb, hung_arxiv], ToolConcurrencyMiddleware(4, timeout=1))
+
+    start = time.perf_counter()
+    result = agent.invoke({"messages": [{"role": "user", "content": "hi"}]})
+    elapsed = time.perf_counter() - start
+
+    kb, arxiv = tool_messages(result)
+    assert kb.content == "kb: q0"
+    assert arxiv.status == "error" and "timed out" in arxiv.content
+    assert elapsed < 1.8
+    assert result["messages"][-1].content == "done"
+
+
+def test_async_timeout():
+    agent = make_agent([slow_web, hung_arxiv], ToolConcurrencyMiddleware(4, timeout=1))
+
+    result = asyncio.run(agent.ainvoke({"messages": [{"role": "user", "content": "hi"}]}))
+
+    web, arxiv = tool_messages(result)
+    assert web.content == "web: q0"
+    assert arxiv.status == "error"
+
+
+def test_queued_calls_do_not_time_out_while_waiting():
+    # One slot: each 0.3s call fits the timeout, but three in a row do not
+    agent = make_agent([slow_kb, slow_web, slow_kb], ToolConcurrencyMiddleware(1, timeout=0.5))
+
+    result = agent.invoke({"messages": [{"role": "user", "content": "hi"}]})
+
+    assert [m.content for m in tool_messages(result)] == ["kb: q0", "web: q1", "kb: q2"]
+
+
+def test_async_queued_calls_do_not_time_out_while_waiting():
+    agent = make_agent([slow_kb, slow_web, slow_kb], ToolConcurrencyMiddleware(1, timeout=0.5))
+
+    result = asyncio.run(agent.ainvoke({"messages": [{"role": "user", "content": "hi"}]}))
+
+    assert [m.content for m in tool_messages(result)] == ["kb: q0", "web: q1", "kb: q2"]
+
+
+def test_hung_calls_give_back_their_slot():
+    middleware = ToolConcurrencyMiddleware(1, timeout=0.4)
+    agent = make_agent([hung_arxiv, hung_arxiv, slow_web], middleware)
+
+    start = time.perf_counter()
+    result = agent.invoke({"messages": [{"role": "user", "content": "hi"}]})
+    elapsed = time.perf_counter() - start
+
+    first, second, web = tool_messages(result)
+    assert first.status == second.status == "error"
+    assert web.content == "web: q2"
+    assert middleware.abandoned == 2
+    assert elapsed < 1.8  # Less than one hung call
+
+
+def test_hung_calls_are_capped():
+    middleware = ToolConcurrencyMiddleware(4, timeout=0.2, max_hung=1)
+    # Two model turns: the first call hangs, the second comes after it timed out
+    model = ToolCallingFakeModel(messages=iter([
+        AIMessage(content="", tool_calls=[{"name": "blocked_kb", "args": {"query": "q0"}, "id": "call_0"}]),
+        AIMessage(content="", tool_calls=[{"name": "slow_web", "args": {"query": "q1"}, "id": "call_1"}]),
+        AIMessage(content="done"),
+    ]))
+    agent = create_agent(model=model, tools=[blocked_kb, slow_web], middleware=[middleware])
+    release_blocked.clear()
+    try:
+        result = agent.invoke({"messages": [{"role": "user", "content": "hi"}]})
+
+        blocked, web = tool_messages(result)
+        assert "timed out" in blocked.content
+        # No thread is started while the cap is reached
+        assert web.status == "error" and "unavailable" in web.content
+        assert middleware.hung == 1
+    finally:
+        release_blocked.set()
+
+    deadline = time.monotonic() + 2
+    while middleware.hung and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert middleware.hung == 0
+    assert middleware.abandoned == 1
+
+    # Calls run again once the hung thread has finished
+    middleware.timeout = 1
+    result = make_agent([slow_web], middleware).invoke({"messages": [{"role": "user", "content": "hi"}]})
+    assert tool_messages(result)[0].content == "web: q0"
@@ -0,0 +1,157 @@
+"""Tests for VectorStoreManager index maintenance with deterministic embeddings."""
+
+import hashlib
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.config import settings
+from src.knowledge import vector_store
+from src.knowledge.index_factory import build_index, index_kind
+from src.knowledge.vector_store import VectorStoreManager, resolve_index_dir
+
+DIM = 16
+
+
+class HashEmbeddings(Embeddings):
+    """Random but repeatable vector per text."""
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(DIM).astype(np.float32).tolist()
+
+
+def documents(start: int, stop: int) -> List[Document]:
+    return [Document(page_content=f"chunk {i}", metadata={"chunk_id": i}) for i in range(start, stop)]
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "embedding_cache_enabled", False)
+    monkeypatch.setattr(settings, "embed_requests_per_minute", 0)
+    monkeypatch.setattr(settings, "hybrid_search", False)
+    manager = VectorStoreManager()
+    manager.base_embeddings = manager.embeddings = HashEmbeddings()
+    manager.index_path = tmp_path / "faiss_index"
+    return manager
+
+
+def top_ids(manager: VectorStoreManager, texts: List[str]) -> List[int]:
+    return [manager.similarity_search(text, k=1)[0].metadata["chunk_id"] for text in texts]
+
+
+@pytest.mark.parametrize("index_type", ["ivf", "hnsw"])
+def test_delete_then_add_keeps_ids_in_sync(manager, monkeypatch, index_type):
+    monkeypatch.setattr(settings, "index_type", index_type)
+    monkeypatch.setattr(settings, "ivf_nlist", 4)
+    monkeypatch.setattr(settings, "ivf_nprobe", 4)  # Exhaustive, so top-1 is exact
+    docs = documents(0, 400)
+    manager.create(docs, ids=[f"doc#{i}" for i in range(400)])
+    assert index_kind(manager.vector_store.index) == index_type
+
+    deleted = manager.delete([f"doc#{i}" for i in range(0, 400, 3)])
+    manager.add_documents(documents(400, 460), ids=[f"doc#{i}" for i in range(400, 460)])
+
+    survivors = [i for i in range(460) if i >= 400 or i % 3]
+    assert deleted == 134
+    assert top_ids(manager, [f"chunk {i}" for i in survivors]) == survivors
+
+    manager.save()
+    assert index_kind(manager.vector_store.index) == index_type
+    assert top_ids(manager, [f"chunk {i}" for i in survivors]) == survivors
+
+
+@pytest.mark.skipif(not Path("/proc/self/maps").exists(), reason="needs /proc to inspect mappings")
+@pytest.mark.parametrize("index_type", ["flat", "ivf"])
+def test_read_only_load_maps_index_file(manager, monkeypatch, index_type):
+    monkeypatch.setattr(settings, "index_type", index_type)
+    monkeypatch.setattr(settings, "ivf_nlist", 4)
+    manager.create(documents(0, 400), ids=[f"doc#{i}" for i in range(400)])
+    index_file = str((resolve_index_dir(manager.index_path) / "index.faiss").resolve())
+
+    reader = VectorStoreManager()
+    reader.embeddings = HashEmbeddings()
+    reader.index_path = manager.index_path
+    reader.load_or_create()
+
+    # The codes are served from the file mapping rather than copied into RAM
+    assert index_file in Path("/proc/self/maps").read_text()
+    assert top_ids(reader, ["chunk 7"]) == [7]
+
+
+def test_searches_continue_while_save_rebuilds_index(manager, monkeypatch):
+    manager.create(documents(0, 400), ids=[f"doc#{i}" for i in range(400)])  # Flat
+    monkeypatch.setattr(settings, "index_type", "hnsw")
+    searched_during_build = []
+
+    def slow_build(*args, **kwargs):
+        # Runs with no lock held: a search from another thread must not block
+        worker = threading.Thread(target=lambda: searched_during_build.append(top_ids(manager, ["chunk 5"])))
+        worker.start()
+        worker.join(timeout=2)
+        searched_during_build.append(not worker.is_alive())
+        return build_index(*args, **kwargs)
+
+    monkeypatch.setattr(vector_store, "build_index", slow_build)
+    manager.save()
+
+    assert searched_during_build == [[5], True]
+    assert index_kind(manager.vector_store.index) == "hnsw"
+
+
+def test_interrupted_save_keeps_the_published_index_and_docstore_together(manager, monkeypatch):
+    manager.create(documents(0, 50), ids=[f"doc#{i}" for i in range(50)])
+    manager.add_documents(documents(50, 60), ids=[f"doc#{i}" for i in range(50, 60)])
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    # The docstore of the new save is written, then writing its index fails
+    monkeypatch.setattr(vector_store.faiss, "write_index", fail)
+    with pytest.raises(OSError):
+        manager.save()
+    monkeypatch.undo()
+
+    reader = VectorStoreManager()
+    reader.embeddings = HashEmbeddings()
+    reader.index_path = manager.index_path
+    reader.load_or_create()
+    assert reader.vector_store.index.ntotal == len(reader.vector_store.docstore) == 50
+    assert top_ids(reader, ["chunk 7"]) == [7]
+
+
+def test_save_replaces_index_and_docstore_as_one_version(manager):
+    manager.create(documents(0, 50), ids=[f"doc#{i}" for i in range(50)])
+    first = resolve_index_dir(manager.index_path)
+    reader = VectorStoreManager()
+    reader.embeddings = HashEmbeddings()
+    reader.index_path = manager.index_path
+    reader.load_or_create()
+
+    for stop in (60, 70):
+        manager.add_documents(documents(stop - 10, stop), ids=[f"doc#{i}" for i in range(stop - 10, stop)])
+        manager.save()
+
+    current = resolve_index_dir(manager.index_path)
+    assert current != first
+    # Only the published version and the one it replaced are kept
+    versions = [p for p in manager.index_path.iterdir() if p.is_dir()]
+    assert len(versions) == 2 and current in versions and first not in versions
+    # A reader that loaded the first version keeps serving it
+    assert top_ids(reader, ["chunk 7"]) == [7]
+    reader.load_or_create()
+    assert reader.vector_store.index.ntotal == len(reader.vector_store.docstore) == 70